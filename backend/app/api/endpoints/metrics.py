@@ -0,0 +1,39 @@
+"""Operational metrics endpoint."""
+from fastapi import APIRouter
+
+from app.core.resilience import upstream_stats
+from app.services.analysis_cache import analysis_cache
+from app.services.analysis_jobs import analysis_jobs
+from app.services.bot_pool import bot_pool
+from app.services.room_pool import room_pool
+from app.services.transcript_cache import transcript_cache
+from app.services.transcript_compaction import compaction_stats
+from app.services.turn_latency import turn_latency_sink
+from app.services.video_analysis import analysis_flight, transcript_flight
+
+router = APIRouter()
+
+
+@router.get("")
+def get_metrics() -> dict:
+    """
+    GET /metrics - Cache and upstream counters for this worker.
+    """
+    return {
+        "transcript_cache": transcript_cache.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "analysis_jobs": analysis_jobs.stats(),
+        # `saved` counts requests that joined an in-flight analysis instead of
+        # paying for their own Apify run and Gemini call
+        "analysis_coalescing": analysis_flight.stats(),
+        "transcript_coalescing": transcript_flight.stats(),
+        "transcript_compaction": compaction_stats(),
+        # Circuit breaker state plus retry/hedge/timeout counters per upstream
+        "upstreams": upstream_stats(),
+        # Pre-created Daily rooms: `size` is the current depth, `misses` fell back to on-demand creation
+        "room_pool": room_pool.stats(),
+        # Warm bot workers: `cold_starts` found no idle worker and spawned a fresh bot process
+        "bot_workers": bot_pool.stats(),
+        # Voice latency per stage (VAD stop -> turn decision -> first LLM audio -> playback) over all logged turns
+        "turn_latency": turn_latency_sink.summary(),
+    }
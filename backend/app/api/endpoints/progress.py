@@ -0,0 +1,28 @@
+"""Learner progress endpoints: per-word mastery from recorded chat sessions."""
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from app.db import get_connection
+from app.db.repositories import get_learner_mastery
+from app.schemas.progress import VocabMastery
+
+router = APIRouter()
+
+
+@router.get("/{learner_id}/mastery", response_model=list[VocabMastery])
+def get_mastery(
+    learner_id: str,
+    vocab_id: str | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+):
+    """
+    GET /progress/{learner_id}/mastery - Per-word practice record for a learner.
+    Least mastered (then least recently practised) words come first, so the
+    head of the list is what to review next. Filter to one word with vocab_id.
+    """
+    conn = get_connection()
+    try:
+        return get_learner_mastery(conn, learner_id, vocab_id, limit)
+    finally:
+        conn.close()
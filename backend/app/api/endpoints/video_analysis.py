@@ -1,35 +1,120 @@
-from fastapi import APIRouter
-from app.schemas.video import Video, VideoAnalysisRequest
-from app.services.youtube import get_video_transcript, format_transcript, extract_video_id
-from google import genai
+import json
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.core.config import settings
-from app.core.prompts import get_video_analysis_prompt
+from app.schemas.video import AnalysisJob, Video, VideoAnalysisRequest, VideoBatchAnalysisRequest
+from app.services.analysis_jobs import analysis_jobs
+from app.services.batch_analysis import analyze_batch
+from app.services.video_analysis import analyze_video
 
 
 router = APIRouter()
 
-client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+
+def _to_job_response(job: dict) -> AnalysisJob:
+    return AnalysisJob(
+        job_id=job["id"],
+        status=job["status"],
+        stage=job["stage"],
+        video_url=job["video_url"],
+        user_level=job["user_level"],
+        result=job.get("result") or None,
+        error=job.get("error"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+    )
 
 
-#request body: video_url: str
-@router.post("", response_model=Video)
+#request body: video_url: str, user_level: int, plus optional background, chunked,
+#force_refresh, max_age_seconds and any_level flags (see VideoAnalysisRequest)
+@router.post("", response_model=Video | AnalysisJob)
 async def video_analysis(request: VideoAnalysisRequest):
     print(f"Analyzing video: {request.video_url}")
 
-    video_id = extract_video_id(request.video_url)
-    print(f"Extracting transcript - Video ID: {video_id}")
-    
-    # Fetch transcript using Apify (default language is Japanese)
-    transcript_data = get_video_transcript(request.video_url, target_language="ja")
-    transcript = format_transcript(transcript_data)
-    print(f"Transcript Extracted!")
-    
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=get_video_analysis_prompt(video_id, request.video_url, transcript, request.user_level),
-        config={
-            "response_mime_type": "application/json",
-            "response_json_schema": Video.model_json_schema(),
-        },
+    if request.background:
+        # Queue the analysis and return the job immediately (202 Accepted)
+        job = await analysis_jobs.submit(
+            request.video_url,
+            request.user_level,
+            chunked=request.chunked,
+            force_refresh=request.force_refresh,
+            max_age_seconds=request.max_age_seconds,
+            any_level=request.any_level,
+        )
+        return JSONResponse(_to_job_response(job).model_dump(), status_code=202)
+
+    # Blocking upstream calls run off the event loop with per-stage timeouts
+    return await analyze_video(
+        request.video_url,
+        request.user_level,
+        chunked=request.chunked,
+        force_refresh=request.force_refresh,
+        max_age_seconds=request.max_age_seconds,
+        any_level=request.any_level,
+    )
+
+
+@router.post("/batch")
+async def video_analysis_batch(request: VideoBatchAnalysisRequest):
+    """
+    POST /video_analysis/batch - Analyze and persist many videos.
+    Streams one NDJSON line (see BatchAnalysisItem) per URL as soon as that
+    video is analyzed and saved to the videos/vocabs tables, in completion order.
+    """
+    if not request.video_urls:
+        raise HTTPException(status_code=400, detail="video_urls must not be empty")
+    if len(request.video_urls) > settings.BATCH_MAX_VIDEOS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.BATCH_MAX_VIDEOS} videos per batch"
+        )
+
+    async def item_stream():
+        async for item in analyze_batch(
+            request.video_urls,
+            request.user_level,
+            chunked=request.chunked,
+            force_refresh=request.force_refresh,
+            max_age_seconds=request.max_age_seconds,
+        ):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        item_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}", response_model=AnalysisJob)
+async def get_analysis_job(job_id: str):
+    """
+    GET /video_analysis/{job_id} - Poll a background analysis job.
+    `result` is populated once status is "completed".
+    """
+    job = await analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_job_response(job)
+
+
+@router.get("/{job_id}/events")
+async def stream_analysis_job_events(job_id: str):
+    """
+    GET /video_analysis/{job_id}/events - Server-sent events for job progress.
+    Emits one `stage` event per transition (queued, started, cached, transcript_fetched,
+    llm_started, parsed, persisted or failed) and closes when the job finishes.
+    """
+    job = await analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for event in analysis_jobs.subscribe(job_id):
+            yield f"event: stage\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return Video(**response.parsed)
\ No newline at end of file
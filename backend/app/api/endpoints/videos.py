@@ -2,8 +2,8 @@
 from fastapi import APIRouter, HTTPException
 
 from app.db import get_connection
-from app.db.repositories import ensure_video, ensure_vocab, link_video_vocab
-from app.schemas.video import Video, Vocab, VideoSummary, VideoCreateResponse
+from app.db.repositories import get_video_with_vocab, save_video
+from app.schemas.video import Video, VideoSummary, VideoCreateResponse
 
 router = APIRouter()
 
@@ -41,53 +41,10 @@ def get_video(video_id: str):
     """
     conn = get_connection()
     try:
-        # Try to find by internal ID first, then by YouTube video ID
-        row = conn.execute(
-            """SELECT id, youtube_video_id, title, tags, video_url, duration, summary 
-               FROM videos 
-               WHERE id = ? OR youtube_video_id = ?""",
-            (video_id, video_id)
-        ).fetchone()
-        
-        if not row:
+        found = get_video_with_vocab(conn, video_id)
+        if not found:
             raise HTTPException(status_code=404, detail="Video not found")
-        
-        internal_video_id = row[0]
-        
-        # Fetch all vocab for this video
-        vocab_rows = conn.execute(
-            """
-            SELECT v.id, v.japanese_vocab, v.pronunciation, v.english_translation, v.jlpt_level, vv.timestamp
-            FROM vocabs v
-            JOIN video_vocab vv ON vv.vocab_id = v.id
-            WHERE vv.video_id = ?
-            ORDER BY vv.timestamp
-            """,
-            (internal_video_id,),
-        ).fetchall()
-        
-        vocab_list = [
-            Vocab(
-                id=r[0],
-                japanese_vocab=r[1],
-                pronunciation=r[2] or "",
-                english_translation=r[3] or "",
-                timestamp=r[5],
-                jlpt_level=r[4] or 5
-            )
-            for r in vocab_rows
-        ]
-        
-        return Video(
-            id=row[0],
-            video_id=row[1],
-            title=row[2],
-            tags=row[3].split(",") if row[3] else [],
-            video_url=row[4],
-            duration=row[5],
-            summary=row[6] or "",
-            vocab=vocab_list
-        )
+        return found[0]
     finally:
         conn.close()
 
@@ -103,33 +60,8 @@ def create_video(payload: Video):
     try:
         conn.execute("BEGIN")
         
-        # Create or update video
-        internal_video_id = ensure_video(
-            conn,
-            youtube_video_id=payload.video_id,
-            title=payload.title,
-            tags=payload.tags,
-            video_url=payload.video_url,
-            duration=payload.duration,
-            summary=payload.summary
-        )
-        
-        # Add all vocab items
-        for item in payload.vocab:
-            vocab_id = ensure_vocab(
-                conn,
-                japanese_vocab=item.japanese_vocab,
-                pronunciation=item.pronunciation,
-                english_translation=item.english_translation,
-                jlpt_level=item.jlpt_level
-            )
-            link_video_vocab(
-                conn,
-                video_id=internal_video_id,
-                vocab_id=vocab_id,
-                timestamp=item.timestamp,
-                sentence=None
-            )
+        # Create or update the video and all its vocab
+        internal_video_id = save_video(conn, payload)
         
         conn.commit()
         return VideoCreateResponse(ok=True, video_id=internal_video_id)
@@ -1,67 +1,20 @@
 """Chat API endpoints for managing bot sessions."""
-import json
-import os
-import subprocess
-import sys
+from contextlib import nullcontext
 
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
-from app.core.exceptions import BotSpawnError
 from app.core.logger import logger
-from app.services.daily import create_daily_room, get_daily_token
+from app.services.bot_pool import BotSession, bot_pool
+from app.services.bot_sessions import bot_sessions
+from app.services.room_pool import room_pool
 
 router = APIRouter()
 
 
-def _spawn_bot(room_url: str, token: str, target_words: list[str], summary: str = "") -> None:
-    """
-    Spawn the bot process as a subprocess.
-    
-    Args:
-        room_url: The Daily.co room URL
-        token: The authentication token for the room
-        target_words: List of vocabulary words to practice
-        summary: Video summary to provide context for the conversation
-        
-    Raises:
-        BotSpawnError: If bot spawning fails
-    """
-    try:
-        # Get the backend directory (parent of app directory)
-        backend_dir = settings.PROJECT_ROOT / "backend"
-        
-        # Spawn the bot as a subprocess using python module syntax
-        cmd = [
-            sys.executable,  # Use the current Python interpreter
-            "-m",
-            "app.services.gemini_live_chat",
-            "-u",
-            room_url,
-            "-t",
-            token,
-        ]
-        if target_words:
-            cmd.extend(["-w", json.dumps(target_words, ensure_ascii=False)])
-        if summary:
-            cmd.extend(["-s", summary])
-
-        subprocess.Popen(
-            cmd,
-            cwd=str(backend_dir),  # Run from backend directory
-            env=os.environ.copy(),
-        )
-        logger.info(f"Bot spawned for room: {room_url}")
-    except Exception as e:
-        logger.error(f"Failed to spawn bot: {e}")
-        raise BotSpawnError(str(e))
-
-
 @router.post("/start")
-async def start_chat_session(
-    request: Request, background_tasks: BackgroundTasks
-) -> JSONResponse:
+async def start_chat_session(request: Request) -> JSONResponse:
     """
     Start a new chat session by creating a Daily room and spawning the bot.
     
@@ -69,6 +22,7 @@ async def start_chat_session(
         JSONResponse with room_url and token (null for guest access)
         
     Raises:
+        BotCapacityError: If the bot session limit is reached (429 with Retry-After)
         DailyAPIError: If room creation fails
         BotSpawnError: If bot spawning fails
     """
@@ -86,12 +40,16 @@ async def start_chat_session(
         print(f"Raw vocab: {raw_vocab}")
         
         target_words: list[str] = []
+        readings: dict[str, str] = {}  # for the bot's local word detection
         if isinstance(raw_vocab, list):
             for entry in raw_vocab:
                 if isinstance(entry, str):
                     word = entry.strip()
                 elif isinstance(entry, dict):
                     word = str(entry.get("japanese_vocab", "")).strip()
+                    reading = str(entry.get("pronunciation", "")).strip()
+                    if word and reading:
+                        readings[word] = reading
                 else:
                     word = ""
                 if word:
@@ -102,23 +60,25 @@ async def start_chat_session(
         # Extract video summary from payload
         summary = payload.get("summary", "") if isinstance(payload, dict) else ""
         print(f"Video summary: {summary}")
+        learner_id = str(payload.get("learner_id") or "").strip() if isinstance(payload, dict) else ""
 
-        # Step 1: Create a new Daily Room
-        logger.info("Step 1: Creating Daily room...")
-        room_data = await create_daily_room()
-        room_url = room_data["url"]
-        room_name = room_data["name"]
-        logger.info(f"Room created successfully - URL: {room_url}, Name: {room_name}")
-
-        # Step 2: Create a token for the Bot
-        logger.info("Step 2: Creating bot token...")
-        bot_token = await get_daily_token(room_name)
-        logger.info("Bot token created successfully")
+        # Admission control: refuse before using up a room if the host is at its bot limit
+        async with bot_sessions.admission() if settings.BOT_SPAWN_ENABLED else nullcontext():
+            # Steps 1-2: Take a pre-created Daily room with its bot token
+            # (created on demand if the pool is empty)
+            logger.info("Step 1-2: Taking Daily room and bot token from the pool...")
+            room = await room_pool.take()
+            room_url = room.url
+            bot_token = room.token
+            logger.info(f"Room ready - URL: {room_url}, Name: {room.name}")
 
-        # Step 3: Spawn the bot process (background to reduce latency)
-        logger.info("Step 3: Queueing bot process spawn...")
-        background_tasks.add_task(_spawn_bot, room_url, bot_token, target_words, summary)
-        logger.info("Bot process queued")
+            # Step 3: Hand the session to a warm bot worker (cold bot process if none is idle)
+            if settings.BOT_SPAWN_ENABLED:
+                logger.info("Step 3: Submitting bot session...")
+                session_id = await bot_pool.submit(BotSession(room_url, bot_token, target_words, summary, readings, learner_id))
+                logger.info(f"Bot session {session_id} submitted")
+            else:
+                logger.info("Step 3: Bot spawning disabled (BOT_SPAWN_ENABLED=false), skipping")
 
         # Step 4: Return the room URL to the client
         response_data = {
@@ -134,3 +94,15 @@ async def start_chat_session(
         logger.exception("Full traceback:")
         logger.info("=" * 60)
         raise
+
+
+@router.get("/sessions")
+def list_sessions() -> dict:
+    """
+    GET /vocab-live-chat/sessions - Running bot sessions and admission counters.
+    
+    Returns:
+        dict: Live counts (running/starting/ready, warm/cold), the admission
+            limits and current load, and one entry per running session
+    """
+    return bot_sessions.snapshot()
@@ -4,6 +4,8 @@ from fastapi import APIRouter
 from app.api.endpoints import vocab_live_chat
 from app.api.endpoints import videos
 from app.api.endpoints import video_analysis
+from app.api.endpoints import metrics
+from app.api.endpoints import progress
 
 api_router = APIRouter()
 
@@ -11,3 +13,5 @@ api_router = APIRouter()
 api_router.include_router(vocab_live_chat.router, prefix="/vocab-live-chat", tags=["vocab-live-chat"])
 api_router.include_router(video_analysis.router, prefix="/video_analysis", tags=["video_analysis"])
 api_router.include_router(videos.router, prefix="/videos", tags=["videos"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
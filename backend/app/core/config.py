@@ -16,15 +16,36 @@ if TYPE_CHECKING:
 class Settings:
     """Application settings loaded from environment variables."""
     
+    # Offline Mode: base URL of a local stand-in for Apify, Gemini and Daily
+    # (tests/fake_upstreams.py). Points all three clients at it and makes the API keys optional.
+    FAKE_UPSTREAMS_URL: str = os.getenv("FAKE_UPSTREAMS_URL", "").rstrip("/")
+    
     # API Keys
-    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
-    DAILY_API_KEY: str = os.getenv("DAILY_API_KEY", "")
-    APIFY_API_TOKEN: str = os.getenv("APIFY_API_TOKEN", "")
+    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "offline" if FAKE_UPSTREAMS_URL else "")
+    DAILY_API_KEY: str = os.getenv("DAILY_API_KEY", "offline" if FAKE_UPSTREAMS_URL else "")
+    APIFY_API_TOKEN: str = os.getenv("APIFY_API_TOKEN", "offline" if FAKE_UPSTREAMS_URL else "")
+    
+    # Upstream Base URLs (empty = the client library's default)
+    APIFY_API_URL: str = os.getenv("APIFY_API_URL", f"{FAKE_UPSTREAMS_URL}/apify" if FAKE_UPSTREAMS_URL else "")
+    GEMINI_API_URL: str = os.getenv("GEMINI_API_URL", f"{FAKE_UPSTREAMS_URL}/gemini" if FAKE_UPSTREAMS_URL else "")
     
     # Daily.co Configuration
-    DAILY_API_URL: str = "https://api.daily.co/v1"
+    DAILY_API_URL: str = os.getenv(
+        "DAILY_API_URL", f"{FAKE_UPSTREAMS_URL}/daily/v1" if FAKE_UPSTREAMS_URL else "https://api.daily.co/v1"
+    )
     DAILY_ROOM_DURATION_SECONDS: int = 10 * 60  # 10 minutes
     DAILY_MAX_PARTICIPANTS: int = 2
+    # Pre-created rooms (with bot tokens) kept ready for /vocab-live-chat/start; 0 disables the pool
+    DAILY_ROOM_POOL_SIZE: int = int(os.getenv("DAILY_ROOM_POOL_SIZE", "3"))
+    # Pooled rooms live this much longer than DAILY_ROOM_DURATION_SECONDS and are
+    # evicted after idling that long, so every session still gets the full duration
+    DAILY_ROOM_POOL_MAX_IDLE_SECONDS: int = int(os.getenv("DAILY_ROOM_POOL_MAX_IDLE_SECONDS", str(5 * 60)))
+    DAILY_ROOM_POOL_REFILL_CONCURRENCY: int = int(os.getenv("DAILY_ROOM_POOL_REFILL_CONCURRENCY", "2"))
+    # Shared Daily API client (HTTP/2 is used when the `h2` package is installed)
+    DAILY_HTTP2_ENABLED: bool = os.getenv("DAILY_HTTP2_ENABLED", "true").lower() == "true"
+    DAILY_HTTP_MAX_CONNECTIONS: int = int(os.getenv("DAILY_HTTP_MAX_CONNECTIONS", "20"))
+    DAILY_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("DAILY_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    DAILY_HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("DAILY_HTTP_KEEPALIVE_SECONDS", "60"))
     
     # Server Configuration
     HOST: str = "0.0.0.0"
@@ -39,13 +60,132 @@ class Settings:
     
     # Gemini Configuration
     GEMINI_VOICE_ID: str = "Achernar"
+    # Fixed bot lines (intro, closing) are synthesized once per voice with this model and played from disk
+    GEMINI_TTS_MODEL: str = os.getenv("GEMINI_TTS_MODEL", "gemini-2.5-flash-preview-tts")
+    CANNED_INTRO_ENABLED: bool = os.getenv("CANNED_INTRO_ENABLED", "true").lower() == "true"
+    BOT_AUDIO_OUT_SAMPLE_RATE: int = 24000  # Gemini Live's output rate; canned audio is stored at it
+    # Match the user's Daily transcription against the target words locally and send the
+    # client a `word_heard` hint; a word only counts once Gemini's mark_word confirms it
+    TARGET_WORD_DETECTION_ENABLED: bool = os.getenv("TARGET_WORD_DETECTION_ENABLED", "true").lower() == "true"
+    TRANSCRIPTION_LANGUAGE: str = os.getenv("TRANSCRIPTION_LANGUAGE", "ja")
+    TRANSCRIPTION_MODEL: str = os.getenv("TRANSCRIPTION_MODEL", "nova-2-general")
+    # Bounded chat context: the Live session's sliding window starts dropping the oldest turns at
+    # this many tokens (0 = the API default, 80% of the model's window); the local context keeps the
+    # prompt, the remaining words, a rolling summary and the recent messages once it passes the max
+    GEMINI_CONTEXT_TRIGGER_TOKENS: int = int(os.getenv("GEMINI_CONTEXT_TRIGGER_TOKENS", "16000"))
+    CHAT_CONTEXT_MAX_MESSAGES: int = int(os.getenv("CHAT_CONTEXT_MAX_MESSAGES", "40"))
+    CHAT_CONTEXT_RECENT_MESSAGES: int = int(os.getenv("CHAT_CONTEXT_RECENT_MESSAGES", "16"))
+    CHAT_CONTEXT_SUMMARY_MAX_CHARS: int = int(os.getenv("CHAT_CONTEXT_SUMMARY_MAX_CHARS", "1500"))
     
     # VAD Configuration
     VAD_STOP_SECS: float = 0.2
+    # Share one VAD and one smart-turn model per process across bot sessions; VAD frames and
+    # end-of-turn requests arriving within their window run as one batch
+    # (0 smart-turn workers = one per CPU, up to 4)
+    TURN_INFERENCE_SHARED: bool = os.getenv("TURN_INFERENCE_SHARED", "true").lower() == "true"
+    VAD_BATCH_WINDOW_MS: float = float(os.getenv("VAD_BATCH_WINDOW_MS", "2"))
+    TURN_BATCH_WINDOW_MS: float = float(os.getenv("TURN_BATCH_WINDOW_MS", "5"))
+    TURN_BATCH_MAX_SIZE: int = int(os.getenv("TURN_BATCH_MAX_SIZE", "8"))
+    TURN_INFERENCE_WORKERS: int = int(os.getenv("TURN_INFERENCE_WORKERS", "0"))
+    
+    # Bot Configuration (disable to exercise /vocab-live-chat/start without running bots)
+    BOT_SPAWN_ENABLED: bool = os.getenv("BOT_SPAWN_ENABLED", "true").lower() == "true"
+    # Warm worker processes with pipecat and the turn models pre-loaded (0 = cold process per session)
+    BOT_WORKER_POOL_SIZE: int = int(os.getenv("BOT_WORKER_POOL_SIZE", "2"))
+    # Concurrent sessions each worker process hosts as asyncio tasks
+    BOT_WORKER_CAPACITY: int = int(os.getenv("BOT_WORKER_CAPACITY", "4"))
+    # Each worker exits and is replaced after this many sessions (0 = never)
+    BOT_WORKER_MAX_SESSIONS: int = int(os.getenv("BOT_WORKER_MAX_SESSIONS", "20"))
+    # Admission control for /vocab-live-chat/start: running bots (warm + cold) and
+    # 1-minute load average per CPU above which new sessions get a 429 (0 = no load limit)
+    BOT_MAX_SESSIONS: int = int(os.getenv("BOT_MAX_SESSIONS", "12"))
+    BOT_MAX_LOAD_PER_CPU: float = float(os.getenv("BOT_MAX_LOAD_PER_CPU", "0"))
+    BOT_ADMISSION_RETRY_AFTER_SECONDS: float = float(os.getenv("BOT_ADMISSION_RETRY_AFTER_SECONDS", "15"))
+
+    # Learner Progress Configuration (chat sessions and target-word use, written by the bot processes)
+    PROGRESS_ENABLED: bool = os.getenv("PROGRESS_ENABLED", "true").lower() == "true"
+    # Progress is recorded under this learner when /vocab-live-chat/start gets no learner_id
+    DEFAULT_LEARNER_ID: str = os.getenv("DEFAULT_LEARNER_ID", "local")
+    # The writer thread collects events this long and commits them in one transaction
+    PROGRESS_FLUSH_INTERVAL_MS: float = float(os.getenv("PROGRESS_FLUSH_INTERVAL_MS", "250"))
+    PROGRESS_BATCH_MAX_EVENTS: int = int(os.getenv("PROGRESS_BATCH_MAX_EVENTS", "500"))
+    # Events queued beyond this (SQLite stalled) are dropped rather than held in memory
+    PROGRESS_QUEUE_MAX_EVENTS: int = int(os.getenv("PROGRESS_QUEUE_MAX_EVENTS", "10000"))
+
+    # Video Analysis Configuration
+    GEMINI_ANALYSIS_MODEL: str = "gemini-3-flash-preview"
+    TRANSCRIPT_TIMEOUT_SECONDS: float = float(os.getenv("TRANSCRIPT_TIMEOUT_SECONDS", "180"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+    BLOCKING_IO_MAX_WORKERS: int = int(os.getenv("BLOCKING_IO_MAX_WORKERS", "32"))
+    ANALYSIS_JOB_CONCURRENCY: int = int(os.getenv("ANALYSIS_JOB_CONCURRENCY", "2"))
+    ANALYSIS_VOCAB_COUNT: int = 20
+    # Build the Gemini/Apify clients and tokenizer in the background at startup (else on first use)
+    CLIENT_WARM_UP_ENABLED: bool = os.getenv("CLIENT_WARM_UP_ENABLED", "true").lower() == "true"
+    
+    # Upstream Resilience Configuration (timeouts: TRANSCRIPT/LLM above, DAILY below)
+    RETRY_BACKOFF_BASE_SECONDS: float = float(os.getenv("RETRY_BACKOFF_BASE_SECONDS", "0.5"))
+    RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("RETRY_BACKOFF_MAX_SECONDS", "8"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+    # Send a second identical request when the first is slower than this; 0 disables hedging
+    GEMINI_HEDGE_AFTER_SECONDS: float = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "45"))
+    DAILY_TIMEOUT_SECONDS: float = float(os.getenv("DAILY_TIMEOUT_SECONDS", "10"))
+    DAILY_MAX_RETRIES: int = int(os.getenv("DAILY_MAX_RETRIES", "2"))
+    DAILY_HEDGE_AFTER_SECONDS: float = float(os.getenv("DAILY_HEDGE_AFTER_SECONDS", "1.5"))
+    
+    # Apify Configuration
+    APIFY_HTTP_TIMEOUT_SECONDS: int = int(os.getenv("APIFY_HTTP_TIMEOUT_SECONDS", "60"))
+    # Server-side long-poll per status request; returns as soon as the run finishes
+    APIFY_WAIT_SECONDS: int = int(os.getenv("APIFY_WAIT_SECONDS", "30"))
+    APIFY_POLL_INTERVAL_SECONDS: float = float(os.getenv("APIFY_POLL_INTERVAL_SECONDS", "0.25"))
+    
+    # Batch Analysis Configuration
+    BATCH_MAX_VIDEOS: int = int(os.getenv("BATCH_MAX_VIDEOS", "100"))
+    BATCH_FETCH_CONCURRENCY: int = int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+    BATCH_PERSIST_MAX_ITEMS: int = int(os.getenv("BATCH_PERSIST_MAX_ITEMS", "16"))
+    
+    # Transcript Compaction Configuration
+    TRANSCRIPT_WINDOW_SECONDS: float = float(os.getenv("TRANSCRIPT_WINDOW_SECONDS", "20"))
+    TRANSCRIPT_WINDOW_MAX_CHARS: int = int(os.getenv("TRANSCRIPT_WINDOW_MAX_CHARS", "120"))
+    # Max prompt tokens for the compacted transcript; 0 disables the limit
+    TRANSCRIPT_TOKEN_BUDGET: int = int(os.getenv("TRANSCRIPT_TOKEN_BUDGET", "24000"))
+    
+    # Local Vocab Pre-filter Configuration
+    VOCAB_PREFILTER_ENABLED: bool = os.getenv("VOCAB_PREFILTER_ENABLED", "true").lower() == "true"
+    VOCAB_PREFILTER_CANDIDATES: int = int(os.getenv("VOCAB_PREFILTER_CANDIDATES", "40"))
+    VOCAB_PREFILTER_LINES_PER_WORD: int = int(os.getenv("VOCAB_PREFILTER_LINES_PER_WORD", "3"))
+    # Shorter transcripts are sent whole (the candidate list is still added)
+    VOCAB_PREFILTER_MIN_TOKENS: int = int(os.getenv("VOCAB_PREFILTER_MIN_TOKENS", "1500"))
+    
+    # Chunked (map-reduce) Analysis Configuration
+    CHUNKED_ANALYSIS_THRESHOLD_TOKENS: int = int(os.getenv("CHUNKED_ANALYSIS_THRESHOLD_TOKENS", "6000"))
+    TRANSCRIPT_CHUNK_TOKENS: int = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "3000"))
+    CHUNK_ANALYSIS_CONCURRENCY: int = int(os.getenv("CHUNK_ANALYSIS_CONCURRENCY", "8"))
+    CHUNK_CANDIDATES_PER_CHUNK: int = 10
+
+    # Transcript Cache Configuration
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "256"))
+    TRANSCRIPT_CACHE_MAX_BYTES: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = int(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(60 * 60)))
+
+    # Analysis Result Cache Configuration
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "512"))
+    ANALYSIS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(60 * 60)))
+    # Results (and POST /videos rows) older than this are re-analyzed; 0 disables the limit
+    ANALYSIS_MAX_AGE_SECONDS: int = int(os.getenv("ANALYSIS_MAX_AGE_SECONDS", str(30 * 24 * 60 * 60)))
 
     # Paths
     PROJECT_ROOT: Path = Path(__file__).resolve().parent.parent.parent.parent
-    DATABASE_PATH: Path = PROJECT_ROOT / "backend" / "data" / "vocab.db"
+    DATABASE_PATH: Path = Path(os.getenv("DATABASE_PATH", str(PROJECT_ROOT / "backend" / "data" / "vocab.db")))
+    # Per-turn voice latency records from every bot process (empty disables); rotated to .1 past the size
+    TURN_LATENCY_LOG_PATH: str = os.getenv(
+        "TURN_LATENCY_LOG_PATH", str(PROJECT_ROOT / "backend" / "data" / "turn_latency.jsonl")
+    )
+    TURN_LATENCY_LOG_MAX_BYTES: int = int(os.getenv("TURN_LATENCY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+    # Pre-synthesized audio for the bot's fixed lines, one directory per voice
+    CANNED_AUDIO_DIR: Path = Path(os.getenv("CANNED_AUDIO_DIR", str(PROJECT_ROOT / "backend" / "data" / "canned_audio")))
     
     @classmethod
     def validate(cls) -> None:
@@ -29,3 +29,37 @@ class ConfigurationError(AppException):
     
     def __init__(self, message: str):
         super().__init__(f"Configuration Error: {message}", 500)
+
+
+class UpstreamTimeoutError(AppException):
+    """Exception raised when an upstream stage exceeds its time budget."""
+    
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Upstream Timeout: {stage} did not finish within {timeout:.0f}s", 504)
+
+
+class UpstreamUnavailableError(AppException):
+    """Exception raised when an upstream's circuit breaker is open."""
+    
+    def __init__(self, service: str, retry_after: float):
+        self.retry_after = retry_after
+        self.headers = {"Retry-After": str(max(1, round(retry_after)))}
+        super().__init__(
+            f"Upstream Unavailable: {service} is failing, retry in {max(1, round(retry_after))}s", 503
+        )
+
+
+class InvalidVideoURLError(AppException):
+    """Exception raised when a URL does not identify a YouTube video."""
+    
+    def __init__(self, video_url: str):
+        super().__init__(f"Invalid Video URL: no YouTube video id in {video_url}", 400)
+
+
+class BotCapacityError(AppException):
+    """Exception raised when the host is at its bot session limit."""
+    
+    def __init__(self, reason: str, retry_after: float):
+        self.retry_after = retry_after
+        self.headers = {"Retry-After": str(max(1, round(retry_after)))}
+        super().__init__(f"Bot Capacity: {reason}, retry in {max(1, round(retry_after))}s", 429)
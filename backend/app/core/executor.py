@@ -0,0 +1,50 @@
+"""Bounded thread pool for blocking calls made from async endpoints."""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamTimeoutError
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_IO_MAX_WORKERS,
+    thread_name_prefix="blocking-io",
+)
+
+
+async def run_blocking(
+    func: Callable[..., T],
+    *args: Any,
+    stage: str,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Run a blocking function on the shared executor without stalling the event loop.
+    
+    Args:
+        func: Synchronous callable to run
+        stage: Human-readable stage name used in timeout errors
+        timeout: Seconds to wait before giving up (None waits forever)
+        
+    Returns:
+        The callable's return value
+        
+    Raises:
+        UpstreamTimeoutError: If the call does not finish within `timeout`.
+            The worker thread is not interrupted; its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        raise UpstreamTimeoutError(stage, timeout or 0)
+
+
+def shutdown_executor() -> None:
+    """Stop accepting work and let in-flight calls finish in the background."""
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -1,3 +1,7 @@
+# Bump whenever an analysis prompt changes so cached analysis results are not reused
+PROMPT_VERSION = "3"
+
+
 def get_vocab_chatbot_prompt(target_words: list[str], video_summary: str = "") -> list[dict]:
     """Build initial LLM context with the game host system prompt."""
     
@@ -33,18 +37,45 @@ def get_vocab_chatbot_prompt(target_words: list[str], video_summary: str = "") -
     ]
 
 
-def get_video_analysis_prompt(video_id: str, video_url: str, transcript: str, user_level: int) -> str:
-    """Build the prompt for video analysis and vocabulary extraction."""
-    return f"""
-            Your job is to extract exactly 20 Japanese vocabularies from the provided YouTube video transcript.
+def get_video_analysis_prompt(
+    video_id: str,
+    video_url: str,
+    transcript: str,
+    user_level: int,
+    candidates: list[str] | None = None,
+    excerpt: bool = False,
+) -> str:
+    """Build the prompt for video analysis and vocabulary extraction.
 
-            In your response, provide:
-            - title: The video title given the video_id: {video_id}
+    `candidates` are words the local pre-filter found at the requested level;
+    `excerpt` marks a transcript reduced to the lines containing them. An
+    excerpt prompt asks for the vocab only (see get_transcript_overview_prompt).
+    """
+    if excerpt:
+        response_fields = "- vocab: A list of exactly 20 vocabulary items"
+    else:
+        response_fields = f"""- title: The video title given the video_id: {video_id}
             - url: {video_url}
             - duration: The video duration in mm:ss format
             - tags: A list of relevant tags for the video content
             - summary: A concise summary of the video content (2-3 sentences)
-            - vocab: A list of exactly 20 vocabulary items
+            - vocab: A list of exactly 20 vocabulary items"""
+    hints = ""
+    if excerpt:
+        hints += (
+            f"\n            The transcript below is an excerpt of {video_url}: only lines containing likely "
+            f"N{user_level} vocabulary were kept."
+        )
+    if candidates:
+        hints += (
+            "\n            Locally detected candidate words (prefer these, but any word from the "
+            f"transcript is allowed): {', '.join(candidates)}"
+        )
+    return f"""
+            Your job is to extract exactly 20 Japanese vocabularies from the provided YouTube video transcript.
+
+            In your response, provide:
+            {response_fields}
 
             For each vocabulary item, extract:
             - japanese_vocab: The Japanese word or phrase in its original form
@@ -59,6 +90,76 @@ def get_video_analysis_prompt(video_id: str, video_url: str, transcript: str, us
             - Include adjectives and useful expressions
             - Ensure the timestamp accurately reflects when each word appears in the transcript
 
+            Each transcript line starts with its offset in seconds, e.g. [93] means 01:33.
+            Always report timestamps in mm:ss format.
+{hints}
+
             Transcript:
             {transcript}
         """
+
+
+def get_transcript_overview_prompt(video_id: str, video_url: str, duration: str, transcript: str) -> str:
+    """Build the prompt for video-level metadata from the whole transcript (used next to an excerpt prompt)."""
+    return f"""
+            You are given the transcript of a Japanese YouTube video.
+
+            In your response, provide:
+            - title: The video title given the video_id: {video_id}
+            - tags: A list of relevant tags for the video content
+            - summary: A concise summary of the whole video (2-3 sentences)
+
+            The video ({video_url}) is {duration} long.
+
+            Transcript:
+            {transcript}
+        """
+
+
+def get_vocab_candidates_prompt(transcript_chunk: str, user_level: int, max_candidates: int) -> str:
+    """Build the map-step prompt: candidate vocab and a partial summary for one transcript chunk."""
+    return f"""
+            You are given one section of a longer Japanese YouTube video transcript.
+
+            In your response, provide:
+            - summary: One or two sentences describing what happens in this section
+            - vocab: Up to {max_candidates} candidate vocabulary items from this section
+
+            For each vocabulary item, extract:
+            - japanese_vocab: The Japanese word or phrase in its original form
+            - pronunciation: The hiragana/katakana reading of the word
+            - english_translation: The English meaning
+            - timestamp: When the word is first spoken in this section, in mm:ss format
+            - jlpt_level: The JLPT level (1-5 for N1-N5)
+            - occurrences: How many times the word appears in this section
+
+            Prefer words at approximately JLPT N{user_level} level:
+            - Prioritize common, concrete nouns (objects, people, places, concepts)
+            - Prioritize high-frequency verbs (actions and states)
+            - Include adjectives and useful expressions
+            - Only use timestamps that appear in this section
+
+            Each transcript line starts with its offset in seconds, e.g. [93] means 01:33.
+            Always report timestamps in mm:ss format.
+
+            Transcript section:
+            {transcript_chunk}
+        """
+
+
+def get_video_overview_prompt(video_id: str, video_url: str, duration: str, section_summaries: list[str]) -> str:
+    """Build the reduce-step prompt: video-level metadata from per-section summaries."""
+    sections = "\n".join(f"{i + 1}. {summary}" for i, summary in enumerate(section_summaries))
+    return f"""
+            You are given summaries of consecutive sections of a Japanese YouTube video.
+
+            In your response, provide:
+            - title: The video title given the video_id: {video_id}
+            - tags: A list of relevant tags for the video content
+            - summary: A concise summary of the whole video (2-3 sentences)
+
+            The video ({video_url}) is {duration} long.
+
+            Section summaries:
+            {sections}
+        """
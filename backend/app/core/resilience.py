@@ -0,0 +1,247 @@
+"""Shared call policy for upstream services (Apify, Gemini, Daily).
+
+Every upstream call goes through an `Upstream`, which applies in order:
+
+1. Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive upstream
+   failures the circuit opens and calls fail fast with UpstreamUnavailableError
+   for CIRCUIT_RESET_SECONDS; then one probe call is let through (half-open)
+   and its outcome closes or re-opens the circuit.
+2. Per-attempt timeout (UpstreamTimeoutError).
+3. Hedging (idempotent calls only): if an attempt has not finished after
+   `hedge_after` seconds a second identical request is started and the first
+   success wins.
+4. Retries (idempotent calls only): transient failures (timeouts, transport
+   errors, HTTP 408/429/5xx) are retried with full-jitter exponential backoff.
+
+Client errors (other 4xx, bad input) are raised immediately and do not count
+against the breaker.
+"""
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamTimeoutError, UpstreamUnavailableError
+from app.core.logger import logger
+
+T = TypeVar("T")
+
+_RETRYABLE_STATUS = {408, 429}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return True for failures worth retrying (and counting against the breaker)."""
+    if isinstance(error, (UpstreamTimeoutError, asyncio.TimeoutError, httpx.TransportError, ConnectionError)):
+        return True
+    # DailyAPIError / ApifyApiError expose status_code, google-genai APIError exposes code
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status, int) and (status in _RETRYABLE_STATUS or status >= 500)
+
+
+@dataclass
+class UpstreamPolicy:
+    timeout: float  # seconds per attempt
+    retries: int = 0  # extra attempts for idempotent calls
+    hedge_after: float = 0  # seconds before a hedged request is sent; 0 disables
+    backoff_base: float = settings.RETRY_BACKOFF_BASE_SECONDS
+    backoff_max: float = settings.RETRY_BACKOFF_MAX_SECONDS
+    failure_threshold: int = settings.CIRCUIT_FAILURE_THRESHOLD
+    reset_timeout: float = settings.CIRCUIT_RESET_SECONDS
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half_open -> closed)."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed; in half-open only one probe is allowed."""
+        with self._lock:
+            if self.state == "open" and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self.opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = self._clock()
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+            }
+
+
+class Upstream:
+    """One upstream service: its policy, circuit breaker and counters."""
+
+    def __init__(self, name: str, policy: UpstreamPolicy):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("calls", "successes", "failures", "timeouts", "retries", "hedges", "hedge_wins", "rejected"), 0
+        )
+
+    async def call(self, fn: Callable[[], Awaitable[T]], *, stage: str, idempotent: bool) -> T:
+        """
+        Run `fn()` under this upstream's policy.
+
+        Args:
+            fn: Zero-argument coroutine factory; called once per attempt (and hedge)
+            stage: Human-readable stage name used in errors and logs
+            idempotent: Whether repeating the request is safe (enables retries and hedging)
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            UpstreamUnavailableError: If the circuit is open
+            UpstreamTimeoutError: If the last attempt timed out
+        """
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise UpstreamUnavailableError(self.name, self.breaker.retry_after())
+
+        attempts = 1 + (self.policy.retries if idempotent else 0)
+        for attempt in range(1, attempts + 1):
+            try:
+                result = await self._attempt(fn, stage, hedge=idempotent and self.policy.hedge_after > 0)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    # The upstream answered; the request itself was bad
+                    self.breaker.release()
+                    raise
+                self._count("failures")
+                self.breaker.record_failure()
+                if attempt == attempts or not self.breaker.allow():
+                    raise
+                delay = random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * 2 ** (attempt - 1)))
+                logger.warning(
+                    f"{stage} failed ({type(e).__name__}: {e}); retry {attempt}/{attempts - 1} in {delay:.2f}s"
+                )
+                self._count("retries")
+                await asyncio.sleep(delay)
+                continue
+            self._count("successes")
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], stage: str, hedge: bool) -> T:
+        try:
+            if not hedge:
+                return await asyncio.wait_for(fn(), self.policy.timeout)
+            return await asyncio.wait_for(self._hedged(fn, stage), self.policy.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise UpstreamTimeoutError(stage, self.policy.timeout)
+
+    async def _hedged(self, fn: Callable[[], Awaitable[T]], stage: str) -> T:
+        primary = asyncio.ensure_future(fn())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.policy.hedge_after)
+            if not done:
+                logger.info(f"{stage} slower than {self.policy.hedge_after:.1f}s; sending hedged request")
+                self._count("hedges")
+                tasks.add(asyncio.ensure_future(fn()))
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"breaker": self.breaker.stats(), **counters}
+
+
+apify_upstream = Upstream(
+    "apify",
+    UpstreamPolicy(timeout=settings.TRANSCRIPT_TIMEOUT_SECONDS),
+)
+gemini_upstream = Upstream(
+    "gemini",
+    UpstreamPolicy(
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        retries=settings.GEMINI_MAX_RETRIES,
+        hedge_after=settings.GEMINI_HEDGE_AFTER_SECONDS,
+    ),
+)
+daily_upstream = Upstream(
+    "daily",
+    UpstreamPolicy(
+        timeout=settings.DAILY_TIMEOUT_SECONDS,
+        retries=settings.DAILY_MAX_RETRIES,
+        hedge_after=settings.DAILY_HEDGE_AFTER_SECONDS,
+    ),
+)
+
+
+def upstream_stats() -> dict:
+    """Return breaker state and retry/hedge counters per upstream."""
+    return {upstream.name: upstream.stats() for upstream in (apify_upstream, gemini_upstream, daily_upstream)}
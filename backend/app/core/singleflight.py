@@ -0,0 +1,65 @@
+"""Single-flight coalescing of concurrent identical async calls."""
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key.
+
+    The first caller for a key (the leader) starts the call; callers arriving
+    while it is running await the same task and receive the same result or
+    exception. A caller being cancelled does not cancel the shared call.
+    `on_forget(key)` runs in the same step that drops a finished call, so
+    per-key state kept next to the flight goes away together with it.
+    """
+
+    def __init__(self, on_forget: Optional[Callable[[Hashable], None]] = None):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._on_forget = on_forget
+        self.leaders = 0
+        self.saved = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call for `key` is currently running."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn()` for `key`, or join the call already running for it.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine factory, only invoked by the leader
+
+        Returns:
+            The shared result of `fn()`
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.leaders += 1
+        else:
+            self.saved += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            if self._on_forget is not None:
+                self._on_forget(key)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return leader/saved counters and the number of calls in flight."""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "saved": self.saved,
+        }
@@ -31,7 +31,8 @@ def init_schema(conn: sqlite3.Connection) -> None:
             video_url TEXT NOT NULL,
             duration TEXT NOT NULL,
             summary TEXT,
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            updated_at TEXT
         );
 
         CREATE TABLE IF NOT EXISTS vocabs (
@@ -52,5 +53,90 @@ def init_schema(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (video_id) REFERENCES videos(id),
             FOREIGN KEY (vocab_id) REFERENCES vocabs(id)
         );
+
+        CREATE TABLE IF NOT EXISTS transcript_blobs (
+            content_hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS transcripts (
+            youtube_video_id TEXT NOT NULL,
+            target_language TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            PRIMARY KEY (youtube_video_id, target_language),
+            FOREIGN KEY (content_hash) REFERENCES transcript_blobs(content_hash)
+        );
+
+        CREATE TABLE IF NOT EXISTS analysis_jobs (
+            id TEXT PRIMARY KEY,
+            video_url TEXT NOT NULL,
+            user_level INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            options TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS analysis_results (
+            youtube_video_id TEXT NOT NULL,
+            user_level INTEGER NOT NULL,
+            prompt_version TEXT NOT NULL,
+            result BLOB NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (youtube_video_id, user_level, prompt_version)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status
+            ON analysis_jobs (status, created_at);
+
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            id TEXT PRIMARY KEY,
+            learner_id TEXT NOT NULL,
+            target_count INTEGER NOT NULL,
+            words_used INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT NOT NULL,
+            ended_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS vocab_attempts (
+            session_id TEXT NOT NULL,
+            vocab_id TEXT NOT NULL,
+            learner_id TEXT NOT NULL,
+            used INTEGER NOT NULL DEFAULT 0,
+            attempted_at TEXT NOT NULL,
+            used_at TEXT,
+            PRIMARY KEY (session_id, vocab_id),
+            FOREIGN KEY (session_id) REFERENCES chat_sessions(id),
+            FOREIGN KEY (vocab_id) REFERENCES vocabs(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_chat_sessions_learner
+            ON chat_sessions (learner_id, started_at);
+
+        -- Covers the per-learner mastery aggregation without touching the table
+        CREATE INDEX IF NOT EXISTS idx_vocab_attempts_learner
+            ON vocab_attempts (learner_id, vocab_id, used, attempted_at, used_at);
     """)
+    _add_missing_columns(conn)
     conn.commit()
+
+
+# Columns added after their table was first shipped: (table, column, definition).
+# CREATE TABLE IF NOT EXISTS leaves existing tables alone, so they are added here.
+_ADDED_COLUMNS = [
+    ("analysis_jobs", "options", "TEXT"),
+    ("videos", "updated_at", "TEXT"),  # NULL for rows saved before it existed: created_at applies
+]
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, column, definition in _ADDED_COLUMNS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
@@ -1,8 +1,11 @@
 """Repository helpers for vocab DB writes."""
+import json
 import sqlite3
 import uuid
 from datetime import datetime, timezone
 
+from app.schemas.video import Video, Vocab
+
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -17,7 +20,7 @@ def ensure_video(
     duration: str,
     summary: str | None = None,
 ) -> str:
-    """Get or create video row; return internal id."""
+    """Get or create video row (stamping updated_at); return internal id."""
     row = conn.execute(
         "SELECT id FROM videos WHERE youtube_video_id = ?",
         (youtube_video_id,),
@@ -26,21 +29,74 @@ def ensure_video(
         # Update existing video with new data
         conn.execute(
             """UPDATE videos 
-               SET title = ?, tags = ?, video_url = ?, duration = ?, summary = ?
+               SET title = ?, tags = ?, video_url = ?, duration = ?, summary = ?, updated_at = ?
                WHERE id = ?""",
-            (title, ",".join(tags), video_url, duration, summary, row[0]),
+            (title, ",".join(tags), video_url, duration, summary, _now(), row[0]),
         )
         return row[0]
     video_id = str(uuid.uuid4())
+    now = _now()
     conn.execute(
         """INSERT INTO videos 
-           (id, youtube_video_id, title, tags, video_url, duration, summary, created_at) 
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (video_id, youtube_video_id, title, ",".join(tags), video_url, duration, summary, _now()),
+           (id, youtube_video_id, title, tags, video_url, duration, summary, created_at, updated_at) 
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (video_id, youtube_video_id, title, ",".join(tags), video_url, duration, summary, now, now),
     )
     return video_id
 
 
+def get_video_with_vocab(conn: sqlite3.Connection, video_id: str) -> tuple[Video, str] | None:
+    """
+    Load a video and all its vocab by internal UUID or YouTube video ID.
+    Returns (video, updated_at) or None if the video does not exist; updated_at
+    is when the video was last saved (its created_at for rows that predate it).
+    """
+    row = conn.execute(
+        """SELECT id, youtube_video_id, title, tags, video_url, duration, summary,
+                  COALESCE(updated_at, created_at)
+           FROM videos
+           WHERE id = ? OR youtube_video_id = ?""",
+        (video_id, video_id),
+    ).fetchone()
+    if not row:
+        return None
+
+    vocab_rows = conn.execute(
+        """
+        SELECT v.id, v.japanese_vocab, v.pronunciation, v.english_translation, v.jlpt_level, vv.timestamp,
+               vv.sentence
+        FROM vocabs v
+        JOIN video_vocab vv ON vv.vocab_id = v.id
+        WHERE vv.video_id = ?
+        ORDER BY vv.timestamp
+        """,
+        (row[0],),
+    ).fetchall()
+
+    video = Video(
+        id=row[0],
+        video_id=row[1],
+        title=row[2],
+        tags=row[3].split(",") if row[3] else [],
+        video_url=row[4],
+        duration=row[5],
+        summary=row[6] or "",
+        vocab=[
+            Vocab(
+                id=r[0],
+                japanese_vocab=r[1],
+                pronunciation=r[2] or "",
+                english_translation=r[3] or "",
+                timestamp=r[5],
+                jlpt_level=r[4] or 5,
+                sentence=r[6],
+            )
+            for r in vocab_rows
+        ],
+    )
+    return video, row[7]
+
+
 def ensure_vocab(
     conn: sqlite3.Connection,
     japanese_vocab: str,
@@ -79,3 +135,247 @@ def link_video_vocab(
         "INSERT OR IGNORE INTO video_vocab (video_id, vocab_id, timestamp, sentence) VALUES (?, ?, ?, ?)",
         (video_id, vocab_id, timestamp, sentence),
     )
+
+
+def save_video(conn: sqlite3.Connection, video: Video) -> str:
+    """Upsert a video with all its vocab and links (no commit); return internal id."""
+    internal_video_id = ensure_video(
+        conn,
+        youtube_video_id=video.video_id,
+        title=video.title,
+        tags=video.tags,
+        video_url=video.video_url,
+        duration=video.duration,
+        summary=video.summary,
+    )
+    for item in video.vocab:
+        vocab_id = ensure_vocab(
+            conn,
+            japanese_vocab=item.japanese_vocab,
+            pronunciation=item.pronunciation,
+            english_translation=item.english_translation,
+            jlpt_level=item.jlpt_level,
+        )
+        link_video_vocab(
+            conn,
+            video_id=internal_video_id,
+            vocab_id=vocab_id,
+            timestamp=item.timestamp,
+            sentence=item.sentence,
+        )
+    return internal_video_id
+
+
+def get_transcript_blob(
+    conn: sqlite3.Connection,
+    youtube_video_id: str,
+    target_language: str,
+) -> bytes | None:
+    """Return the compressed transcript for a video/language pair, if stored."""
+    row = conn.execute(
+        """SELECT b.data
+           FROM transcripts t
+           JOIN transcript_blobs b ON b.content_hash = t.content_hash
+           WHERE t.youtube_video_id = ? AND t.target_language = ?""",
+        (youtube_video_id, target_language),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def save_transcript_blob(
+    conn: sqlite3.Connection,
+    youtube_video_id: str,
+    target_language: str,
+    content_hash: str,
+    data: bytes,
+) -> None:
+    """Store a compressed transcript blob and point the video/language pair at it."""
+    now = _now()
+    conn.execute(
+        "INSERT OR IGNORE INTO transcript_blobs (content_hash, data, created_at) VALUES (?, ?, ?)",
+        (content_hash, data, now),
+    )
+    conn.execute(
+        """INSERT INTO transcripts (youtube_video_id, target_language, content_hash, fetched_at)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT (youtube_video_id, target_language)
+           DO UPDATE SET content_hash = excluded.content_hash, fetched_at = excluded.fetched_at""",
+        (youtube_video_id, target_language, content_hash, now),
+    )
+
+
+_JOB_COLUMNS = "id, video_url, user_level, status, stage, result, error, created_at, updated_at, options"
+
+
+def _job_row_to_dict(row: tuple) -> dict:
+    keys = [c.strip() for c in _JOB_COLUMNS.split(",")]
+    job = dict(zip(keys, row))
+    job["options"] = json.loads(job["options"]) if job["options"] else {}
+    return job
+
+
+def create_analysis_job(
+    conn: sqlite3.Connection, video_url: str, user_level: int, options: dict | None = None
+) -> dict:
+    """
+    Insert a queued analysis job; return it as a dict.
+
+    Args:
+        options: Extra analyze_video keyword arguments (chunked, force_refresh, ...), stored as JSON
+    """
+    now = _now()
+    job_id = str(uuid.uuid4())
+    conn.execute(
+        f"INSERT INTO analysis_jobs ({_JOB_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (job_id, video_url, user_level, "queued", "queued", None, None, now, now, json.dumps(options or {})),
+    )
+    return get_analysis_job(conn, job_id)
+
+
+def update_analysis_job(
+    conn: sqlite3.Connection,
+    job_id: str,
+    status: str,
+    stage: str,
+    result: str | None = None,
+    error: str | None = None,
+) -> None:
+    """Record a job's latest status/stage (and result or error when finished)."""
+    conn.execute(
+        """UPDATE analysis_jobs
+           SET status = ?, stage = ?, result = COALESCE(?, result), error = ?, updated_at = ?
+           WHERE id = ?""",
+        (status, stage, result, error, _now(), job_id),
+    )
+
+
+def get_analysis_job(conn: sqlite3.Connection, job_id: str) -> dict | None:
+    """Return a job row as a dict, or None if unknown."""
+    row = conn.execute(
+        f"SELECT {_JOB_COLUMNS} FROM analysis_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    return _job_row_to_dict(row) if row else None
+
+
+def list_unfinished_analysis_jobs(conn: sqlite3.Connection) -> list[dict]:
+    """Return queued or interrupted jobs, oldest first."""
+    rows = conn.execute(
+        f"""SELECT {_JOB_COLUMNS} FROM analysis_jobs
+            WHERE status IN ('queued', 'running')
+            ORDER BY created_at"""
+    ).fetchall()
+    return [_job_row_to_dict(row) for row in rows]
+
+
+def get_analysis_result(
+    conn: sqlite3.Connection,
+    youtube_video_id: str,
+    user_level: int,
+    prompt_version: str,
+) -> tuple[bytes, str] | None:
+    """Return (compressed result, created_at) for a cached analysis, if any."""
+    row = conn.execute(
+        """SELECT result, created_at FROM analysis_results
+           WHERE youtube_video_id = ? AND user_level = ? AND prompt_version = ?""",
+        (youtube_video_id, user_level, prompt_version),
+    ).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def save_analysis_result(
+    conn: sqlite3.Connection,
+    youtube_video_id: str,
+    user_level: int,
+    prompt_version: str,
+    result: bytes,
+) -> str:
+    """Upsert a cached analysis result; return its created_at timestamp."""
+    now = _now()
+    conn.execute(
+        """INSERT INTO analysis_results (youtube_video_id, user_level, prompt_version, result, created_at)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (youtube_video_id, user_level, prompt_version)
+           DO UPDATE SET result = excluded.result, created_at = excluded.created_at""",
+        (youtube_video_id, user_level, prompt_version, result, now),
+    )
+    return now
+
+
+def start_chat_session(
+    conn: sqlite3.Connection,
+    session_id: str,
+    learner_id: str,
+    target_words: list[str],
+    started_at: str,
+) -> None:
+    """Record a chat session and one attempt per target word that is in `vocabs` (no commit)."""
+    conn.execute(
+        """INSERT OR IGNORE INTO chat_sessions (id, learner_id, target_count, started_at)
+           VALUES (?, ?, ?, ?)""",
+        (session_id, learner_id, len(target_words), started_at),
+    )
+    # Words the client made up (or the bot's defaults) have no vocab row and are not tracked
+    placeholders = ", ".join("?" * len(target_words))
+    conn.execute(
+        f"""INSERT OR IGNORE INTO vocab_attempts (session_id, vocab_id, learner_id, attempted_at)
+            SELECT ?, id, ?, ? FROM vocabs WHERE japanese_vocab IN ({placeholders})""",
+        (session_id, learner_id, started_at, *target_words),
+    )
+
+
+def mark_vocab_used(conn: sqlite3.Connection, session_id: str, japanese_vocab: str, used_at: str) -> None:
+    """Record that the learner used a target word in a session (no commit); first use wins."""
+    conn.execute(
+        """UPDATE vocab_attempts SET used = 1, used_at = ?
+           WHERE session_id = ? AND used = 0
+             AND vocab_id = (SELECT id FROM vocabs WHERE japanese_vocab = ?)""",
+        (used_at, session_id, japanese_vocab),
+    )
+
+
+def end_chat_session(
+    conn: sqlite3.Connection,
+    session_id: str,
+    words_used: int,
+    completed: bool,
+    ended_at: str,
+) -> None:
+    """Close a chat session row (no commit)."""
+    conn.execute(
+        "UPDATE chat_sessions SET words_used = ?, completed = ?, ended_at = ? WHERE id = ?",
+        (words_used, int(completed), ended_at, session_id),
+    )
+
+
+_MASTERY_COLUMNS = "vocab_id, japanese_vocab, attempts, times_used, mastery, last_attempt_at, last_used_at"
+
+
+def get_learner_mastery(
+    conn: sqlite3.Connection,
+    learner_id: str,
+    vocab_id: str | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """
+    Per-word practice record for a learner, least mastered (then least recently practised) first.
+
+    `mastery` is the share of the learner's sessions with the word in which
+    they used it. The aggregation reads only idx_vocab_attempts_learner.
+    """
+    rows = conn.execute(
+        """SELECT a.vocab_id, v.japanese_vocab, a.attempts, a.times_used,
+                  CAST(a.times_used AS REAL) / a.attempts, a.last_attempt_at, a.last_used_at
+           FROM (
+               SELECT vocab_id, COUNT(*) AS attempts, SUM(used) AS times_used,
+                      MAX(attempted_at) AS last_attempt_at, MAX(used_at) AS last_used_at
+               FROM vocab_attempts
+               WHERE learner_id = ? AND (? IS NULL OR vocab_id = ?)
+               GROUP BY vocab_id
+           ) a
+           JOIN vocabs v ON v.id = a.vocab_id
+           ORDER BY 5, a.last_attempt_at
+           LIMIT ?""",
+        (learner_id, vocab_id, vocab_id, -1 if limit is None else limit),
+    ).fetchall()
+    keys = [c.strip() for c in _MASTERY_COLUMNS.split(",")]
+    return [dict(zip(keys, row)) for row in rows]
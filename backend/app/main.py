@@ -1,4 +1,5 @@
 """FastAPI application entry point."""
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -8,9 +9,22 @@ from fastapi.responses import JSONResponse
 from app.api.routes import api_router
 from app.core.config import settings
 from app.core.exceptions import AppException
+from app.core.executor import run_blocking, shutdown_executor
 from app.core.logger import logger
 from app.core.middleware import LoggingMiddleware
 from app.db import get_connection, init_schema
+from app.services import daily, gemini, youtube
+from app.services.analysis_jobs import analysis_jobs
+from app.services.bot_pool import bot_pool
+from app.services.chunker import get_encoding
+from app.services.room_pool import room_pool
+
+
+def _warm_up_clients() -> None:
+    """Import the upstream SDKs and build their clients and the tokenizer off the request path."""
+    gemini.get_client()
+    youtube.get_apify_client()
+    get_encoding()
 
 
 @asynccontextmanager
@@ -21,6 +35,8 @@ async def lifespan(app: FastAPI):
     try:
         settings.validate()
         logger.info("Configuration validated successfully")
+        if settings.FAKE_UPSTREAMS_URL:
+            logger.warning(f"Offline mode: Apify, Gemini and Daily served by {settings.FAKE_UPSTREAMS_URL}")
     except ValueError as e:
         logger.error(f"Configuration validation failed: {e}")
         raise
@@ -33,10 +49,39 @@ async def lifespan(app: FastAPI):
     finally:
         conn.close()
 
+    # Start background analysis workers (resumes jobs left over from a restart)
+    await analysis_jobs.start()
+
+    # Keep Daily rooms with bot tokens ready for /vocab-live-chat/start
+    daily.get_http_client()
+    await room_pool.start()
+
+    # Bot workers with pipecat and the turn models loaded, so bots join without a cold start
+    if settings.BOT_SPAWN_ENABLED:
+        await bot_pool.start()
+
+    # Heavy clients are created lazily; warm them in the background so the
+    # worker starts serving (e.g. /health) right away and first requests don't pay for it
+    warm_up = None
+    if settings.CLIENT_WARM_UP_ENABLED:
+        warm_up = asyncio.create_task(run_blocking(_warm_up_clients, stage="client warm-up"))
+        warm_up.add_done_callback(
+            lambda task: task.cancelled() or task.exception() is None
+            or logger.warning(f"Client warm-up failed: {task.exception()}")
+        )
+
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    await analysis_jobs.stop()
+    await bot_pool.stop()
+    await room_pool.stop()
+    await daily.close_http_client()
+    await gemini.close_client()
+    shutdown_executor()
 
 
 def create_app() -> FastAPI:
@@ -73,6 +118,7 @@ def create_app() -> FastAPI:
         return JSONResponse(
             status_code=exc.status_code,
             content={"error": exc.message},
+            headers=getattr(exc, "headers", None),
         )
 
     @app.exception_handler(Exception)
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class VocabMastery(BaseModel):
+    """A learner's practice record for one vocab item across chat sessions"""
+    vocab_id: str
+    japanese_vocab: str
+    attempts: int  # sessions in which the word was a target
+    times_used: int  # of those, sessions in which the learner said it
+    mastery: float  # times_used / attempts
+    last_attempt_at: str
+    last_used_at: str | None = None
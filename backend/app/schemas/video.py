@@ -7,6 +7,18 @@ class BaseGeminiRequest(BaseModel):
 class VideoAnalysisRequest(BaseGeminiRequest):
     video_url: str
     user_level: int #1-5 for (n1-n5)
+    background: bool = False  # return a job id immediately instead of the Video
+    chunked: bool | None = None  # force map-reduce analysis on/off (None = by transcript length)
+    force_refresh: bool = False  # skip stored results and re-run the analysis
+    max_age_seconds: int | None = None  # reject stored results older than this (None = server default)
+    any_level: bool = False  # also serve a video saved via POST /videos, analyzed for an unknown level
+
+class VideoBatchAnalysisRequest(BaseGeminiRequest):
+    video_urls: list[str]
+    user_level: int #1-5 for (n1-n5)
+    chunked: bool | None = None
+    force_refresh: bool = False
+    max_age_seconds: int | None = None
 
 class Vocab(BaseModel):
     """Vocabulary item with optional internal ID for DB responses"""
@@ -16,6 +28,26 @@ class Vocab(BaseModel):
     english_translation: str
     timestamp: str
     jlpt_level: int  # 1-5 for (n1-n5)
+    sentence: str | None = None  # transcript line the word appears in (filled locally)
+
+class VocabCandidate(Vocab):
+    """Per-chunk vocab candidate produced by the map step of chunked analysis"""
+    occurrences: int = 1
+
+class ChunkCandidates(BaseModel):
+    """Map-step output for one transcript chunk"""
+    summary: str
+    vocab: list[VocabCandidate]
+
+class VideoOverview(BaseModel):
+    """Reduce-step output: video-level metadata without vocab"""
+    title: str
+    tags: list[str]
+    summary: str
+
+class VideoVocab(BaseModel):
+    """Vocab-only output of a single-shot analysis of a pre-filtered excerpt"""
+    vocab: list[Vocab]
 
 class Video(BaseModel):
     """Video with vocab, supports both ingestion and retrieval"""
@@ -38,4 +70,26 @@ class VideoSummary(BaseModel):
 class VideoCreateResponse(BaseModel):
     """Response after creating a video"""
     ok: bool
-    video_id: str  # internal UUID
\ No newline at end of file
+    video_id: str  # internal UUID
+
+class AnalysisJob(BaseModel):
+    """Background video analysis job (POST /video_analysis with background=true)"""
+    job_id: str
+    status: str  # queued | running | completed | failed
+    stage: str  # queued | started | cached | transcript_fetched | llm_started | parsed | persisted | failed
+    video_url: str
+    user_level: int
+    result: Video | None = None
+    error: str | None = None
+    created_at: str
+    updated_at: str
+
+class BatchAnalysisItem(BaseModel):
+    """One NDJSON line of POST /video_analysis/batch"""
+    index: int  # position in the request's video_urls
+    video_url: str
+    status: str  # completed | failed
+    cached: bool = False  # served from a stored analysis
+    id: str | None = None  # internal video UUID once persisted
+    result: Video | None = None
+    error: str | None = None
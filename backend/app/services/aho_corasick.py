@@ -0,0 +1,65 @@
+"""Aho-Corasick multi-pattern string matcher."""
+from collections import deque
+from typing import Hashable, Iterable, Iterator
+
+
+class AhoCorasick:
+    """
+    Find every occurrence of many patterns in one left-to-right pass.
+
+    Build once with the patterns (each mapped to a caller-defined key), then
+    call `iter_matches` on any number of texts. Matching is linear in the text
+    length plus the number of matches reported.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, Hashable]]):
+        # Node 0 is the root; per-node transition dicts, failure links and outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[Hashable, int]]] = [[]]
+
+        for pattern, key in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((key, len(pattern)))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches that end at the failure state (suffix patterns)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, Hashable]]:
+        """
+        Yield (start, end, key) for every pattern occurrence, ordered by `end`.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                end = index + 1
+                for key, length in out[node]:
+                    yield end - length, end, key
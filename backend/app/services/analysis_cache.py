@@ -0,0 +1,125 @@
+"""Read-through store of finished video analyses.
+
+Lookups check, in order: the in-memory LRU, the `analysis_results` table
+(keyed by YouTube video id, user level and PROMPT_VERSION) and finally, for
+callers that accept an analysis made for any level, the `videos` table
+populated by POST /videos (which does not record a level). Only when these
+miss (or the caller forces a refresh / the stored result is too old) does the
+analysis pipeline reach Apify and Gemini.
+"""
+import threading
+import zlib
+from datetime import datetime, timezone
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.prompts import PROMPT_VERSION
+from app.db import get_connection
+from app.db.repositories import get_analysis_result, get_video_with_vocab, save_analysis_result
+from app.schemas.video import Video
+
+
+def _age_seconds(created_at: str) -> float:
+    created = datetime.fromisoformat(created_at)
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - created).total_seconds()
+
+
+def _is_fresh(created_at: str, max_age_seconds: int | None) -> bool:
+    if not max_age_seconds:
+        return True
+    return _age_seconds(created_at) <= max_age_seconds
+
+
+class AnalysisResultCache:
+    """Memory + SQLite cache of Video analyses with per-source hit counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        # (video_id, user_level, prompt_version) -> (compressed Video JSON, created_at); decoded per hit
+        # so a caller changing the Video it gets doesn't change the cached entry
+        self._memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self.db_hits = 0
+        self.video_table_hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(
+        self, video_id: str, user_level: int, max_age_seconds: int | None, any_level: bool = False
+    ) -> Video | None:
+        """
+        Return a stored analysis no older than `max_age_seconds`, or None.
+
+        With `any_level`, a video saved through POST /videos is returned
+        whatever level it was analyzed for.
+
+        Blocking (SQLite); call through run_blocking from async code.
+        """
+        key = (video_id, user_level, PROMPT_VERSION)
+        cached = self._memory.get(key)
+        if cached is not None:
+            blob, created_at = cached
+            if _is_fresh(created_at, max_age_seconds):
+                return Video.model_validate_json(zlib.decompress(blob))
+            self._count("stale")
+
+        conn = get_connection()
+        try:
+            stored = get_analysis_result(conn, video_id, user_level, PROMPT_VERSION)
+            if stored is not None:
+                blob, created_at = stored
+                if _is_fresh(created_at, max_age_seconds):
+                    video = Video.model_validate_json(zlib.decompress(blob))
+                    self._memory.set(key, (blob, created_at))
+                    self._count("db_hits")
+                    return video
+                self._count("stale")
+
+            # Videos saved through POST /videos (user level is not recorded there)
+            found = get_video_with_vocab(conn, video_id) if any_level else None
+        finally:
+            conn.close()
+
+        if found is not None:
+            video, updated_at = found  # re-saving a video makes it fresh again
+            if _is_fresh(updated_at, max_age_seconds):
+                self._count("video_table_hits")
+                return video
+            self._count("stale")
+
+        self._count("misses")
+        return None
+
+    def put(self, video_id: str, user_level: int, video: Video) -> None:
+        """Persist a fresh analysis and warm the memory tier. Blocking (SQLite)."""
+        blob = zlib.compress(video.model_dump_json().encode("utf-8"), 6)
+        conn = get_connection()
+        try:
+            created_at = save_analysis_result(conn, video_id, user_level, PROMPT_VERSION, blob)
+            conn.commit()
+        finally:
+            conn.close()
+        self._memory.set((video_id, user_level, PROMPT_VERSION), (blob, created_at))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for each tier."""
+        memory = self._memory.stats()
+        with self._lock:
+            return {
+                "memory": memory,
+                "db_hits": self.db_hits,
+                "video_table_hits": self.video_table_hits,
+                "stale": self.stale,
+                "misses": self.misses,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+analysis_cache = AnalysisResultCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
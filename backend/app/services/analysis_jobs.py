@@ -0,0 +1,219 @@
+"""Background job queue for video analysis with progress events.
+
+Jobs are persisted in the `analysis_jobs` table before they are queued, so a
+restart re-queues anything that was queued or interrupted mid-run. A fixed
+number of worker tasks (ANALYSIS_JOB_CONCURRENCY) drain the queue, and every
+stage transition is both written to the database and fanned out to live
+subscribers (the SSE endpoint).
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.executor import run_blocking
+from app.core.logger import logger
+from app.db import get_connection
+from app.db.repositories import (
+    create_analysis_job,
+    get_analysis_job,
+    list_unfinished_analysis_jobs,
+    update_analysis_job,
+)
+from app.services.video_analysis import analyze_video
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def _create_job(video_url: str, user_level: int, options: dict) -> dict:
+    conn = get_connection()
+    try:
+        job = create_analysis_job(conn, video_url, user_level, options)
+        conn.commit()
+        return job
+    finally:
+        conn.close()
+
+
+def _update_job(job_id: str, status: str, stage: str, result: str | None = None, error: str | None = None) -> None:
+    conn = get_connection()
+    try:
+        update_analysis_job(conn, job_id, status, stage, result=result, error=error)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _load_job(job_id: str) -> dict | None:
+    conn = get_connection()
+    try:
+        return get_analysis_job(conn, job_id)
+    finally:
+        conn.close()
+
+
+def _load_unfinished_jobs() -> list[dict]:
+    conn = get_connection()
+    try:
+        return list_unfinished_analysis_jobs(conn)
+    finally:
+        conn.close()
+
+
+class AnalysisJobQueue:
+    """Persistent, concurrency-limited queue of video analysis jobs."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._queue: asyncio.Queue[dict] | None = None
+        self._workers: list[asyncio.Task] = []
+        # job_id -> events emitted so far / live subscriber queues
+        self._history: dict[str, list[dict]] = {}
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+
+    async def start(self) -> None:
+        """Re-queue unfinished jobs from the database and start the workers."""
+        self._queue = asyncio.Queue()
+        for job in await run_blocking(_load_unfinished_jobs, stage="job recovery"):
+            logger.info(f"Re-queueing analysis job {job['id']} ({job['status']})")
+            self._history[job["id"]] = []
+            self._queue.put_nowait(job)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"analysis-job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Analysis job queue started with {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers. Running jobs stay 'running' and are resumed on next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, video_url: str, user_level: int, **options) -> dict:
+        """
+        Persist a new job and enqueue it; return the job row.
+
+        Args:
+            options: analyze_video keyword arguments (chunked, force_refresh,
+                max_age_seconds, any_level), kept with the job so a re-queued
+                job runs the same way
+        """
+        if self._queue is None:
+            raise RuntimeError("Analysis job queue is not running")
+        job = await run_blocking(_create_job, video_url, user_level, options, stage="job create")
+        self._history[job["id"]] = []
+        await self._publish(job["id"], "queued", "queued")
+        self._queue.put_nowait(job)
+        logger.info(f"Queued analysis job {job['id']} for {video_url}")
+        return job
+
+    async def get(self, job_id: str) -> dict | None:
+        """Return the persisted job, with `result` decoded from JSON."""
+        job = await run_blocking(_load_job, job_id, stage="job lookup")
+        if job and job["result"]:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Yield stage events for a job: the ones emitted so far, then live ones
+        until the job reaches a terminal status.
+        """
+        if job_id not in self._history:
+            # Job finished before we were asked (or in a previous process)
+            job = await self.get(job_id)
+            if job:
+                yield self._event(job_id, job["status"], job["stage"], job["error"])
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            for event in list(self._history.get(job_id, [])):
+                yield event
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def stats(self) -> dict:
+        """Return queue depth and worker counts."""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers),
+            "tracked_jobs": len(self._history),
+        }
+
+    @staticmethod
+    def _event(job_id: str, status: str, stage: str, error: str | None = None) -> dict:
+        event = {
+            "job_id": job_id,
+            "status": status,
+            "stage": stage,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        if error:
+            event["error"] = error
+        return event
+
+    async def _publish(
+        self,
+        job_id: str,
+        status: str,
+        stage: str,
+        result: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        if status != "queued":
+            await run_blocking(_update_job, job_id, status, stage, result, error, stage="job update")
+        event = self._event(job_id, status, stage, error)
+        self._history.setdefault(job_id, []).append(event)
+        for queue in self._subscribers.get(job_id, []):
+            queue.put_nowait(event)
+        if status in TERMINAL_STATUSES:
+            # Late subscribers fall back to the persisted row
+            self._history.pop(job_id, None)
+
+    async def _run(self, job: dict) -> None:
+        job_id = job["id"]
+
+        async def on_stage(stage: str) -> None:
+            await self._publish(job_id, "running", stage)
+
+        await self._publish(job_id, "running", "started")
+        try:
+            video = await analyze_video(job["video_url"], job["user_level"], on_stage=on_stage, **job["options"])
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed: {type(e).__name__}: {e}")
+            await self._publish(job_id, "failed", "failed", error=getattr(e, "message", str(e)))
+            return
+        # The result row is written before the event goes out, so "persisted" is final
+        await self._publish(job_id, "completed", "persisted", result=video.model_dump_json())
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Analysis job worker {index} crashed on job {job['id']}")
+            finally:
+                self._queue.task_done()
+
+
+analysis_jobs = AnalysisJobQueue(concurrency=settings.ANALYSIS_JOB_CONCURRENCY)
@@ -0,0 +1,155 @@
+"""Batch video analysis with pipelined transcript, LLM and persistence stages.
+
+Every distinct video in the batch runs as its own task through three stages:
+
+1. transcript: Apify fetch, compaction and pre-filter, at most
+   BATCH_FETCH_CONCURRENCY at a time
+2. llm: Gemini analysis and local alignment, at most BATCH_LLM_CONCURRENCY at
+   a time
+3. persist: a single writer drains finished analyses and stores up to
+   BATCH_PERSIST_MAX_ITEMS per SQLite transaction via `save_video`
+   (ensure_video / ensure_vocab / link_video_vocab)
+
+Because the stages have separate limits, later videos wait on Apify while
+earlier ones are with Gemini. Stored analyses (see analysis_cache) skip the
+first two stages. One result per requested URL is yielded as soon as it is
+persisted (or fails), in completion order.
+"""
+import asyncio
+import sqlite3
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.executor import run_blocking
+from app.core.logger import logger
+from app.db import get_connection
+from app.db.repositories import save_video
+from app.schemas.video import BatchAnalysisItem, Video
+from app.services.analysis_cache import analysis_cache
+from app.services.video_analysis import prepare_transcript, run_llm_analysis
+from app.services.youtube import extract_video_id
+
+
+def _save_videos(videos: list[Video]) -> list[str | Exception]:
+    """Persist analyses in one transaction; a failing video only rolls back itself."""
+    conn = get_connection()
+    try:
+        # Take the write lock up front: a deferred transaction that reads first
+        # fails immediately with "database is locked" if another writer is active
+        conn.execute("BEGIN IMMEDIATE")
+        saved: list[str | Exception] = []
+        for video in videos:
+            conn.execute("SAVEPOINT batch_item")
+            try:
+                saved.append(save_video(conn, video))
+                conn.execute("RELEASE batch_item")
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO batch_item")
+                conn.execute("RELEASE batch_item")
+                saved.append(e)
+        conn.commit()
+        return saved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _error_message(error: BaseException) -> str:
+    return getattr(error, "message", None) or str(error) or type(error).__name__
+
+
+async def analyze_batch(
+    video_urls: list[str],
+    user_level: int,
+    chunked: bool | None = None,
+    force_refresh: bool = False,
+    max_age_seconds: int | None = None,
+) -> AsyncIterator[BatchAnalysisItem]:
+    """
+    Analyze and persist many videos, yielding each result as it completes.
+
+    Duplicate videos in `video_urls` are analyzed once and reported for every
+    index. Closing the iterator cancels the remaining work.
+
+    Args:
+        video_urls: YouTube video URLs
+        user_level: Target JLPT level (1-5 for N1-N5)
+        chunked: Force map-reduce (True) or single-shot (False) analysis
+        force_refresh: Ignore stored analyses and re-run the pipeline
+        max_age_seconds: Oldest acceptable stored analysis (None = ANALYSIS_MAX_AGE_SECONDS)
+
+    Yields:
+        BatchAnalysisItem: One per entry of `video_urls`
+    """
+    if max_age_seconds is None:
+        max_age_seconds = settings.ANALYSIS_MAX_AGE_SECONDS
+    fetch_slots = asyncio.Semaphore(max(1, settings.BATCH_FETCH_CONCURRENCY))
+    llm_slots = asyncio.Semaphore(max(1, settings.BATCH_LLM_CONCURRENCY))
+    to_persist: asyncio.Queue[tuple[str, Video, bool]] = asyncio.Queue()
+    results: asyncio.Queue[BatchAnalysisItem] = asyncio.Queue()
+
+    # YouTube video id -> [(index, url), ...]
+    requested: dict[str, list[tuple[int, str]]] = {}
+    for index, url in enumerate(video_urls):
+        try:
+            video_id = extract_video_id(url)
+            if not video_id:
+                raise ValueError("Invalid YouTube URL")
+        except ValueError as e:
+            results.put_nowait(BatchAnalysisItem(index=index, video_url=url, status="failed", error=str(e)))
+            continue
+        requested.setdefault(video_id, []).append((index, url))
+
+    def report(video_id: str, **fields) -> None:
+        for index, url in requested[video_id]:
+            results.put_nowait(BatchAnalysisItem(index=index, video_url=url, **fields))
+
+    async def analyze(video_id: str) -> None:
+        url = requested[video_id][0][1]
+        try:
+            video = None
+            if not force_refresh:
+                video = await run_blocking(
+                    analysis_cache.get, video_id, user_level, max_age_seconds, stage="analysis cache lookup"
+                )
+            cached = video is not None
+            if video is None:
+                async with fetch_slots:
+                    prepared = await prepare_transcript(url, video_id, user_level)
+                async with llm_slots:
+                    video = await run_llm_analysis(url, video_id, user_level, prepared, chunked)
+                await run_blocking(analysis_cache.put, video_id, user_level, video, stage="analysis cache store")
+            to_persist.put_nowait((video_id, video, cached))
+        except Exception as e:
+            logger.error(f"Batch analysis of {video_id} failed: {type(e).__name__}: {e}")
+            report(video_id, status="failed", error=_error_message(e))
+
+    async def persist() -> None:
+        while True:
+            pending = [await to_persist.get()]
+            while len(pending) < settings.BATCH_PERSIST_MAX_ITEMS and not to_persist.empty():
+                pending.append(to_persist.get_nowait())
+            try:
+                saved = await run_blocking(
+                    _save_videos, [video for _, video, _ in pending], stage="batch persist"
+                )
+            except Exception as e:
+                logger.error(f"Batch persist of {len(pending)} videos failed: {e}")
+                saved = [e] * len(pending)
+            for (video_id, video, cached), outcome in zip(pending, saved):
+                if isinstance(outcome, Exception):
+                    report(video_id, status="failed", error=_error_message(outcome))
+                else:
+                    report(video_id, status="completed", cached=cached, id=outcome, result=video)
+
+    workers = [asyncio.create_task(analyze(video_id)) for video_id in requested]
+    writer = asyncio.create_task(persist())
+    try:
+        for _ in range(len(video_urls)):
+            yield await results.get()
+    finally:
+        for task in (*workers, writer):
+            task.cancel()
+        await asyncio.gather(*workers, writer, return_exceptions=True)
@@ -0,0 +1,376 @@
+"""Pool of warm bot worker processes for instant bot start.
+
+Spawning `python -m app.services.gemini_live_chat` per session re-imports
+pipecat and reloads the Silero VAD and smart-turn models before the bot can
+join the room, which takes seconds. The pool keeps BOT_WORKER_POOL_SIZE
+worker processes (app.services.bot_worker) with all of that already loaded.
+Workers connect back over a Unix socket, receive session specs and report
+ready / finished / failed. Each hosts up to BOT_WORKER_CAPACITY concurrent
+sessions as asyncio tasks, sharing one interpreter, and exits after
+BOT_WORKER_MAX_SESSIONS sessions, at which point it is replaced.
+
+Workers announce each free slot (with its models loaded) as "idle"; the pool
+keeps those slots in a queue and hands sessions out in announcement order.
+When no slot is free (burst, workers still starting, pool disabled with
+BOT_WORKER_POOL_SIZE=0) `submit` falls back to a cold bot subprocess, which
+is awaited in the background so it is reaped when it exits.
+
+Every bot, warm or cold, is recorded in app.services.bot_sessions while it runs.
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.exceptions import BotSpawnError
+from app.core.logger import logger
+from app.services.bot_sessions import bot_sessions
+
+# A worker that exits sooner than this after being spawned counts as a crash for respawn backoff
+_MIN_HEALTHY_LIFETIME_SECONDS = 10.0
+
+
+@dataclass
+class BotSession:
+    room_url: str
+    token: str
+    target_words: list[str]
+    summary: str = ""
+    readings: dict[str, str] = field(default_factory=dict)  # target word -> kana reading, when known
+    learner_id: str = ""  # whose progress the session records (DEFAULT_LEARNER_ID if empty)
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+
+@dataclass
+class _Worker:
+    worker_id: str
+    process: asyncio.subprocess.Process
+    spawned_at: float
+    writer: asyncio.StreamWriter | None = None  # set once the worker has connected
+    sessions: dict[str, BotSession] = field(default_factory=dict)  # running
+    served: int = 0
+    connected: bool = False
+
+
+async def _spawn_bot(session: BotSession) -> asyncio.subprocess.Process:
+    """
+    Spawn a cold bot process for one session (fallback when no worker slot is free).
+
+    Raises:
+        BotSpawnError: If the process cannot be started
+    """
+    try:
+        args = ["-m", "app.services.gemini_live_chat", "-u", session.room_url, "-t", session.token]
+        if session.target_words:
+            args.extend(["-w", json.dumps(session.target_words, ensure_ascii=False)])
+        if session.summary:
+            args.extend(["-s", session.summary])
+        if session.readings:
+            args.extend(["-r", json.dumps(session.readings, ensure_ascii=False)])
+        if session.learner_id:
+            args.extend(["-l", session.learner_id])
+        args.extend(["-i", session.session_id])
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, *args, cwd=str(settings.PROJECT_ROOT / "backend"), env=os.environ.copy()
+        )
+        logger.info(f"Cold bot process {process.pid} spawned for room: {session.room_url}")
+        return process
+    except Exception as e:
+        logger.error(f"Failed to spawn bot: {e}")
+        raise BotSpawnError(str(e))
+
+
+class BotWorkerPool:
+    """Supervised pool of pre-loaded bot worker processes (see module docstring)."""
+
+    def __init__(
+        self, size: int, capacity: int, max_sessions: int, worker_module: str = "app.services.bot_worker"
+    ):
+        self.size = max(0, size)
+        self.capacity = max(1, capacity)
+        self.max_sessions = max(0, max_sessions)
+        self.worker_module = worker_module
+        self._workers: dict[str, _Worker] = {}
+        self._idle: deque[str] = deque()  # one worker id per free slot
+        self._ready_waiters: dict[str, asyncio.Future] = {}
+        self._submitted_at: dict[str, float] = {}
+        self._server: asyncio.AbstractServer | None = None
+        self._socket_dir: str | None = None
+        self._supervisors: set[asyncio.Task] = set()
+        self._cold_reapers: set[asyncio.Task] = set()
+        self._stopping = False
+        self._next_id = 0
+        self._crashes = 0
+        self._counters = dict.fromkeys(
+            ("spawned", "recycled", "crashed", "sessions", "ready", "finished", "failed", "cold_starts"), 0
+        )
+
+    @property
+    def socket_path(self) -> str:
+        return os.path.join(self._socket_dir, "bot-pool.sock")
+
+    async def start(self) -> None:
+        """Listen for workers and spawn the pool (no-op when the pool size is 0)."""
+        if self.size == 0:
+            logger.info("Bot worker pool disabled (BOT_WORKER_POOL_SIZE=0), bots start cold")
+            return
+        self._stopping = False
+        self._socket_dir = tempfile.mkdtemp(prefix="bot-pool-")
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.socket_path)
+        for _ in range(self.size):
+            await self._spawn_worker()
+        logger.info(
+            f"Bot worker pool started ({self.size} workers x {self.capacity} sessions, "
+            f"recycled after {self.max_sessions or '∞'} sessions)"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the pool. Idle and starting workers exit; workers with running
+        sessions and cold bots let them finish and then exit on their own.
+        """
+        for task in self._cold_reapers:
+            task.cancel()
+        if self._server is None:
+            return
+        self._stopping = True
+        self._server.close()
+        for task in self._supervisors:
+            task.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+        waits = []
+        for worker in self._workers.values():
+            if worker.connected:
+                self._send(worker, {"type": "shutdown"})
+            else:
+                worker.process.kill()
+            if not worker.sessions:
+                waits.append(worker.process.wait())
+        try:
+            await asyncio.wait_for(asyncio.gather(*waits, return_exceptions=True), 5)
+        except asyncio.TimeoutError:
+            for worker in self._workers.values():
+                if not worker.sessions and worker.process.returncode is None:
+                    worker.process.kill()
+        writers = [worker.writer for worker in self._workers.values() if worker.writer is not None]
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+        await self._server.wait_closed()
+        for waiter in self._ready_waiters.values():
+            waiter.cancel()
+        self._workers.clear()
+        self._idle.clear()
+        self._ready_waiters.clear()
+        self._server = None
+        shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    async def submit(self, session: BotSession) -> str:
+        """
+        Hand a session to a free worker slot, or start a cold bot process if there is none.
+
+        Args:
+            session: Room, bot token and conversation context
+
+        Returns:
+            str: The session id (see `wait_ready`)
+
+        Raises:
+            BotSpawnError: If the cold fallback cannot start a bot process
+        """
+        self._counters["sessions"] += 1
+        while self._idle:
+            worker = self._workers.get(self._idle.popleft())
+            if worker is None or not worker.connected or worker.process.returncode is not None:
+                continue
+            worker.sessions[session.session_id] = session
+            bot_sessions.register(session.session_id, session.room_url, worker.worker_id, worker.process.pid)
+            self._submitted_at[session.session_id] = time.perf_counter()
+            self._ready_waiters[session.session_id] = asyncio.get_running_loop().create_future()
+            self._send(worker, {
+                "type": "session",
+                "session_id": session.session_id,
+                "room_url": session.room_url,
+                "token": session.token,
+                "target_words": session.target_words,
+                "summary": session.summary,
+                "readings": session.readings,
+                "learner_id": session.learner_id,
+            })
+            logger.info(
+                f"Session {session.session_id} assigned to bot worker {worker.worker_id} "
+                f"({len(worker.sessions)} running there, {len(self._idle)} free slots)"
+            )
+            return session.session_id
+
+        self._counters["cold_starts"] += 1
+        logger.info(f"No free bot worker slot, starting a cold bot for session {session.session_id}")
+        process = await _spawn_bot(session)
+        bot_sessions.register(session.session_id, session.room_url, pid=process.pid)
+        task = asyncio.create_task(self._reap_cold_bot(session, process), name=f"bot-{session.session_id}")
+        self._cold_reapers.add(task)
+        task.add_done_callback(self._cold_reapers.discard)
+        return session.session_id
+
+    async def _reap_cold_bot(self, session: BotSession, process: asyncio.subprocess.Process) -> None:
+        returncode = await process.wait()
+        failed = returncode != 0
+        self._counters["failed" if failed else "finished"] += 1
+        bot_sessions.remove(session.session_id, failed=failed)
+        log = logger.warning if failed else logger.info
+        log(f"Cold bot process {process.pid} for session {session.session_id} exited with code {returncode}")
+
+    async def wait_ready(self, session_id: str, timeout: float | None = None) -> bool:
+        """
+        Wait until a worker-served session's bot has joined its room.
+
+        Returns:
+            bool: True once joined, False if the session failed first
+                (cold-started sessions are not tracked and return False)
+
+        Raises:
+            asyncio.TimeoutError: If the bot has not joined within `timeout`
+        """
+        waiter = self._ready_waiters.get(session_id)
+        if waiter is None:
+            return False
+        return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+
+    def cancel(self, session_id: str) -> bool:
+        """
+        Ask the worker running a session to cancel it (the bot leaves the room).
+
+        Returns:
+            bool: False if no worker is running that session
+        """
+        for worker in self._workers.values():
+            if session_id in worker.sessions and worker.connected:
+                self._send(worker, {"type": "cancel", "session_id": session_id})
+                return True
+        return False
+
+    def _send(self, worker: _Worker, message: dict) -> None:
+        worker.writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+
+    async def _spawn_worker(self) -> None:
+        self._next_id += 1
+        worker_id = f"w{self._next_id}"
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", self.worker_module,
+            "--socket", self.socket_path,
+            "--worker-id", worker_id,
+            "--capacity", str(self.capacity),
+            "--max-sessions", str(self.max_sessions),
+            cwd=str(settings.PROJECT_ROOT / "backend"),
+        )
+        self._workers[worker_id] = _Worker(worker_id, process, spawned_at=time.monotonic())
+        self._counters["spawned"] += 1
+        task = asyncio.create_task(self._supervise(worker_id), name=f"bot-worker-{worker_id}")
+        self._supervisors.add(task)
+        task.add_done_callback(self._supervisors.discard)
+
+    async def _supervise(self, worker_id: str) -> None:
+        """Replace the worker when it exits (recycled or crashed)."""
+        worker = self._workers[worker_id]
+        returncode = await worker.process.wait()
+        self._workers.pop(worker_id, None)
+        for session_id in list(worker.sessions):
+            self._session_done(worker, {
+                "type": "failed", "session_id": session_id, "error": f"worker exited with code {returncode}",
+            })
+        recycled = returncode == 0 and self.max_sessions and worker.served >= self.max_sessions
+        if recycled:
+            self._counters["recycled"] += 1
+            logger.info(f"Bot worker {worker_id} recycled after {worker.served} sessions")
+        else:
+            self._counters["crashed"] += 1
+            logger.warning(f"Bot worker {worker_id} exited with code {returncode}")
+        if self._stopping:
+            return
+        if time.monotonic() - worker.spawned_at < _MIN_HEALTHY_LIFETIME_SECONDS and not recycled:
+            self._crashes += 1
+            delay = min(settings.RETRY_BACKOFF_MAX_SECONDS, settings.RETRY_BACKOFF_BASE_SECONDS * 2 ** self._crashes)
+            logger.warning(f"Bot worker crashed on startup; respawning in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        await self._spawn_worker()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        worker = None
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            worker = self._workers.get(hello.get("worker_id"))
+            if worker is None:
+                logger.warning(f"Unknown bot worker connected: {hello}")
+                return
+            worker.writer = writer
+            worker.connected = True
+            while line := await reader.readline():
+                self._on_message(worker, json.loads(line))
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning(f"Bot worker connection error: {e}")
+        finally:
+            if worker is not None:
+                worker.connected = False  # its free slots are skipped; the supervisor replaces it on exit
+            writer.close()
+
+    def _on_message(self, worker: _Worker, message: dict) -> None:
+        kind = message.get("type")
+        if kind == "idle":
+            self._crashes = 0
+            self._idle.append(worker.worker_id)
+        elif kind == "ready":
+            self._counters["ready"] += 1
+            session_id = message.get("session_id")
+            bot_sessions.mark_ready(session_id)
+            started = self._submitted_at.pop(session_id, None)
+            if started is not None:
+                logger.info(f"Bot for session {session_id} joined in {(time.perf_counter() - started) * 1000:.0f} ms")
+            waiter = self._ready_waiters.pop(session_id, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(True)
+        elif kind in ("finished", "failed"):
+            self._session_done(worker, message)
+
+    def _session_done(self, worker: _Worker, message: dict) -> None:
+        session = worker.sessions.pop(message.get("session_id"), None)
+        if session is None:
+            return
+        worker.served += 1
+        self._counters["finished" if message["type"] == "finished" else "failed"] += 1
+        bot_sessions.remove(session.session_id, failed=message["type"] == "failed")
+        if message["type"] == "failed":
+            logger.error(f"Bot session {session.session_id} failed on worker {worker.worker_id}: {message.get('error')}")
+        self._submitted_at.pop(session.session_id, None)
+        waiter = self._ready_waiters.pop(session.session_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(False)
+
+    def stats(self) -> dict:
+        workers = list(self._workers.values())
+        free_slots = sum(
+            1 for worker_id in self._idle
+            if worker_id in self._workers and self._workers[worker_id].connected
+        )
+        return {
+            "enabled": self.size > 0,
+            "size": self.size,
+            "capacity": self.capacity,
+            "idle": free_slots,
+            "busy": sum(len(worker.sessions) for worker in workers),
+            "starting": sum(1 for worker in workers if not worker.connected),
+            **self._counters,
+        }
+
+
+bot_pool = BotWorkerPool(
+    settings.BOT_WORKER_POOL_SIZE,
+    settings.BOT_WORKER_CAPACITY,
+    settings.BOT_WORKER_MAX_SESSIONS,
+)
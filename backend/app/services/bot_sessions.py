@@ -0,0 +1,112 @@
+"""Registry of running bot sessions with admission control.
+
+Every bot started by app.services.bot_pool, on a warm worker or as a cold
+process, is recorded here with its room, where it runs (worker id and/or
+PID), start time and state, and removed once it ends. The counts drive
+admission control: `/vocab-live-chat/start` enters `admission()` before
+taking a room, and is refused with a 429 and Retry-After while
+BOT_MAX_SESSIONS bots are running or starting, or while the 1-minute load
+average per CPU is above BOT_MAX_LOAD_PER_CPU.
+"""
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.exceptions import BotCapacityError
+from app.core.logger import logger
+
+
+@dataclass
+class BotSessionRecord:
+    session_id: str
+    room_url: str
+    started_at: float  # unix time
+    state: str = "starting"  # starting -> ready (bot joined; warm workers only) -> removed on exit
+    worker_id: str | None = None  # None for cold bot processes
+    pid: int | None = None
+
+
+class BotSessionRegistry:
+    """Live bot sessions and the admission limit (see module docstring)."""
+
+    def __init__(self, max_sessions: int, max_load_per_cpu: float, retry_after_seconds: float):
+        self.max_sessions = max(0, max_sessions)
+        self.max_load_per_cpu = max_load_per_cpu
+        self.retry_after_seconds = retry_after_seconds
+        self._sessions: dict[str, BotSessionRecord] = {}
+        self._admitting = 0  # requests between admission and registering their bot
+        self._counters = dict.fromkeys(("admitted", "rejected", "finished", "failed"), 0)
+
+    @asynccontextmanager
+    async def admission(self) -> AsyncIterator[None]:
+        """
+        Reserve a session slot for the duration of the block.
+
+        The block is expected to start a bot, which registers itself; the
+        reservation is released when the block exits either way.
+
+        Raises:
+            BotCapacityError: If the session or load limit is reached (HTTP 429)
+        """
+        reason = self._over_limit()
+        if reason:
+            self._counters["rejected"] += 1
+            logger.warning(f"Refusing bot session: {reason}")
+            raise BotCapacityError(reason, self.retry_after_seconds)
+        self._counters["admitted"] += 1
+        self._admitting += 1
+        try:
+            yield
+        finally:
+            self._admitting -= 1
+
+    def _over_limit(self) -> str | None:
+        active = len(self._sessions) + self._admitting
+        if self.max_sessions and active >= self.max_sessions:
+            return f"{active} bot sessions running (limit {self.max_sessions})"
+        if self.max_load_per_cpu > 0:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+            if load > self.max_load_per_cpu:
+                return f"load average {load:.2f} per CPU (limit {self.max_load_per_cpu:.2f})"
+        return None
+
+    def register(self, session_id: str, room_url: str, worker_id: str | None = None, pid: int | None = None) -> None:
+        self._sessions[session_id] = BotSessionRecord(session_id, room_url, time.time(), worker_id=worker_id, pid=pid)
+
+    def mark_ready(self, session_id: str) -> None:
+        record = self._sessions.get(session_id)
+        if record is not None:
+            record.state = "ready"
+
+    def remove(self, session_id: str, failed: bool = False) -> None:
+        """Forget an ended session (its bot exited or its worker reported it done)."""
+        if self._sessions.pop(session_id, None) is not None:
+            self._counters["failed" if failed else "finished"] += 1
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        sessions = sorted(self._sessions.values(), key=lambda record: record.started_at)
+        states = [record.state for record in sessions]
+        return {
+            "running": len(sessions),
+            "starting": states.count("starting"),
+            "ready": states.count("ready"),
+            "warm": sum(1 for record in sessions if record.worker_id is not None),
+            "cold": sum(1 for record in sessions if record.worker_id is None),
+            "limits": {"max_sessions": self.max_sessions, "max_load_per_cpu": self.max_load_per_cpu},
+            "load_per_cpu": round(os.getloadavg()[0] / (os.cpu_count() or 1), 2),
+            **self._counters,
+            "sessions": [
+                {**asdict(record), "age_seconds": round(now - record.started_at, 1)} for record in sessions
+            ],
+        }
+
+
+bot_sessions = BotSessionRegistry(
+    settings.BOT_MAX_SESSIONS,
+    settings.BOT_MAX_LOAD_PER_CPU,
+    settings.BOT_ADMISSION_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,187 @@
+"""Warm bot worker process hosting several bot sessions (see app.services.bot_pool).
+
+A worker imports pipecat and the bot pipeline once, connects back to the API
+process over a Unix socket and runs up to `capacity` `run_bot` sessions as
+asyncio tasks, sharing one interpreter and the imported libraries. Each
+session still gets its own VAD and smart-turn analyzers (they are stateful);
+a spare set is loaded off the event loop before the worker offers a slot, so
+a new session never waits for models. Messages are JSON lines:
+
+    API -> worker   {"type": "session", "session_id", "room_url", "token", "target_words", "summary", "readings", "learner_id"}
+                    {"type": "cancel", "session_id"}
+                    {"type": "shutdown"}                   stop taking sessions, exit once drained
+    worker -> API   {"type": "hello", "worker_id", "pid"}
+                    {"type": "idle"}                       one free slot, models loaded
+                    {"type": "ready", "session_id"}        bot joined the room
+                    {"type": "finished", "session_id"}
+                    {"type": "failed", "session_id", "error"}
+
+Sessions are isolated from each other: an exception or cancellation ends
+only its own task and is reported as `failed`. After `max_sessions` sessions
+the worker stops offering slots and exits once its sessions end, so the pool
+replaces it with a fresh process. Losing the pool connection (API restart)
+also lets running sessions finish before exiting.
+
+run with: python -m app.services.bot_worker --socket PATH --worker-id ID [--capacity N] [--max-sessions N]
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Longest a session can run. Handed-out rooms expire DAILY_ROOM_DURATION_SECONDS
+# from now; this also ends the session on time if shortening a pooled room's
+# `exp` failed
+SESSION_TIMEOUT_SECONDS = settings.DAILY_ROOM_DURATION_SECONDS + 60
+
+
+class BotHost:
+    """Runs bot sessions sent by the pool as isolated asyncio tasks (see module docstring)."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        capacity: int,
+        max_sessions: int,
+        run_session: Callable[..., Awaitable[None]],
+        load_models: Callable[[], Any],
+    ):
+        self.worker_id = worker_id
+        self.capacity = max(1, capacity)
+        self.max_sessions = max(0, max_sessions)
+        self.run_session = run_session
+        self.load_models = load_models
+        self._writer: asyncio.StreamWriter | None = None
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._spare_models: list[Any] = []
+        self._offered = 0  # slots announced to the pool and not yet used
+        self._started = 0
+        self._accepting = True
+        self._changed = asyncio.Event()
+        self._done = asyncio.Event()
+
+    async def serve(self, socket_path: str) -> None:
+        """Connect to the pool and host sessions until shut down or recycled, and drained."""
+        reader, self._writer = await asyncio.open_unix_connection(socket_path)
+        await self._send({"type": "hello", "worker_id": self.worker_id, "pid": os.getpid()})
+        offering = asyncio.create_task(self._offer_slots())
+        reading = asyncio.create_task(self._read(reader))
+        try:
+            await self._done.wait()
+        finally:
+            offering.cancel()
+            reading.cancel()
+            await asyncio.gather(offering, reading, return_exceptions=True)
+            self._writer.close()
+        logger.info(f"Bot worker {self.worker_id}: served {self._started} sessions, exiting")
+
+    def _recycling(self) -> bool:
+        return bool(self.max_sessions) and self._started + self._offered >= self.max_sessions
+
+    def _check_done(self) -> None:
+        drained = not self._tasks and not self._offered
+        if drained and (not self._accepting or self._recycling()):
+            self._done.set()
+        self._changed.set()
+
+    async def _offer_slots(self) -> None:
+        """Announce a free slot whenever one opens up, with its models loaded ahead of time."""
+        while self._accepting:
+            if len(self._tasks) + self._offered < self.capacity and not self._recycling():
+                # Model loading is CPU work; keep it off the loop the running sessions share
+                self._spare_models.append(await asyncio.to_thread(self.load_models))
+                self._offered += 1
+                await self._send({"type": "idle"})
+                continue
+            self._changed.clear()
+            await self._changed.wait()
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            message = json.loads(line)
+            kind = message.get("type")
+            if kind == "session":
+                self._start_session(message)
+            elif kind == "cancel":
+                task = self._tasks.get(message.get("session_id"))
+                if task is not None:
+                    logger.info(f"Bot worker {self.worker_id}: cancelling session {message['session_id']}")
+                    task.cancel()
+            elif kind == "shutdown":
+                logger.info(f"Bot worker {self.worker_id}: shutting down after {len(self._tasks)} running sessions")
+                break
+        # Shutdown or the pool went away: finish running sessions, take no new ones
+        self._accepting = False
+        self._offered = 0
+        self._check_done()
+
+    def _start_session(self, message: dict) -> None:
+        session_id = message["session_id"]
+        models = self._spare_models.pop() if self._spare_models else None  # None: run_bot loads its own
+        self._offered = max(0, self._offered - 1)
+        self._started += 1
+        logger.info(
+            f"Bot worker {self.worker_id}: session {session_id} "
+            f"({len(self._tasks) + 1}/{self.capacity} running, {self._started}/{self.max_sessions or '∞'} served)"
+        )
+        self._tasks[session_id] = asyncio.create_task(self._run(session_id, message, models), name=f"bot-{session_id}")
+        self._changed.set()
+
+    async def _run(self, session_id: str, message: dict, models: Any) -> None:
+        async def on_joined():
+            await self._send({"type": "ready", "session_id": session_id})
+
+        try:
+            await asyncio.wait_for(
+                self.run_session(
+                    message["room_url"],
+                    message["token"],
+                    message.get("target_words") or [],
+                    message.get("summary") or "",
+                    target_readings=message.get("readings") or {},
+                    learner_id=message.get("learner_id") or "",
+                    session_id=session_id,
+                    turn_models=models,
+                    on_joined=on_joined,
+                ),
+                SESSION_TIMEOUT_SECONDS,
+            )
+            await self._send({"type": "finished", "session_id": session_id})
+        except asyncio.CancelledError:
+            await self._send({"type": "failed", "session_id": session_id, "error": "cancelled"})
+        except Exception as e:
+            logger.exception(f"Bot worker {self.worker_id}: session {session_id} failed")
+            await self._send({"type": "failed", "session_id": session_id, "error": f"{type(e).__name__}: {e}"})
+        finally:
+            self._tasks.pop(session_id, None)
+            self._check_done()
+
+    async def _send(self, message: dict) -> None:
+        try:
+            self._writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+            await self._writer.drain()
+        except ConnectionError:
+            pass  # pool went away; running sessions finish and the worker exits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm Gemini Live Chat bot worker")
+    parser.add_argument("--socket", required=True, help="Unix socket of the API process's bot pool")
+    parser.add_argument("--worker-id", required=True)
+    parser.add_argument("--capacity", type=int, default=settings.BOT_WORKER_CAPACITY)
+    parser.add_argument("--max-sessions", type=int, default=settings.BOT_WORKER_MAX_SESSIONS)
+    args = parser.parse_args()
+
+    # The expensive part of a cold bot start; paid once per worker, before it offers a slot
+    from app.services.gemini_live_chat import load_turn_models, run_bot
+
+    host = BotHost(args.worker_id, args.capacity, args.max_sessions, run_bot, load_turn_models)
+    asyncio.run(host.serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Pre-synthesized audio for the bot's fixed utterances.
+
+The closing line and the intro never change, so instead of having Gemini
+Live generate them in every session, each is synthesized once per voice with
+Gemini TTS and stored under CANNED_AUDIO_DIR/<voice>/ as raw 16-bit mono PCM
+at the bot's output sample rate (BOT_AUDIO_OUT_SAMPLE_RATE). File names carry
+a hash of the text, so editing a phrase synthesizes it afresh. `run_bot`
+pushes the cached audio straight to the output transport; until a phrase is
+on disk (the first session on a new voice starts the synthesis), sessions
+let Gemini say it as before.
+"""
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from pipecat.audio.utils import create_file_resampler
+from pipecat.frames.frames import TTSAudioRawFrame
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.gemini import synthesize_speech
+
+CANNED_UTTERANCES = {
+    "intro": (
+        "こんにちは！今日は日本語でいっしょにおしゃべりしましょう。"
+        "会話の中で、いくつかの言葉を使ってみてくださいね。では、最近どんなことをしましたか？"
+    ),
+    "closing": "素晴らしいですね！今日の会話はここまでにしましょう。お疲れさまでした。では、またね。",
+}
+_CHUNK_SECONDS = 0.5  # playback can be interrupted between chunks
+
+
+class CannedAudioCache:
+    """On-disk PCM for CANNED_UTTERANCES in one voice (see module docstring)."""
+
+    def __init__(self, directory: Path, voice: str, sample_rate: int):
+        self.directory = directory / voice
+        self.voice = voice
+        self.sample_rate = sample_rate
+        self._audio: dict[str, bytes] = {}
+        self._synthesis: Optional[asyncio.Task] = None
+
+    def path_for(self, key: str) -> Path:
+        digest = hashlib.sha1(CANNED_UTTERANCES[key].encode()).hexdigest()[:12]
+        return self.directory / f"{key}-{digest}-{self.sample_rate}.pcm"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The cached PCM for `key`, or None if it has not been synthesized yet."""
+        if key not in self._audio:
+            try:
+                self._audio[key] = self.path_for(key).read_bytes()
+            except FileNotFoundError:
+                return None
+        return self._audio[key]
+
+    def frames(self, key: str) -> Optional[list[TTSAudioRawFrame]]:
+        """Output audio frames for `key` (fresh frames per call), or None if not cached."""
+        audio = self.get(key)
+        if audio is None:
+            return None
+        chunk = int(self.sample_rate * _CHUNK_SECONDS) * 2
+        return [
+            TTSAudioRawFrame(audio=audio[i:i + chunk], sample_rate=self.sample_rate, num_channels=1)
+            for i in range(0, len(audio), chunk)
+        ]
+
+    def ensure_in_background(self) -> None:
+        """Synthesize missing phrases in a background task (started once per process)."""
+        if self._synthesis is None:
+            self._synthesis = asyncio.create_task(self.ensure())
+
+    async def ensure(self) -> None:
+        """Synthesize and store every phrase that is not on disk yet; failures are logged and retried next process."""
+        for key, text in CANNED_UTTERANCES.items():
+            path = self.path_for(key)
+            if path.exists():
+                continue
+            try:
+                audio, rate = await synthesize_speech(text, self.voice)
+                if rate != self.sample_rate:
+                    audio = await create_file_resampler().resample(audio, rate, self.sample_rate)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Other bot processes may be writing the same phrase; each renames its own complete file
+                partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                partial.write_bytes(audio)
+                partial.replace(path)
+                logger.info(f"Canned '{key}' audio for voice {self.voice} stored ({len(audio) / 2 / self.sample_rate:.1f}s)")
+            except Exception as e:
+                logger.warning(f"Could not synthesize canned '{key}' audio: {e}")
+
+
+canned_audio = CannedAudioCache(settings.CANNED_AUDIO_DIR, settings.GEMINI_VOICE_ID, settings.BOT_AUDIO_OUT_SAMPLE_RATE)
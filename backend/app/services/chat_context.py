@@ -0,0 +1,118 @@
+"""Bounded conversation context for long voice chat sessions.
+
+Gemini Live keeps the conversation on its side, so `run_bot` bounds it in
+two places:
+
+- On the server, the Live session's sliding-window compression drops the
+  oldest turns once the context reaches GEMINI_CONTEXT_TRIGGER_TOKENS (the
+  system instruction is always kept). Every tool result restates the
+  remaining words, so the latest state stays inside the window.
+- Locally, the pipecat `LLMContext` gets every transcribed turn and tool
+  call appended to it. Gemini Live re-converts the whole context on each
+  update and sends it in full when (re)connecting. `ContextWindowPolicy`
+  keeps it to the pinned system prompt, a pinned message with the words
+  still to practise, a rolling summary of older turns and the most recent
+  messages.
+
+The summary is extractive (one shortened line per folded turn, oldest lines
+dropped past the size limit), so folding needs no extra model call. It runs
+after the bot finishes speaking, off the user-to-reply path.
+"""
+from typing import Any, Optional
+
+STATE_PREFIX = "[Session state] "
+SUMMARY_PREFIX = "[Earlier in this conversation] "
+_LINE_MAX_CHARS = 80
+
+
+def _text_of(message: Any) -> str:
+    if not isinstance(message, dict):
+        return ""  # LLM-specific messages are kept or dropped, never summarized
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _is_pinned_state(message: Any) -> bool:
+    return isinstance(message, dict) and message.get("role") == "system" and (
+        _text_of(message).startswith(STATE_PREFIX) or _text_of(message).startswith(SUMMARY_PREFIX)
+    )
+
+
+def _summary_line(message: Any) -> Optional[str]:
+    """One short line for a folded message; tool calls and results are covered by the state message."""
+    if not isinstance(message, dict) or message.get("role") not in ("user", "assistant") or message.get("tool_calls"):
+        return None
+    text = " ".join(_text_of(message).split())
+    if not text:
+        return None
+    if len(text) > _LINE_MAX_CHARS:
+        text = text[:_LINE_MAX_CHARS - 1] + "…"
+    return f"{'User' if message['role'] == 'user' else 'Tutor'}: {text}"
+
+
+class ContextWindowPolicy:
+    """Compacts a chat's message list once it grows past `max_messages` (see module docstring)."""
+
+    def __init__(self, max_messages: int, recent_messages: int, summary_max_chars: int):
+        self.max_messages = max_messages
+        self.recent_messages = max(2, recent_messages)
+        self.summary_max_chars = summary_max_chars
+        self.compactions = 0
+        self.folded = 0
+
+    def compact(self, messages: list, remaining_words: list[str]) -> Optional[list]:
+        """
+        Return the compacted message list, or None if it is within bounds.
+
+        Args:
+            messages: The context's messages (not modified)
+            remaining_words: Target words the user has not used yet
+
+        Returns:
+            Optional[list]: Pinned prompt, state and summary messages followed by the recent window
+        """
+        if not self.max_messages or len(messages) <= self.max_messages:
+            return None
+
+        # The system prompt leads the context; our own state and summary messages follow it
+        pinned_end = 0
+        while pinned_end < len(messages) and isinstance(messages[pinned_end], dict) \
+                and messages[pinned_end].get("role") == "system":
+            pinned_end += 1
+        pinned = [message for message in messages[:pinned_end] if not _is_pinned_state(message)]
+        previous_summary = next(
+            (_text_of(message)[len(SUMMARY_PREFIX):] for message in messages[:pinned_end]
+             if _is_pinned_state(message) and _text_of(message).startswith(SUMMARY_PREFIX)),
+            "",
+        )
+
+        # Never start the window with a tool result whose call would be folded away
+        window_start = max(pinned_end, len(messages) - self.recent_messages)
+        while window_start < len(messages) and isinstance(messages[window_start], dict) \
+                and messages[window_start].get("role") == "tool":
+            window_start += 1
+        folded = messages[pinned_end:window_start]
+        if any(isinstance(message, dict) and message.get("content") == "IN_PROGRESS" for message in folded):
+            return None  # the aggregator still has to fill in that tool result
+
+        lines = previous_summary.split("\n") if previous_summary else []
+        lines.extend(line for line in map(_summary_line, folded) if line)
+        while lines and sum(len(line) + 1 for line in lines) > self.summary_max_chars:
+            lines.pop(0)
+
+        state = (
+            f"{STATE_PREFIX}Target words the user has not used yet: {', '.join(remaining_words)}."
+            if remaining_words else f"{STATE_PREFIX}The user has used every target word."
+        )
+        compacted = [*pinned, {"role": "system", "content": state}]
+        if lines:
+            compacted.append({"role": "system", "content": SUMMARY_PREFIX + "\n".join(lines)})
+        compacted.extend(messages[window_start:])
+
+        self.compactions += 1
+        self.folded += len(folded)
+        return compacted
@@ -0,0 +1,140 @@
+"""Map-reduce vocabulary extraction over token-bounded transcript chunks.
+
+Map: every chunk (whole transcript segments, at most TRANSCRIPT_CHUNK_TOKENS)
+is sent to Gemini concurrently, bounded by CHUNK_ANALYSIS_CONCURRENCY, and
+returns candidate vocab plus a short section summary.
+
+Reduce: candidates are deduplicated and ranked locally, the final vocab list
+is selected, and one small Gemini call turns the section summaries into the
+video title, tags and summary.
+"""
+import asyncio
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.prompts import get_video_overview_prompt, get_vocab_candidates_prompt
+from app.schemas.video import ChunkCandidates, Video, VideoOverview, Vocab, VocabCandidate
+from app.services.chunker import split_transcript
+from app.services.gemini import generate_structured
+
+
+@dataclass
+class _MergedCandidate:
+    vocab: VocabCandidate
+    first_seen: float
+    occurrences: int = 0
+    chunks: set[int] = field(default_factory=set)
+
+
+def timestamp_to_seconds(timestamp: str) -> float:
+    """Parse "mm:ss" / "hh:mm:ss" / "[93]" into seconds; unparseable values sort last."""
+    try:
+        seconds = 0.0
+        for part in timestamp.strip().strip("[]").split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except (AttributeError, ValueError):
+        return float("inf")
+
+
+def transcript_duration(transcript_data: dict) -> str:
+    """Derive the video duration (mm:ss) from the end of the last transcript segment."""
+    end = 0.0
+    for segment in transcript_data.get("data") or []:
+        if isinstance(segment, dict):
+            try:
+                end = max(end, float(segment.get("start", 0)) + float(segment.get("dur", 0)))
+            except (TypeError, ValueError):
+                continue
+    return f"{int(end // 60)}:{int(end % 60):02d}"
+
+
+def rank_candidates(
+    chunk_results: list[ChunkCandidates], user_level: int, limit: int
+) -> list[Vocab]:
+    """
+    Deduplicate candidates across chunks and select the best `limit` items.
+
+    Ranking prefers, in order: closeness to the requested JLPT level, words
+    seen in more chunks, words seen more often, and earlier first appearance.
+    The selection is returned in transcript order.
+    """
+    merged: dict[str, _MergedCandidate] = {}
+    for index, result in enumerate(chunk_results):
+        for candidate in result.vocab:
+            key = candidate.japanese_vocab.strip()
+            if not key:
+                continue
+            seen_at = timestamp_to_seconds(candidate.timestamp)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = _MergedCandidate(vocab=candidate, first_seen=seen_at)
+            elif seen_at < entry.first_seen:
+                entry.vocab, entry.first_seen = candidate, seen_at
+            entry.occurrences += max(1, candidate.occurrences)
+            entry.chunks.add(index)
+
+    ranked = sorted(
+        merged.values(),
+        key=lambda e: (
+            abs(e.vocab.jlpt_level - user_level),
+            -len(e.chunks),
+            -e.occurrences,
+            e.first_seen,
+        ),
+    )
+    selected = sorted(ranked[:limit], key=lambda e: e.first_seen)
+    return [Vocab(**e.vocab.model_dump(exclude={"occurrences"})) for e in selected]
+
+
+async def analyze_transcript_chunked(
+    video_id: str,
+    video_url: str,
+    transcript_data: dict,
+    transcript: str,
+    user_level: int,
+) -> Video:
+    """
+    Run map-reduce analysis over a formatted transcript.
+
+    Args:
+        video_id: YouTube video ID
+        video_url: Full YouTube video URL
+        transcript_data: Raw Apify transcript (used for the duration)
+        transcript: Compacted transcript ("[seconds] text" lines)
+        user_level: Target JLPT level (1-5 for N1-N5)
+
+    Returns:
+        Video: Same shape as the single-shot analysis
+    """
+    chunks = split_transcript(transcript)
+    logger.info(f"Chunked analysis of {video_id}: {len(chunks)} chunks")
+    semaphore = asyncio.Semaphore(settings.CHUNK_ANALYSIS_CONCURRENCY)
+
+    async def map_chunk(index: int, chunk: str) -> ChunkCandidates:
+        async with semaphore:
+            return await generate_structured(
+                get_vocab_candidates_prompt(chunk, user_level, settings.CHUNK_CANDIDATES_PER_CHUNK),
+                ChunkCandidates,
+                stage=f"chunk {index + 1}/{len(chunks)} LLM call",
+            )
+
+    chunk_results = await asyncio.gather(*(map_chunk(i, c) for i, c in enumerate(chunks)))
+
+    vocab = rank_candidates(chunk_results, user_level, settings.ANALYSIS_VOCAB_COUNT)
+    duration = transcript_duration(transcript_data)
+    overview = await generate_structured(
+        get_video_overview_prompt(video_id, video_url, duration, [r.summary for r in chunk_results]),
+        VideoOverview,
+        stage="video overview LLM call",
+    )
+    return Video(
+        video_id=video_id,
+        title=overview.title,
+        tags=overview.tags,
+        video_url=video_url,
+        duration=duration,
+        summary=overview.summary,
+        vocab=vocab,
+    )
@@ -1,8 +1,45 @@
-from langchain_text_splitters import CharacterTextSplitter
-import asyncio
-import json
+"""Token-bounded transcript chunking with the cl100k_base tokenizer."""
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
+from app.core.config import settings
 
-chunker = CharacterTextSplitter.from_tiktoken_encoder(encoding_name="cl100k_base", chunk_size=1000, chunk_overlap=0, separator="---")   
-    
+if TYPE_CHECKING:
+    import tiktoken
+    from langchain_text_splitters import CharacterTextSplitter
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> "tiktoken.Encoding":
+    """Load the cl100k_base encoder on first use (it parses a ~1.7 MB BPE file)."""
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Count cl100k_base tokens in `text`."""
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def get_chunker() -> "CharacterTextSplitter":
+    """
+    Build the transcript splitter on first use (langchain is only needed for chunked analysis).
     
+    Formatted transcripts have one "[MM:SS] text" segment per line, so splitting on
+    newlines keeps every chunk aligned to segment boundaries.
+    """
+    from langchain_text_splitters import CharacterTextSplitter
+
+    return CharacterTextSplitter(
+        separator="\n",
+        chunk_size=settings.TRANSCRIPT_CHUNK_TOKENS,
+        chunk_overlap=0,
+        length_function=count_tokens,
+    )
+
+
+def split_transcript(transcript: str) -> list[str]:
+    """Split a formatted transcript into token-bounded chunks of whole segments."""
+    return get_chunker().split_text(transcript)
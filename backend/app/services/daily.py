@@ -1,32 +1,73 @@
 """Daily.co API integration functions for room and token management."""
+import asyncio
+import importlib.util
 import time
+import uuid
 
 import httpx
 
 from app.core.config import settings
 from app.core.exceptions import DailyAPIError
 from app.core.logger import logger
+from app.core.resilience import daily_upstream
 
+# One pooled client for all Daily calls (opened/closed by the lifespan), so
+# session starts reuse warm keep-alive connections instead of a new TCP+TLS
+# handshake per request. HTTP/2 needs the optional `h2` package.
+_http_client: httpx.AsyncClient | None = None
 
-async def create_daily_room():
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Daily API client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        http2 = settings.DAILY_HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        _http_client = httpx.AsyncClient(
+            base_url=settings.DAILY_API_URL,
+            headers={"Authorization": f"Bearer {settings.DAILY_API_KEY}"},
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.DAILY_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DAILY_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.DAILY_HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=settings.DAILY_TIMEOUT_SECONDS,
+        )
+        logger.info(f"Daily API client ready ({'HTTP/2' if http2 else 'HTTP/1.1'} with keep-alive)")
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared Daily API client (lifespan shutdown)."""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def create_daily_room(duration_seconds: int | None = None, name: str | None = None):
     """
     Creates a new Daily.co room with a 10-minute expiration.
     
+    Args:
+        duration_seconds: Room lifetime (default DAILY_ROOM_DURATION_SECONDS)
+        name: Room name to use (default: Daily picks a random one)
+    
     Returns:
         dict: Room data including 'url' and 'name' fields
         
     Raises:
         DailyAPIError: If room creation fails
+        UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Daily circuit breaker is open
     """
     # 1. Calculate expiration time (e.g., 10 minutes from now)
-    expiration_time = int(time.time() + settings.DAILY_ROOM_DURATION_SECONDS)
+    expiration_time = int(time.time() + (duration_seconds or settings.DAILY_ROOM_DURATION_SECONDS))
 
     logger.info(f"Creating Daily room with expiration: {expiration_time}")
     logger.debug(f"DAILY_API_KEY present: {bool(settings.DAILY_API_KEY)}")
     logger.debug(f"DAILY_API_URL: {settings.DAILY_API_URL}")
 
-    headers = {"Authorization": f"Bearer {settings.DAILY_API_KEY}"}
-    
     request_payload = {
         "properties": {
             # ESSENTIAL PROPERTIES
@@ -43,26 +84,26 @@ async def create_daily_room():
             "start_audio_off": False,     # Let user choose their mic state
         }
     }
+    if name:
+        request_payload["name"] = name
     logger.debug(f"Request payload: {request_payload}")
     
-    async with httpx.AsyncClient() as client:
+    async def request_room() -> dict:
         try:
-            resp = await client.post(
-                f"{settings.DAILY_API_URL}/rooms",
-                headers=headers,
-                json=request_payload,
-            )
+            resp = await get_http_client().post("/rooms", json=request_payload)
             logger.info(f"Daily API response status: {resp.status_code}")
             logger.debug(f"Daily API response body: {resp.text}")
         except Exception as e:
             logger.error(f"Exception during Daily API call: {e}")
             raise DailyAPIError(f"Failed to call Daily API: {str(e)}")
+        
+        if resp.status_code != 200:
+            logger.error(f"Failed to create room. Status: {resp.status_code}, Body: {resp.text}")
+            raise DailyAPIError(f"Failed to create room: {resp.text}", resp.status_code)
+        return resp.json()
     
-    if resp.status_code != 200:
-        logger.error(f"Failed to create room. Status: {resp.status_code}, Body: {resp.text}")
-        raise DailyAPIError(f"Failed to create room: {resp.text}", resp.status_code)
-    
-    room_data = resp.json()
+    # A retried POST /rooms could leave an orphan room behind: timeout and breaker only
+    room_data = await daily_upstream.call(request_room, stage="Daily room creation", idempotent=False)
     logger.info(f"Successfully created room: {room_data.get('name', 'unknown')}")
     return room_data
 
@@ -78,15 +119,16 @@ async def get_daily_token(room_name: str):
         str: The meeting token
         
     Raises:
-        DailyAPIError: If token creation fails
+        DailyAPIError: If token creation fails after retries
+        UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Daily circuit breaker is open
     """
     logger.info(f"Creating token for room: {room_name}")
-    headers = {"Authorization": f"Bearer {settings.DAILY_API_KEY}"}
-    async with httpx.AsyncClient() as client:
+
+    async def request_token() -> str:
         try:
-            resp = await client.post(
-                f"{settings.DAILY_API_URL}/meeting-tokens",
-                headers=headers,
+            resp = await get_http_client().post(
+                "/meeting-tokens",
                 json={"properties": {"room_name": room_name, "is_owner": True}},
             )
             logger.info(f"Token API response status: {resp.status_code}")
@@ -94,11 +136,102 @@ async def get_daily_token(room_name: str):
         except Exception as e:
             logger.error(f"Exception during token API call: {e}")
             raise DailyAPIError(f"Failed to call token API: {str(e)}")
+        
+        if resp.status_code != 200:
+            logger.error(f"Failed to create token. Status: {resp.status_code}, Body: {resp.text}")
+            raise DailyAPIError(f"Failed to create token: {resp.text}", resp.status_code)
+        return resp.json()["token"]
     
-    if resp.status_code != 200:
-        logger.error(f"Failed to create token. Status: {resp.status_code}, Body: {resp.text}")
-        raise DailyAPIError(f"Failed to create token: {resp.text}", resp.status_code)
-    
-    token = resp.json()["token"]
+    # Tokens are stateless, so extra requests are harmless: retry and hedge
+    token = await daily_upstream.call(request_token, stage="Daily token creation", idempotent=True)
     logger.info(f"Successfully created token for room: {room_name}")
     return token
+
+
+async def set_room_expiration(room_name: str, expiration_time: int) -> None:
+    """
+    Move a room's `exp`; participants are ejected then (`eject_at_room_exp`).
+
+    Args:
+        room_name: The room to update
+        expiration_time: New expiration (unix time)
+
+    Raises:
+        DailyAPIError: If the update fails
+        UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Daily circuit breaker is open
+    """
+    async def request_update() -> None:
+        try:
+            resp = await get_http_client().post(f"/rooms/{room_name}", json={"properties": {"exp": expiration_time}})
+        except Exception as e:
+            raise DailyAPIError(f"Failed to call Daily API: {str(e)}")
+        if resp.status_code != 200:
+            raise DailyAPIError(f"Failed to update room {room_name}: {resp.text}", resp.status_code)
+
+    # Setting the same `exp` twice is harmless: retry and hedge
+    await daily_upstream.call(request_update, stage="Daily room update", idempotent=True)
+    logger.info(f"Room {room_name} now expires at {expiration_time}")
+
+
+async def delete_daily_room(room_name: str) -> None:
+    """
+    Delete a room before its `exp`.
+
+    Raises:
+        DailyAPIError: If the deletion fails (a room that is already gone is fine)
+        UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Daily circuit breaker is open
+    """
+    async def request_delete() -> None:
+        try:
+            resp = await get_http_client().delete(f"/rooms/{room_name}")
+        except Exception as e:
+            raise DailyAPIError(f"Failed to call Daily API: {str(e)}")
+        if resp.status_code not in (200, 404):
+            raise DailyAPIError(f"Failed to delete room {room_name}: {resp.text}", resp.status_code)
+
+    await daily_upstream.call(request_delete, stage="Daily room deletion", idempotent=True)
+    logger.info(f"Deleted room {room_name}")
+
+
+async def create_room_with_token(duration_seconds: int | None = None) -> tuple[dict, str]:
+    """
+    Create a room and its owner token in one round-trip time.
+    
+    The room name is chosen here, so the token request does not have to wait
+    for the room to exist and both are sent concurrently. If the token fails,
+    a room that was created is deleted rather than left to expire unused.
+    
+    Args:
+        duration_seconds: Room lifetime (default DAILY_ROOM_DURATION_SECONDS)
+        
+    Returns:
+        tuple: (room data with 'url' and 'name', owner token)
+        
+    Raises:
+        DailyAPIError: If room or token creation fails
+        UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Daily circuit breaker is open
+    """
+    room_name = uuid.uuid4().hex
+    tasks = [
+        asyncio.ensure_future(create_daily_room(duration_seconds, name=room_name)),
+        asyncio.ensure_future(get_daily_token(room_name)),
+    ]
+    try:
+        room_data, token = await asyncio.gather(*tasks, return_exceptions=True)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    if isinstance(token, BaseException):
+        if not isinstance(room_data, BaseException):
+            try:
+                await delete_daily_room(room_name)
+            except Exception as e:
+                logger.warning(f"Could not delete room {room_name} after token failure: {e}")
+        raise token
+    if isinstance(room_data, BaseException):
+        raise room_data
+    return room_data, token
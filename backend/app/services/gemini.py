@@ -0,0 +1,105 @@
+"""Structured-output Gemini calls used by the video analysis pipeline, and speech synthesis."""
+import re
+import threading
+from typing import TYPE_CHECKING, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.resilience import gemini_upstream
+
+if TYPE_CHECKING:
+    from google import genai
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Created on first use (or by the lifespan warm-up): importing google.genai
+# alone takes about a second, which every API worker and test would pay at import
+_client: "genai.Client | None" = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> "genai.Client":
+    """Return the shared Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+
+                _client = genai.Client(
+                    api_key=settings.GOOGLE_API_KEY,
+                    http_options={"base_url": settings.GEMINI_API_URL} if settings.GEMINI_API_URL else None,
+                )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client's async HTTP session (lifespan shutdown)."""
+    global _client
+    client, _client = _client, None
+    aclose = getattr(getattr(client, "aio", None), "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def generate_structured(contents: str, schema: type[ModelT], stage: str) -> ModelT:
+    """
+    Run a JSON-mode Gemini request with the async client and parse it into `schema`.
+    
+    Transient failures are retried and slow calls hedged (see app.core.resilience).
+    
+    Args:
+        contents: Prompt text
+        schema: Pydantic model describing the expected response
+        stage: Stage name used in timeout errors
+        
+    Raises:
+        UpstreamTimeoutError: If the last attempt exceeds LLM_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Gemini circuit breaker is open
+    """
+    response = await gemini_upstream.call(
+        lambda: get_client().aio.models.generate_content(
+            model=settings.GEMINI_ANALYSIS_MODEL,
+            contents=contents,
+            config={
+                "response_mime_type": "application/json",
+                "response_json_schema": schema.model_json_schema(),
+            },
+        ),
+        stage=stage,
+        idempotent=True,
+    )
+    return schema(**response.parsed)
+
+
+async def synthesize_speech(text: str, voice: str) -> tuple[bytes, int]:
+    """
+    Speak `text` with one of Gemini's prebuilt voices.
+
+    Args:
+        text: What to say
+        voice: Prebuilt voice name (e.g. GEMINI_VOICE_ID)
+
+    Returns:
+        tuple[bytes, int]: 16-bit mono PCM and its sample rate
+
+    Raises:
+        UpstreamTimeoutError: If the last attempt exceeds LLM_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Gemini circuit breaker is open
+    """
+    response = await gemini_upstream.call(
+        lambda: get_client().aio.models.generate_content(
+            model=settings.GEMINI_TTS_MODEL,
+            contents=text,
+            config={
+                "response_modalities": ["AUDIO"],
+                "speech_config": {"voice_config": {"prebuilt_voice_config": {"voice_name": voice}}},
+            },
+        ),
+        stage="speech_synthesis",
+        idempotent=True,
+    )
+    audio = response.candidates[0].content.parts[0].inline_data
+    rate = re.search(r"rate=(\d+)", audio.mime_type or "")  # e.g. "audio/L16;codec=pcm;rate=24000"
+    return audio.data, int(rate.group(1)) if rate else 24000
@@ -1,8 +1,25 @@
 """Gemini Live Chat service for managing voice conversations with AI."""
+import uuid
+from typing import Awaitable, Callable
+
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn
 from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
 from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.frames.frames import Frame, LLMRunFrame, TextFrame
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    EndFrame,
+    Frame,
+    InterimTranscriptionFrame,
+    LLMRunFrame,
+    TextFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
@@ -13,8 +30,12 @@ from pipecat.processors.aggregators.llm_response_universal import (
 )
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.processors.frameworks.rtvi import RTVIServerMessageFrame
-from pipecat.services.google.gemini_live.llm import GeminiLiveLLMService
-from pipecat.transports.daily.transport import DailyParams, DailyTransport
+from pipecat.services.google.gemini_live.llm import (
+    ContextWindowCompressionParams,
+    GeminiLiveLLMService,
+    InputParams,
+)
+from pipecat.transports.daily.transport import DailyParams, DailyTranscriptionSettings, DailyTransport
 from pipecat.turns.user_stop.turn_analyzer_user_turn_stop_strategy import (
     TurnAnalyzerUserTurnStopStrategy,
 )
@@ -23,6 +44,12 @@ from pipecat.turns.user_turn_strategies import UserTurnStrategies
 from app.core.config import settings
 from app.core.logger import logger
 from app.core.prompts import get_vocab_chatbot_prompt
+from app.services.canned_audio import CANNED_UTTERANCES, canned_audio
+from app.services.chat_context import ContextWindowPolicy
+from app.services.progress import progress_writer
+from app.services.target_words import TargetWordDetector
+from app.services.turn_inference import turn_inference
+from app.services.turn_latency import TurnLatencyTracker
 
 # Default target words if none are provided by the client
 DEFAULT_TARGET_WORDS = ["りんご", "あい"]
@@ -50,6 +77,97 @@ DEFAULT_TARGET_WORDS = ["りんご", "あい"]
 #         await self.push_frame(frame, direction)
 
 
+class TurnLatencyProbe(FrameProcessor):
+    """Pass-through processor that reports downstream turn events to a TurnLatencyTracker."""
+
+    def __init__(self, tracker: TurnLatencyTracker, events: dict[type[Frame], str]):
+        super().__init__()
+        self._tracker = tracker
+        self._events = events
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if direction == FrameDirection.DOWNSTREAM:
+            for frame_type, event in self._events.items():
+                if isinstance(frame, frame_type):
+                    if event == "user_started":
+                        self._tracker.user_started()
+                    else:
+                        self._tracker.mark(event)
+                    break
+        await self.push_frame(frame, direction)
+
+
+class TargetWordSpotter(FrameProcessor):
+    """Feeds the user's Daily transcription to a TargetWordDetector (placed after transport.input()).
+
+    Words heard are passed to `on_heard` as hints; mark_word decides whether they
+    count. Transcription frames stop here: Gemini Live hears the audio itself, and the
+    user aggregator must not add a second copy of the user's turn to the context.
+    """
+
+    def __init__(self, detector: TargetWordDetector, on_heard: Callable[[str], Awaitable[None]]):
+        super().__init__()
+        self._detector = detector
+        self._on_heard = on_heard
+        self.user_id: str | None = None  # the participant being transcribed, once connected
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, InterimTranscriptionFrame):
+            return  # interim results can still be revised
+        if isinstance(frame, TranscriptionFrame):
+            if frame.user_id == self.user_id:
+                for word in self._detector.feed(frame.text):
+                    logger.info(f"Target word heard in transcription: {word}")
+                    await self._on_heard(word)
+            return
+        await self.push_frame(frame, direction)
+
+
+class CannedSpeechPlayer(FrameProcessor):
+    """Plays pre-synthesized audio frames into the output (placed right after the LLM).
+
+    Once the final line starts, the LLM's own audio is dropped, so a reply that
+    Gemini is still generating can't play over or after it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.finished = False
+
+    async def play(self, frames: list[Frame], final: bool = False) -> None:
+        self.finished = self.finished or final
+        for frame in frames:
+            await self.push_frame(frame)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if self.finished and isinstance(frame, TTSAudioRawFrame) and direction == FrameDirection.DOWNSTREAM:
+            return
+        await self.push_frame(frame, direction)
+
+
+class ContextCompactor(FrameProcessor):
+    """Applies a ContextWindowPolicy to the chat context each time the bot stops speaking."""
+
+    def __init__(self, context: LLMContext, policy: ContextWindowPolicy, remaining_words: Callable[[], list[str]]):
+        super().__init__()
+        self._context = context
+        self._policy = policy
+        self._remaining_words = remaining_words
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, BotStoppedSpeakingFrame) and direction == FrameDirection.DOWNSTREAM:
+            before = len(self._context.get_messages())
+            compacted = self._policy.compact(self._context.get_messages(), self._remaining_words())
+            if compacted is not None:
+                self._context.set_messages(compacted)
+                logger.debug(f"Chat context compacted: {before} -> {len(compacted)} messages")
+        await self.push_frame(frame, direction)
+
+
 def _create_tools_schema(target_words: list[str]) -> list[dict]:
     """Create the tools schema for Gemini function calling."""
     return [{
@@ -71,6 +189,20 @@ def _create_tools_schema(target_words: list[str]) -> list[dict]:
     }]
 
 
+def load_turn_models() -> tuple[SileroVADAnalyzer, BaseSmartTurn]:
+    """Create the VAD and smart-turn analyzers for one session (pre-loaded by bot workers).
+
+    With TURN_INFERENCE_SHARED they run on the process-wide models in
+    app.services.turn_inference; otherwise each session loads its own.
+    """
+    if settings.TURN_INFERENCE_SHARED:
+        return turn_inference.analyzers()
+    return (
+        SileroVADAnalyzer(params=VADParams(stop_secs=settings.VAD_STOP_SECS)),
+        LocalSmartTurnAnalyzerV3(),
+    )
+
+
 def _normalize_words(words: list[str]) -> list[str]:
     cleaned: list[str] = []
     seen: set[str] = set()
@@ -83,7 +215,17 @@ def _normalize_words(words: list[str]) -> list[str]:
     return cleaned
 
 
-async def run_bot(room_url: str, token: str, target_words: list[str], video_summary: str = "") -> None:
+async def run_bot(
+    room_url: str,
+    token: str,
+    target_words: list[str],
+    video_summary: str = "",
+    target_readings: dict[str, str] | None = None,
+    learner_id: str = "",
+    session_id: str | None = None,
+    turn_models: tuple[SileroVADAnalyzer, BaseSmartTurn] | None = None,
+    on_joined: Callable[[], Awaitable[None]] | None = None,
+) -> None:
     """
     Run the Gemini Live Chat bot in a Daily.co room.
     
@@ -92,13 +234,26 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
         token: The authentication token for the room
         target_words: List of vocabulary words to practice
         video_summary: Summary of the video to provide context for the conversation
+        target_readings: Kana reading per target word, for local word detection
+        learner_id: Learner whose progress the session records (DEFAULT_LEARNER_ID if empty)
+        session_id: Id the session's progress is recorded under (generated if not given)
+        turn_models: Pre-loaded (VAD, smart-turn) analyzers from `load_turn_models`
+        on_joined: Called once the bot has joined the room
     """
     logger.info(f"Starting bot for room: {room_url}")
     logger.info(f"Video summary: {video_summary}")
     
-    # Initialize state - track remaining words
+    # Initialize state - track remaining words (heard by local detection, confirmed by the mark_word tool)
     normalized_targets = _normalize_words(target_words) or DEFAULT_TARGET_WORDS
-    remaining_words = list(normalized_targets)
+    detector = TargetWordDetector(normalized_targets, target_readings)
+    session_id = session_id or uuid.uuid4().hex[:12]
+    if settings.PROGRESS_ENABLED:
+        progress_writer.session_started(session_id, learner_id or settings.DEFAULT_LEARNER_ID, detector.words)
+
+    # Fixed lines play from the audio cache when it has them; otherwise Gemini speaks them
+    canned_audio.ensure_in_background()
+    intro_frames = canned_audio.frames("intro") if settings.CANNED_INTRO_ENABLED else None
+    speech = CannedSpeechPlayer()
 
     transport = DailyTransport(
         room_url,
@@ -108,6 +263,11 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
             audio_in_enabled=True,
             audio_out_enabled=True,
             video_out_enabled=False,
+            transcription_enabled=settings.TARGET_WORD_DETECTION_ENABLED,
+            transcription_settings=DailyTranscriptionSettings(
+                language=settings.TRANSCRIPTION_LANGUAGE,
+                model=settings.TRANSCRIPTION_MODEL,
+            ),
         ),
     )
 
@@ -117,37 +277,72 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
     llm = GeminiLiveLLMService(
         api_key=settings.GOOGLE_API_KEY,
         voice_id=settings.GEMINI_VOICE_ID,
-        tools=tools
+        tools=tools,
+        # With a cached intro the bot has already spoken; Gemini waits for the user's first turn
+        inference_on_context_initialization=intro_frames is None,
+        params=InputParams(
+            context_window_compression=ContextWindowCompressionParams(
+                enabled=True, trigger_tokens=settings.GEMINI_CONTEXT_TRIGGER_TOKENS or None
+            ),
+        ),
     )
 
+    async def close_session() -> bool:
+        """Play the cached closing line and end the session; False if it isn't cached yet."""
+        if speech.finished:
+            return True
+        closing_frames = canned_audio.frames("closing")
+        if closing_frames is None:
+            return False
+        logger.info("All words found, playing the closing line")
+        await speech.play(closing_frames, final=True)
+        await task.queue_frames([EndFrame()])
+        return True
+
+    async def hint_word(heard_word: str) -> None:
+        """Tell the frontend a target word was heard; it only counts once mark_word confirms it."""
+        await task.queue_frames([RTVIServerMessageFrame(data={
+            "type": "word_heard",
+            "payload": heard_word
+        })])
+
+    async def announce_word(matched_word: str) -> None:
+        """Notify the frontend about a confirmed word (and completion after the last one) and record it."""
+        if settings.PROGRESS_ENABLED:
+            progress_writer.word_used(session_id, matched_word)
+        await task.queue_frames([RTVIServerMessageFrame(data={
+            "type": "word_detected",
+            "payload": matched_word
+        })])
+        if not detector.remaining_words:
+            await task.queue_frames([RTVIServerMessageFrame(data={
+                "type": "all_words_completed",
+                "payload": matched_word
+            })])
+            await close_session()
+
     # Define the tool handler for marking words
     async def mark_word_handler(function_name, tool_call_id, args, llm, context, result_callback):
         """Handle the mark_word tool call when a target word is detected."""
         word = str(args.get("word", "")).strip()
-        normalized_word = word.casefold()
-        
-        # Update state
-        remaining_normalized = [w.casefold() for w in remaining_words]
-        if normalized_word in remaining_normalized:
-            index = remaining_normalized.index(normalized_word)
-            matched_word = remaining_words.pop(index)
-            
-            # Notify frontend about detected word
-            await task.queue_frames([RTVIServerMessageFrame(data={
-                "type": "word_detected",
-                "payload": matched_word
-            })])
-            
+        matched_word = detector.resolve(word)
+
+        # Update state; the transcription may have heard the word already, this confirms the sentence
+        if matched_word is not None and detector.mark(matched_word):
+            await announce_word(matched_word)
+            remaining_words = detector.remaining_words
+
             # Craft instructions for the next turn
-            if not remaining_words:
-                await task.queue_frames([RTVIServerMessageFrame(data={
-                    "type": "all_words_completed",
-                    "payload": matched_word
-                })])
+            if not remaining_words and speech.finished:
+                result_msg = (
+                    f"The user said '{word}'. All words have been found and the closing message "
+                    "has already been played to the user. Do not say anything more."
+                )
+            elif not remaining_words:
                 result_msg = (
                     f"The user said '{word}'. All words have been found. "
                     "You must respond with exactly this closing message in Japanese, then end the conversation and do not ask new questions: "
-                    "「素晴らしいですね！今日の会話はここまでにしましょう。お疲れさまでした。では、またね。」"
+                    f"「{CANNED_UTTERANCES['closing']}」"
                 )
             else:
                 result_msg = (
@@ -156,40 +351,66 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
                     "Keep the conversation flowing and subtly guide them to say the remaining words."
                 )
         else:
-            result_msg = f"The word '{word}' was already found. Remaining words: {', '.join(remaining_words)}."
+            result_msg = (
+                f"The word '{word}' was already found. Remaining words: {', '.join(detector.remaining_words)}."
+            )
 
         logger.info(f"Tool result: {result_msg}")
         
         # This string is fed back to Gemini as the result of the tool call
         await result_callback(result_msg)
         # Nudge the model to continue after tool completion
-        await task.queue_frames([LLMRunFrame()])
+        if not speech.finished:
+            await task.queue_frames([LLMRunFrame()])
 
     llm.register_function("mark_word", mark_word_handler)
 
     messages = get_vocab_chatbot_prompt(normalized_targets, video_summary)
+    if intro_frames is not None:
+        messages.append({"role": "assistant", "content": CANNED_UTTERANCES["intro"]})
 
+    vad_analyzer, turn_analyzer = turn_models or load_turn_models()
     context = LLMContext(messages)
     user_aggregator, assistant_aggregator = LLMContextAggregatorPair(
         context,
         user_params=LLMUserAggregatorParams(
             user_turn_strategies=UserTurnStrategies(
-                stop=[TurnAnalyzerUserTurnStopStrategy(turn_analyzer=LocalSmartTurnAnalyzerV3())]
+                stop=[TurnAnalyzerUserTurnStopStrategy(turn_analyzer=turn_analyzer)]
             ),
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=settings.VAD_STOP_SECS)),
+            vad_analyzer=vad_analyzer,
         ),
     )
 
     # Create response logger
     # response_logger = ResponseLogger()
 
+    word_spotter = TargetWordSpotter(detector, hint_word)
+    context_policy = ContextWindowPolicy(
+        settings.CHAT_CONTEXT_MAX_MESSAGES,
+        settings.CHAT_CONTEXT_RECENT_MESSAGES,
+        settings.CHAT_CONTEXT_SUMMARY_MAX_CHARS,
+    )
+
+    # VAD stop -> turn decision -> first LLM audio -> playback, per turn (keyed by room name)
+    latency = TurnLatencyTracker(room_url.rstrip("/").rsplit("/", 1)[-1])
+
     pipeline = Pipeline(
         [
             transport.input(),
+            *([word_spotter] if settings.TARGET_WORD_DETECTION_ENABLED else []),
             user_aggregator,
+            TurnLatencyProbe(latency, {
+                VADUserStoppedSpeakingFrame: "vad_stop",
+                UserStartedSpeakingFrame: "user_started",
+                UserStoppedSpeakingFrame: "turn_end",
+            }),
             llm,
+            speech,
+            TurnLatencyProbe(latency, {TTSAudioRawFrame: "first_audio"}),
             # response_logger,  # Log responses after LLM
             transport.output(),
+            TurnLatencyProbe(latency, {BotStartedSpeakingFrame: "playback"}),
+            ContextCompactor(context, context_policy, lambda: detector.remaining_words),
             assistant_aggregator,
         ]
     )
@@ -197,6 +418,7 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
     task = PipelineTask(
         pipeline,
         params=PipelineParams(
+            audio_out_sample_rate=settings.BOT_AUDIO_OUT_SAMPLE_RATE,
             enable_metrics=True,
             enable_usage_metrics=True,
         ),
@@ -205,10 +427,21 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
     @task.rtvi.event_handler("on_client_ready")
     async def on_client_ready(rtvi):
         await task.queue_frames([LLMRunFrame()])
+        if intro_frames is not None:
+            await speech.play(intro_frames)
+
+    @transport.event_handler("on_joined")
+    async def on_bot_joined(transport, data):
+        logger.info(f"Bot joined room: {room_url}")
+        if on_joined is not None:
+            await on_joined()
 
     @transport.event_handler("on_client_connected")
     async def on_client_connected(transport, client):
         logger.info("Client connected")
+        if settings.TARGET_WORD_DETECTION_ENABLED:
+            word_spotter.user_id = client["id"]
+            await transport.capture_participant_transcription(client["id"])
 
     @transport.event_handler("on_client_disconnected")
     async def on_client_disconnected(transport, client):
@@ -216,7 +449,13 @@ async def run_bot(room_url: str, token: str, target_words: list[str], video_summ
         await task.cancel()
 
     runner = PipelineRunner(handle_sigint=False)
-    await runner.run(task)
+    try:
+        await runner.run(task)
+    finally:
+        latency.close()
+        if settings.PROGRESS_ENABLED:
+            remaining = detector.remaining_words
+            progress_writer.session_ended(session_id, len(detector.words) - len(remaining), not remaining)
     
     logger.info("Bot session completed")
 
@@ -245,6 +484,15 @@ if __name__ == "__main__":
         default="",
         help="Video summary for conversation context",
     )
+    parser.add_argument(
+        "-r",
+        "--readings",
+        type=str,
+        required=False,
+        help="JSON object of target word readings",
+    )
+    parser.add_argument("-l", "--learner", type=str, required=False, default="", help="Learner id for progress")
+    parser.add_argument("-i", "--session-id", type=str, required=False, help="Session id for progress")
     args = parser.parse_args()
 
     parsed_words: list[str] = []
@@ -256,4 +504,23 @@ if __name__ == "__main__":
         except json.JSONDecodeError:
             parsed_words = []
 
-    asyncio.run(run_bot(args.url, args.token, parsed_words or DEFAULT_TARGET_WORDS, args.summary))
+    parsed_readings: dict[str, str] = {}
+    if args.readings:
+        try:
+            raw = json.loads(args.readings)
+            if isinstance(raw, dict):
+                parsed_readings = {str(word): str(reading) for word, reading in raw.items()}
+        except json.JSONDecodeError:
+            parsed_readings = {}
+
+    asyncio.run(
+        run_bot(
+            args.url,
+            args.token,
+            parsed_words or DEFAULT_TARGET_WORDS,
+            args.summary,
+            parsed_readings,
+            learner_id=args.learner,
+            session_id=args.session_id,
+        )
+    )
@@ -0,0 +1,149 @@
+"""Shared matching rules for Japanese words in transcripts and speech.
+
+The vocab pre-filter, the timestamp alignment and the live-chat target word
+detector all look for words with one Aho-Corasick pass. They build their
+patterns and fold their input here so the three agree on what counts as a hit:
+
+- Text is folded with NFKC and casefold (ＴＶ / tv). Kana spellings are
+  matched in hiragana and katakana, so お茶 / おちゃ / オチャ all hit; the
+  transcript itself is not converted, which would cost more than the match.
+- A word matches by its surface form, and by its kana reading if that reading
+  has at least MIN_KANA_PATTERN kana (いく or か occur inside unrelated words).
+- Verbs, i-adjectives and する-verbs also match by their stem, but only when
+  a conjugation follows. After a kanji stem (高 of 高い) one kana of an ending
+  is enough to rule out 高校. An all-kana stem (たか of たかい, い of いく)
+  needs a whole ending such as かった or きま(す), so たかしさん and いくら
+  do not match.
+"""
+import unicodedata
+from typing import Optional
+
+# Pattern kinds, in order of preference
+SURFACE, READING, STEM = 0, 1, 2
+
+MIN_KANA_PATTERN = 3
+
+# Godan verbs conjugate along the kana row of their ending (書く: 書か / 書き / 書け / 書こ)
+_GODAN_ROWS = {
+    "う": "わいうえお",
+    "く": "かきくけこ",
+    "ぐ": "がぎぐげご",
+    "す": "さしすせそ",
+    "つ": "たちつてと",
+    "ぬ": "なにぬねの",
+    "ぶ": "ばびぶべぼ",
+    "む": "まみむめも",
+    "る": "らりるれろ",
+}
+# te / ta forms (行く is the one く-verb that takes って / った)
+_GODAN_TE = {
+    "う": ("って", "った"),
+    "く": ("いて", "いた", "って", "った"),
+    "ぐ": ("いで", "いだ"),
+    "す": ("して", "した"),
+    "つ": ("って", "った"),
+    "ぬ": ("んで", "んだ"),
+    "ぶ": ("んで", "んだ"),
+    "む": ("んで", "んだ"),
+    "る": ("って", "った"),
+}
+_ICHIDAN = ("ます", "まし", "ませ", "た", "て", "ない", "なか", "なく", "れば", "よう", "られ", "させ", "ず")
+_ADJECTIVE = ("かっ", "くて", "くな", "くあ", "ければ", "さ", "そう", "すぎ")
+_SURU = ("し", "さ", "す", "せ")  # します / した / させる / すれば / せず
+
+
+def _godan(ending: str) -> tuple[str, ...]:
+    a, i, _, e, o = _GODAN_ROWS[ending]
+    return (a + "な", a + "れ", a + "せ", i + "ま", i + "た", e + "ば", e + "る", e + "ま", o + "う", *_GODAN_TE[ending])
+
+
+# Dictionary-form ending -> what can follow the stem. る is godan (切る) or ichidan (見る)
+CONJUGATIONS: dict[str, tuple[str, ...]] = {ending: _godan(ending) for ending in _GODAN_ROWS}
+CONJUGATIONS["る"] += _ICHIDAN
+CONJUGATIONS["い"] = _ADJECTIVE
+CONJUGATIONS["する"] = _SURU
+
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)}
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(ord("ぁ"), ord("ゖ") + 1)}
+
+
+def fold(text: str) -> str:
+    """Normalize width and case (one character per character for Japanese text)."""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def to_hiragana(text: str) -> str:
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def is_kana(char: str) -> bool:
+    """Hiragana or the long vowel mark (patterns are built in hiragana)."""
+    return "ぁ" <= char <= "ゖ" or char == "ー"
+
+
+def _spellings(kana: str) -> list[str]:
+    return list(dict.fromkeys((kana, kana.translate(_HIRAGANA_TO_KATAKANA))))
+
+
+def stem(word: str) -> Optional[tuple[str, tuple[str, ...]]]:
+    """
+    Split a folded verb or i-adjective into its stem and the endings that may follow it.
+
+    Returns:
+        tuple | None: (stem, endings), or None for words that don't inflect
+    """
+    if word.endswith("する") and len(word) > 2:
+        head, ending = word[:-2], "する"  # 勉強する -> 勉強 (します / した / して)
+    elif len(word) >= 2 and word[-1] in CONJUGATIONS:
+        head, ending = word[:-1], word[-1]  # 食べる -> 食べ, 高い -> 高, たべる -> たべ
+    else:
+        return None
+    endings = CONJUGATIONS[ending]
+    if all(is_kana(c) for c in head):
+        # Kana stems occur inside other words; only a whole ending shows a
+        # conjugation. After one kana even that needs two more (いきます, not
+        # みた in みたい), and a one-kana adjective stem (あ of あい) is hopeless
+        if len(head) == 1:
+            endings = tuple(e for e in endings if len(e) >= 2) if ending != "い" else ()
+        return (head, endings) if endings else None
+    return head, tuple(dict.fromkeys(ending[0] for ending in endings))
+
+
+def word_patterns(surface: str, reading: str = "") -> list[tuple[str, int, tuple[str, ...]]]:
+    """
+    Patterns that find one word in folded text (see module docstring).
+
+    Args:
+        surface: The word as written
+        reading: Its kana reading, if known
+
+    Returns:
+        list: (pattern, kind, endings) triples; a match only counts if the
+            folded text continues with one of `endings` (any text if empty)
+    """
+    surface = fold(surface.strip())
+    if not surface:
+        return []
+    kana_surface = to_hiragana(surface)
+    reading = to_hiragana(fold(reading.strip()))
+    if all(is_kana(c) for c in kana_surface):
+        patterns = [(spelling, SURFACE, ()) for spelling in _spellings(kana_surface)]
+        surface = kana_surface
+    else:
+        patterns = [(surface, SURFACE, ())]
+    surface_stem = stem(surface)
+    if surface_stem:
+        patterns.append((surface_stem[0], STEM, surface_stem[1]))
+    if reading and reading != surface:
+        if len(reading) >= MIN_KANA_PATTERN:
+            patterns.extend((spelling, READING, ()) for spelling in _spellings(reading))
+        reading_stem = stem(reading) if surface_stem else None
+        if reading_stem:
+            patterns.append((reading_stem[0], STEM, reading_stem[1]))
+    return patterns
+
+
+def conjugates(text: str, end: int, endings: tuple[str, ...]) -> bool:
+    """True if a match ending at `end` is followed by one of `endings` (always, if there are none)."""
+    return not endings or text.startswith(endings, end)
@@ -0,0 +1,175 @@
+"""Write-behind persistence of learner progress from the bot processes.
+
+A chat session produces three kinds of events: it starts (learner and target
+words), the learner uses a target word (confirmed by Gemini's `mark_word`),
+and it ends. They go to `chat_sessions` and `vocab_attempts` in vocab.db,
+which `get_learner_mastery` aggregates per learner.
+
+`run_bot` must never wait on SQLite, so `ProgressWriter` only puts events on
+an in-process queue. A daemon thread takes them off and applies whatever
+arrived within PROGRESS_FLUSH_INTERVAL_MS (at most PROGRESS_BATCH_MAX_EVENTS)
+in one `BEGIN IMMEDIATE` transaction. Each bot process therefore commits a
+few times per second however many sessions it hosts. Every worker and cold
+bot process has its own writer, and SQLite's busy timeout serializes them.
+If the queue fills up because SQLite is stalled, new events are dropped and
+counted rather than blocking the bot. Events still queued at interpreter exit
+are flushed.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db import get_connection, init_schema
+from app.db.repositories import end_chat_session, mark_vocab_used, start_chat_session
+
+_STOP = object()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ProgressWriter:
+    """Queues progress events and commits them in batches from a background thread (see module docstring)."""
+
+    def __init__(self, flush_interval_ms: float, batch_max_events: int, queue_max_events: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_max_events = max(1, batch_max_events)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_max_events))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counters = dict.fromkeys(("queued", "dropped", "written", "failed", "transactions"), 0)
+
+    def session_started(self, session_id: str, learner_id: str, target_words: list[str]) -> None:
+        self._put(("start", session_id, learner_id, list(target_words), _now()))
+
+    def word_used(self, session_id: str, word: str) -> None:
+        self._put(("used", session_id, word, _now()))
+
+    def session_ended(self, session_id: str, words_used: int, completed: bool) -> None:
+        self._put(("end", session_id, words_used, completed, _now()))
+
+    def _put(self, event: tuple) -> None:
+        """Hand an event to the writer thread; never blocks."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+            self._counters["queued"] += 1
+        except queue.Full:
+            self._counters["dropped"] += 1
+            if self._counters["dropped"] == 1 or self._counters["dropped"] % 1000 == 0:
+                logger.warning(f"Progress queue full, {self._counters['dropped']} events dropped so far")
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread, or restart it if it died."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.close)
+            else:
+                logger.warning("Progress writer thread was not running, restarting it")
+            self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        # SQLite connections belong to the thread that opened them: a restarted
+        # writer thread opens its own
+        self._conn = None
+        try:
+            while True:
+                event = self._queue.get()
+                if event is _STOP:
+                    return
+                batch = [event]
+                deadline = time.monotonic() + self.flush_interval
+                stopping = False
+                while len(batch) < self.batch_max_events:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if event is _STOP:
+                        stopping = True
+                        break
+                    batch.append(event)
+                self._write(batch)
+                if stopping:
+                    return
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _write(self, batch: list[tuple]) -> None:
+        try:
+            if self._conn is None:
+                conn = get_connection()
+                init_schema(conn)  # cold bot processes may start before the API created the tables
+                self._conn = conn
+            # Take the write lock up front (see batch_analysis._save_videos)
+            self._conn.execute("BEGIN IMMEDIATE")
+            for kind, *args in batch:
+                if kind == "start":
+                    start_chat_session(self._conn, *args)
+                elif kind == "used":
+                    mark_vocab_used(self._conn, *args)
+                else:
+                    end_chat_session(self._conn, *args)
+            self._conn.commit()
+            self._counters["written"] += len(batch)
+            self._counters["transactions"] += 1
+        except Exception as e:
+            # Any failure only loses this batch; the thread keeps serving the queue
+            try:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.rollback()
+            except sqlite3.Error:
+                self._conn = None  # reconnect for the next batch
+            self._counters["failed"] += len(batch)
+            logger.error(f"Could not write {len(batch)} progress events: {e!r}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every event queued so far is written (or failed); False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._counters["written"] + self._counters["failed"] < self._counters["queued"]:
+            if self._thread is None or not self._thread.is_alive() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write the remaining events and stop the thread (registered with atexit)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Progress writer did not drain its queue before exit")
+            return
+        thread.join(timeout)
+        if self._counters["queued"]:
+            logger.info(f"Progress writer stopped: {self.stats()}")
+
+    def stats(self) -> dict:
+        return dict(self._counters)
+
+
+progress_writer = ProgressWriter(
+    settings.PROGRESS_FLUSH_INTERVAL_MS,
+    settings.PROGRESS_BATCH_MAX_EVENTS,
+    settings.PROGRESS_QUEUE_MAX_EVENTS,
+)
@@ -0,0 +1,190 @@
+"""Pool of pre-created Daily rooms with bot tokens for instant session start.
+
+`/vocab-live-chat/start` used to create a room and then a token before it
+could answer (two Daily round-trips). The pool keeps DAILY_ROOM_POOL_SIZE
+rooms ready, each with its owner token, and a background task tops it up
+whenever a room is taken or evicted.
+
+Pooled rooms are created with DAILY_ROOM_POOL_MAX_IDLE_SECONDS of extra
+lifetime and evicted once they have idled that long, so a room handed out
+always has at least DAILY_ROOM_DURATION_SECONDS left. When a pooled room is
+handed out its `exp` is moved to now + DAILY_ROOM_DURATION_SECONDS in the
+background, so the session is ejected on time and not up to
+DAILY_ROOM_POOL_MAX_IDLE_SECONDS late. Evicted rooms are not deleted; Daily
+removes them at their `exp`.
+
+When the pool is empty (cold start, burst, Daily outage) `take` falls back
+to creating a room and token on demand.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.daily import create_room_with_token, set_room_expiration
+
+
+@dataclass
+class PooledRoom:
+    url: str
+    name: str
+    token: str  # owner token for the bot
+    expires_at: float  # room `exp` (unix time)
+
+    def remaining(self, now: float | None = None) -> float:
+        return self.expires_at - (time.time() if now is None else now)
+
+
+async def _create_room(duration_seconds: int) -> PooledRoom:
+    room_data, token = await create_room_with_token(duration_seconds)
+    expires_at = room_data.get("config", {}).get("exp") or time.time() + duration_seconds
+    return PooledRoom(url=room_data["url"], name=room_data["name"], token=token, expires_at=float(expires_at))
+
+
+class RoomPool:
+    """Background-refilled pool of Daily rooms (see module docstring)."""
+
+    def __init__(self, target_size: int, max_idle_seconds: int, refill_concurrency: int):
+        self.target_size = max(0, target_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.refill_concurrency = max(1, refill_concurrency)
+        self._rooms: deque[PooledRoom] = deque()
+        self._creating = 0
+        self._wakeup: asyncio.Event | None = None
+        self._refiller: asyncio.Task | None = None
+        self._expiry_updates: set[asyncio.Task] = set()
+        self._counters = dict.fromkeys(("hits", "misses", "created", "evicted", "refill_failures", "expiry_failures"), 0)
+
+    async def start(self) -> None:
+        """Start the background refill task (no-op when the pool size is 0)."""
+        if self.target_size == 0:
+            logger.info("Daily room pool disabled (DAILY_ROOM_POOL_SIZE=0)")
+            return
+        self._wakeup = asyncio.Event()
+        self._refiller = asyncio.create_task(self._refill_loop(), name="daily-room-pool")
+        logger.info(f"Daily room pool started (target size {self.target_size})")
+
+    async def stop(self) -> None:
+        """Stop refilling. Pooled rooms are dropped and expire on their own."""
+        if self._refiller is not None:
+            self._refiller.cancel()
+            await asyncio.gather(self._refiller, return_exceptions=True)
+            self._refiller = None
+        # Let in-flight `exp` updates finish so handed-out rooms still end on time
+        await asyncio.gather(*self._expiry_updates, return_exceptions=True)
+        self._rooms.clear()
+
+    async def take(self) -> PooledRoom:
+        """
+        Return a ready room with its bot token, creating one on demand if the pool is empty.
+
+        Returns:
+            PooledRoom: A room with at least DAILY_ROOM_DURATION_SECONDS left
+
+        Raises:
+            DailyAPIError: If on-demand room or token creation fails
+            UpstreamTimeoutError: If Daily does not answer within DAILY_TIMEOUT_SECONDS
+            UpstreamUnavailableError: If the Daily circuit breaker is open
+        """
+        self._evict_stale()
+        if self._rooms:
+            room = self._rooms.popleft()
+            self._counters["hits"] += 1
+            self._notify()
+            self._shorten(room)
+            logger.info(f"Took pooled Daily room {room.name} ({len(self._rooms)} left)")
+            return room
+        self._counters["misses"] += 1
+        self._notify()
+        logger.info("Daily room pool empty, creating a room on demand")
+        return await _create_room(settings.DAILY_ROOM_DURATION_SECONDS)
+
+    def _shorten(self, room: PooledRoom) -> None:
+        """Move a handed-out room's `exp` to a full session from now, without delaying the caller."""
+        expires_at = int(time.time() + settings.DAILY_ROOM_DURATION_SECONDS)
+        if expires_at >= room.expires_at:
+            return
+        room.expires_at = float(expires_at)
+        task = asyncio.create_task(self._set_expiration(room.name, expires_at))
+        self._expiry_updates.add(task)
+        task.add_done_callback(self._expiry_updates.discard)
+
+    async def _set_expiration(self, room_name: str, expires_at: int) -> None:
+        try:
+            await set_room_expiration(room_name, expires_at)
+        except Exception as e:
+            # The room still expires at its pooled `exp`; the bot's own session timeout ends it on time
+            self._counters["expiry_failures"] += 1
+            logger.warning(f"Could not shorten Daily room {room_name}: {e}")
+
+    def _evict_stale(self) -> None:
+        now = time.time()
+        while self._rooms and self._rooms[0].remaining(now) < settings.DAILY_ROOM_DURATION_SECONDS:
+            room = self._rooms.popleft()
+            self._counters["evicted"] += 1
+            logger.info(f"Evicted idle Daily room {room.name}")
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _refill_loop(self) -> None:
+        failures = 0
+        while True:
+            self._evict_stale()
+            missing = self.target_size - len(self._rooms) - self._creating
+            if missing > 0:
+                batch = min(missing, self.refill_concurrency)
+                self._creating += batch
+                try:
+                    results = await asyncio.gather(
+                        *(
+                            _create_room(settings.DAILY_ROOM_DURATION_SECONDS + self.max_idle_seconds)
+                            for _ in range(batch)
+                        ),
+                        return_exceptions=True,
+                    )
+                finally:
+                    self._creating -= batch
+                created = [room for room in results if isinstance(room, PooledRoom)]
+                # Each batch expires after the previous one, so the deque stays sorted by expiry
+                self._rooms.extend(sorted(created, key=lambda room: room.expires_at))
+                self._counters["created"] += len(created)
+                errors = [error for error in results if isinstance(error, BaseException)]
+                if not errors:
+                    failures = 0
+                    continue
+                failures += 1
+                self._counters["refill_failures"] += len(errors)
+                delay = min(settings.RETRY_BACKOFF_MAX_SECONDS, settings.RETRY_BACKOFF_BASE_SECONDS * 2 ** failures)
+                logger.warning(f"Daily room pool refill failed ({errors[0]}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            # Full: sleep until a room is taken or the oldest one goes stale
+            self._wakeup.clear()
+            timeout = None
+            if self._rooms:
+                timeout = max(0.0, self._rooms[0].remaining() - settings.DAILY_ROOM_DURATION_SECONDS)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.target_size > 0,
+            "size": len(self._rooms),
+            "target_size": self.target_size,
+            "creating": self._creating,
+            **self._counters,
+        }
+
+
+room_pool = RoomPool(
+    settings.DAILY_ROOM_POOL_SIZE,
+    settings.DAILY_ROOM_POOL_MAX_IDLE_SECONDS,
+    settings.DAILY_ROOM_POOL_REFILL_CONCURRENCY,
+)
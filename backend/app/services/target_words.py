@@ -0,0 +1,88 @@
+"""Local detection of a chat session's target words in the user's speech.
+
+`TargetWordDetector` puts every target word's patterns (surface form, kana
+reading from the client's `pronunciation` or the bundled JLPT dictionary,
+conjugation stem; see app/services/japanese_text.py) into one Aho-Corasick
+matcher. So お茶 / おちゃ / オチャ and 食べる / 食べました / たべた all hit,
+while 高校 does not count as 高い. Daily's transcription of the user is fed
+through it as it arrives. A hit is only a hint: a word is used once Gemini's
+`mark_word` tool call confirms it came in a complete sentence, which the
+transcript alone cannot tell. Matching is linear in the transcript.
+"""
+from functools import lru_cache
+from typing import Optional
+
+from app.services.aho_corasick import AhoCorasick
+from app.services.japanese_text import conjugates, fold, to_hiragana, word_patterns
+from app.services.vocab_prefilter import load_dictionary
+
+
+@lru_cache(maxsize=1)
+def _dictionary_readings() -> dict[str, str]:
+    entries, _ = load_dictionary()
+    return {_key(entry.surface): entry.reading for entry in entries}
+
+
+def _key(word: str) -> str:
+    """Lookup key for any spelling of a word's surface form (オチャ / おちゃ, ＴＶ / tv)."""
+    return to_hiragana(fold(word.strip()))
+
+
+class TargetWordDetector:
+    """Target words of one session: heard in the transcription, and confirmed (see module docstring)."""
+
+    def __init__(self, words: list[str], readings: Optional[dict[str, str]] = None):
+        """
+        Args:
+            words: Target words, as shown to the user and the LLM
+            readings: Kana reading per word (optional; looked up in the JLPT dictionary otherwise)
+        """
+        self.words = list(words)
+        readings = {_key(word): reading for word, reading in (readings or {}).items() if reading}
+        self._index: dict[str, int] = {}  # _key(word) -> position in `words`
+        patterns: dict[str, tuple[int, tuple[str, ...]]] = {}  # pattern -> (word position, required endings)
+        for i, word in enumerate(self.words):
+            surface = _key(word)
+            if not surface:
+                continue
+            self._index.setdefault(surface, i)
+            reading = readings.get(surface) or _dictionary_readings().get(surface, "")
+            for pattern, _, endings in word_patterns(word, reading):
+                patterns.setdefault(pattern, (i, endings))
+        self._matcher = AhoCorasick(patterns.items())
+        self._remaining: dict[int, None] = dict.fromkeys(self._index.values())  # ordered set
+        self._heard: set[int] = set()
+
+    @property
+    def remaining_words(self) -> list[str]:
+        return [self.words[i] for i in self._remaining]
+
+    def resolve(self, word: str) -> Optional[str]:
+        """The target word `word` refers to (any spelling of its surface form), or None."""
+        index = self._index.get(_key(word))
+        return None if index is None else self.words[index]
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Find the target words spoken in `text`. They stay remaining until `mark`.
+
+        Returns:
+            list[str]: Remaining words heard for the first time, in order of appearance
+        """
+        heard = []
+        text = fold(text)
+        for _, end, (index, endings) in self._matcher.iter_matches(text):
+            if not conjugates(text, end, endings):
+                continue
+            if index in self._remaining and index not in self._heard:
+                self._heard.add(index)
+                heard.append(self.words[index])
+        return heard
+
+    def mark(self, word: str) -> bool:
+        """Mark `word` as used (on the LLM's say-so); True if it was still remaining."""
+        index = self._index.get(_key(word))
+        if index is None or index not in self._remaining:
+            return False
+        del self._remaining[index]
+        return True
@@ -0,0 +1,122 @@
+"""Local timestamp alignment and example-sentence extraction for vocab items.
+
+The Apify segments are packed into a compact, array-backed index (start and
+duration arrays plus character offsets into one joined, folded text). All
+vocab items are then located in a single Aho-Corasick pass over that text,
+matching the surface form, the reading and, for inflecting words, the stem
+(see app/services/japanese_text.py). The first occurrence fixes the item's timestamp and the
+containing segment becomes its example sentence. The whole stage is linear in
+transcript length and needs no extra LLM call.
+"""
+from array import array
+from dataclasses import dataclass
+
+from app.schemas.video import Video
+from app.services.aho_corasick import AhoCorasick
+from app.services.japanese_text import SURFACE, conjugates, fold, word_patterns
+
+_SEGMENT_SEPARATOR = "\n"
+
+
+@dataclass
+class TranscriptIndex:
+    """Array-backed view of transcript segments."""
+
+    starts: array
+    durations: array
+    offsets: array  # offset of each segment's first character in `text`
+    sources: array  # position of each segment in the raw Apify `data` list
+    text: str
+
+    @classmethod
+    def from_transcript_data(cls, transcript_data: dict) -> "TranscriptIndex":
+        """Parse Apify segments (`{"data": [{"start", "dur", "text"}, ...]}`)."""
+        starts, durations, offsets, sources = array("d"), array("d"), array("l"), array("l")
+        parts: list[str] = []
+        position = 0
+        for source, segment in enumerate(transcript_data.get("data") or []):
+            if not isinstance(segment, dict):
+                continue
+            try:
+                start = float(segment.get("start", 0))
+                duration = float(segment.get("dur", 0))
+            except (TypeError, ValueError):
+                continue
+            text = fold(str(segment.get("text", "")).replace(_SEGMENT_SEPARATOR, " "))
+            starts.append(start)
+            durations.append(duration)
+            offsets.append(position)
+            sources.append(source)
+            parts.append(text)
+            position += len(text) + len(_SEGMENT_SEPARATOR)
+        return cls(starts, durations, offsets, sources, _SEGMENT_SEPARATOR.join(parts))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def _patterns_for(index: int, japanese_vocab: str, pronunciation: str) -> list[tuple[str, tuple]]:
+    # Match kinds rank surface form, then reading, then conjugation stem
+    patterns: dict[str, tuple] = {}
+    for pattern, kind, endings in word_patterns(japanese_vocab, pronunciation):
+        patterns.setdefault(pattern, (index, kind, endings))
+    return list(patterns.items())
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as mm:ss (minutes keep counting past 59)."""
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def align_vocab(video: Video, transcript_data: dict) -> Video:
+    """
+    Correct vocab timestamps and fill example sentences from the transcript.
+
+    Items that cannot be found keep the timestamp suggested by the LLM.
+
+    Args:
+        video: Analysis result to post-process
+        transcript_data: Raw Apify transcript the analysis was based on
+
+    Returns:
+        Video: A copy of `video` with aligned vocab
+    """
+    transcript = TranscriptIndex.from_transcript_data(transcript_data)
+    if not len(transcript) or not video.vocab:
+        return video
+
+    patterns = []
+    for i, item in enumerate(video.vocab):
+        patterns.extend(_patterns_for(i, item.japanese_vocab, item.pronunciation))
+    matcher = AhoCorasick(patterns)
+
+    # vocab index -> (match kind, segment index); earliest match of the best kind wins
+    best: dict[int, tuple[int, int]] = {}
+    segment = 0
+    offsets = transcript.offsets
+    for _, end, (vocab_index, kind, endings) in matcher.iter_matches(transcript.text):
+        if not conjugates(transcript.text, end, endings):
+            continue
+        # Matches arrive ordered by end offset and never span segments, so the
+        # segment pointer only moves forward
+        while segment + 1 < len(offsets) and offsets[segment + 1] < end:
+            segment += 1
+        current = best.get(vocab_index)
+        if current is None or kind < current[0]:
+            best[vocab_index] = (kind, segment)
+            if len(best) == len(video.vocab) and all(k == SURFACE for k, _ in best.values()):
+                break
+
+    aligned = []
+    for i, item in enumerate(video.vocab):
+        match = best.get(i)
+        if match is None:
+            aligned.append(item)
+            continue
+        _, segment_index = match
+        aligned.append(item.model_copy(update={
+            "timestamp": format_timestamp(transcript.starts[segment_index]),
+            "sentence": str(transcript_data["data"][transcript.sources[segment_index]].get("text", "")).strip(),
+        }))
+    return video.model_copy(update={"vocab": aligned})
+
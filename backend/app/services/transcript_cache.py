@@ -0,0 +1,114 @@
+"""Persistent transcript cache in front of the Apify scraper.
+
+Transcripts are stored content-addressed in SQLite (zlib-compressed JSON keyed
+by its SHA-256) and indexed by YouTube video id + target language. A bounded
+in-memory LRU of the same compressed blobs sits in front of the database so
+hot videos never touch disk; every hit decodes its own copy, so callers can
+modify the transcript they get without changing the cached one. The tables are
+created on first use, so the cache also works outside the API (scripts, bot
+processes) on a fresh database.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logger import logger
+from app.db import get_connection, init_schema
+from app.db.repositories import get_transcript_blob, save_transcript_blob
+
+
+def encode_transcript(transcript_data: dict) -> tuple[str, bytes]:
+    """Compress transcript data and return (content_hash, blob)."""
+    raw = json.dumps(transcript_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    blob = zlib.compress(raw, 6)
+    return hashlib.sha256(blob).hexdigest(), blob
+
+
+def decode_transcript(blob: bytes) -> dict:
+    """Inverse of `encode_transcript`."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class TranscriptCache:
+    """Two-level (memory, SQLite) transcript store with hit/miss counters."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self._memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self.db_hits = 0
+        self.db_misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = get_connection()
+        if not self._schema_ready:
+            init_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def get(self, video_id: str, target_language: str) -> dict | None:
+        """
+        Look up a transcript in memory, then in the database.
+
+        Returns:
+            dict | None: Raw transcript data as returned by Apify, or None on a miss
+        """
+        key = (video_id, target_language)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return decode_transcript(cached)
+
+        conn = self._connect()
+        try:
+            blob = get_transcript_blob(conn, video_id, target_language)
+        finally:
+            conn.close()
+
+        with self._lock:
+            if blob is None:
+                self.db_misses += 1
+                return None
+            self.db_hits += 1
+
+        self._memory.set(key, blob, size=len(blob))
+        return decode_transcript(blob)
+
+    def put(self, video_id: str, target_language: str, transcript_data: dict) -> None:
+        """Persist a freshly scraped transcript and warm the memory cache."""
+        content_hash, blob = encode_transcript(transcript_data)
+        conn = self._connect()
+        try:
+            save_transcript_blob(conn, video_id, target_language, content_hash, blob)
+            conn.commit()
+        finally:
+            conn.close()
+        self._memory.set((video_id, target_language), blob, size=len(blob))
+        logger.info(
+            f"Cached transcript {video_id}/{target_language} "
+            f"({len(blob)} bytes compressed, hash {content_hash[:12]})"
+        )
+
+    def invalidate(self, video_id: str, target_language: str) -> None:
+        """Drop a transcript from the memory tier (the DB copy is kept)."""
+        self._memory.pop((video_id, target_language))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for both tiers."""
+        memory = self._memory.stats()
+        with self._lock:
+            return {
+                "memory": memory,
+                "db_hits": self.db_hits,
+                "db_misses": self.db_misses,
+            }
+
+
+transcript_cache = TranscriptCache(
+    max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.TRANSCRIPT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,247 @@
+"""Transcript compaction to cut Gemini prompt tokens.
+
+Before the transcript goes into a prompt it is compacted in four steps:
+
+1. Filler lines ([音楽], (拍手), bare えー / あのー ...) are dropped.
+2. Repeated captions are dropped: lines that match a recent one after
+   normalization (width, case, punctuation) or are contained in it, and
+   rolling captions that re-show the previous line. Lines that merely look
+   alike (今日は寒いです / 今日は暑いです) are kept, they carry vocabulary.
+3. Adjacent short segments are merged into windows of up to
+   TRANSCRIPT_WINDOW_SECONDS / TRANSCRIPT_WINDOW_MAX_CHARS.
+4. If the result is still above TRANSCRIPT_TOKEN_BUDGET, windows are
+   sampled evenly across the video until it fits. The first window is always
+   kept, cut short if even it alone is over the budget.
+
+Each window is emitted as "[<seconds>] text", where <seconds> is the integer
+start offset; `decode_timestamp` maps it back to the usual mm:ss.
+"""
+import re
+import threading
+import unicodedata
+from dataclasses import asdict, dataclass
+
+from app.core.config import settings
+from app.services.chunker import count_tokens
+from app.services.youtube import format_transcript
+
+_ANNOTATION = re.compile(r"^[\[\(（【［].*[\]\)）】］]$")
+_PUNCTUATION = re.compile(r"[\s、。，．,.!?！？…・「」『』〜~ー-]+")
+_FILLERS = {"えー", "えーと", "えっと", "あー", "あの", "あのー", "うーん", "うん", "まあ", "uh", "um"}
+_DUPLICATE_LOOKBACK = 3
+
+
+@dataclass
+class CompactionStats:
+    """Per-analysis compaction report."""
+
+    tokens_before: int
+    tokens_after: int
+    segments: int
+    windows: int
+    dropped_filler: int
+    dropped_duplicates: int
+    dropped_for_budget: int
+
+
+@dataclass
+class CompactedTranscript:
+    text: str
+    stats: CompactionStats
+
+
+def encode_timestamp(seconds: float) -> str:
+    """Compact prompt timestamp: integer seconds from the start."""
+    return f"[{int(seconds)}]"
+
+
+def decode_timestamp(value: str) -> str:
+    """Map a compact "[93]" / "93" timestamp back to "01:33"; other values pass through."""
+    match = re.fullmatch(r"\[?(\d+)\]?", value.strip())
+    if not match:
+        return value
+    seconds = int(match.group(1))
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def _key(text: str) -> str:
+    return _PUNCTUATION.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+_FILLER_KEYS = {_key(filler) for filler in _FILLERS}
+
+
+def _is_filler(text: str) -> bool:
+    stripped = text.strip()
+    if not stripped or _ANNOTATION.match(stripped):
+        return True
+    key = _key(stripped)
+    return not key or key in _FILLER_KEYS
+
+
+def _is_repeat(key: str, recent: list[str]) -> bool:
+    return any(key in previous for previous in recent)
+
+
+def _parse_segments(transcript_data: dict) -> list[tuple[float, float, str]]:
+    segments = []
+    for segment in transcript_data.get("data") or []:
+        if not isinstance(segment, dict):
+            continue
+        try:
+            start = float(segment.get("start", 0))
+            duration = float(segment.get("dur", 0))
+        except (TypeError, ValueError):
+            continue
+        segments.append((start, duration, " ".join(str(segment.get("text", "")).split())))
+    return segments
+
+
+def _truncate_to_budget(line: str, budget: int) -> str:
+    """Longest prefix of `line` within `budget` tokens."""
+    low, high = 0, len(line)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(line[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return line[:low]
+
+
+def _sample_to_budget(lines: list[str], budget: int) -> tuple[list[str], int]:
+    """Keep an evenly spaced subset of lines, starting with the first, whose token total fits `budget`."""
+    costs = [count_tokens(line) + 1 for line in lines]  # +1 for the newline
+    keep_ratio = min(1.0, budget / sum(costs))
+    while keep_ratio > 0.01:
+        kept, used, carry = [], 0, 1.0 - keep_ratio
+        for line, cost in zip(lines, costs):
+            carry += keep_ratio
+            if carry >= 1:
+                kept.append(line)
+                used += cost
+                carry -= 1
+        if used <= budget:
+            return kept, len(lines) - len(kept)
+        if len(kept) == 1:
+            break
+        keep_ratio *= 0.9
+    # Not even one window fits: keep the beginning of the first
+    return [_truncate_to_budget(lines[0], budget)], len(lines) - 1
+
+
+def compact_transcript(transcript_data: dict, token_budget: int | None = None) -> CompactedTranscript:
+    """
+    Compact raw Apify transcript data into prompt text.
+
+    Args:
+        transcript_data: Raw transcript data from Apify
+        token_budget: Max cl100k_base tokens for the result
+            (None = TRANSCRIPT_TOKEN_BUDGET; 0 = unlimited)
+
+    Returns:
+        CompactedTranscript: Prompt text plus a before/after token report
+    """
+    if token_budget is None:
+        token_budget = settings.TRANSCRIPT_TOKEN_BUDGET
+    tokens_before = count_tokens(format_transcript(transcript_data))
+    segments = _parse_segments(transcript_data)
+
+    dropped_filler = dropped_duplicates = 0
+    recent: list[str] = []
+    kept: list[tuple[float, float, str]] = []
+    for start, duration, text in segments:
+        if _is_filler(text):
+            dropped_filler += 1
+            continue
+        key = _key(text)
+        if kept and recent and recent[-1] != key and recent[-1] in key:
+            # Rolling caption that extends the previous one: keep only the longer line
+            previous_start, _, _ = kept.pop()
+            duration = start + duration - previous_start
+            start = previous_start
+            recent.pop()
+            dropped_duplicates += 1
+        elif _is_repeat(key, recent):
+            dropped_duplicates += 1
+            continue
+        kept.append((start, duration, text))
+        recent = (recent + [key])[-_DUPLICATE_LOOKBACK:]
+
+    lines: list[str] = []
+    window_start, window_texts, window_chars = 0.0, [], 0
+    for start, duration, text in kept:
+        if window_texts and (
+            start + duration - window_start > settings.TRANSCRIPT_WINDOW_SECONDS
+            or window_chars + len(text) > settings.TRANSCRIPT_WINDOW_MAX_CHARS
+        ):
+            lines.append(f"{encode_timestamp(window_start)} {' '.join(window_texts)}")
+            window_texts, window_chars = [], 0
+        if not window_texts:
+            window_start = start
+        window_texts.append(text)
+        window_chars += len(text)
+    if window_texts:
+        lines.append(f"{encode_timestamp(window_start)} {' '.join(window_texts)}")
+
+    if not lines:
+        # Nothing but filler survived: send the transcript as is (still within the budget)
+        lines = format_transcript(transcript_data).splitlines()
+
+    dropped_for_budget = 0
+    text = "\n".join(lines)
+    tokens_after = count_tokens(text)
+    if token_budget and tokens_after > token_budget:
+        lines, dropped_for_budget = _sample_to_budget(lines, token_budget)
+        text = "\n".join(lines)
+        tokens_after = count_tokens(text)
+        if tokens_after > token_budget:  # tokens can merge across lines
+            text = _truncate_to_budget(text, token_budget)
+            tokens_after = count_tokens(text)
+
+    stats = CompactionStats(
+        tokens_before=tokens_before,
+        tokens_after=tokens_after,
+        segments=len(segments),
+        windows=len(lines),
+        dropped_filler=dropped_filler,
+        dropped_duplicates=dropped_duplicates,
+        dropped_for_budget=dropped_for_budget,
+    )
+    _totals.record(stats)
+    return CompactedTranscript(text=text, stats=stats)
+
+
+class _CompactionTotals:
+    """Process-wide compaction counters for GET /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.analyses = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.last: CompactionStats | None = None
+
+    def record(self, stats: CompactionStats) -> None:
+        with self._lock:
+            self.analyses += 1
+            self.tokens_before += stats.tokens_before
+            self.tokens_after += stats.tokens_after
+            self.last = stats
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "analyses": self.analyses,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "last": asdict(self.last) if self.last else None,
+            }
+
+
+_totals = _CompactionTotals()
+
+
+def compaction_stats() -> dict:
+    """Return cumulative before/after token counts."""
+    return _totals.stats()
@@ -0,0 +1,250 @@
+"""Process-wide VAD and smart-turn inference shared by all bot sessions.
+
+pipecat's `SileroVADAnalyzer` and `LocalSmartTurnAnalyzerV3` each load their
+own ONNX session, so a worker hosting N sessions holds N copies of both
+models and runs inference on 2N threads, one small call at a time.
+`TurnInferenceEngine` loads each model once per process and micro-batches
+calls from concurrent sessions:
+
+- VAD: every 32 ms frame of every stream is a Silero call. Calls arriving
+  within VAD_BATCH_WINDOW_MS run as one batch; the model's recurrent state
+  and context stay per analyzer (per audio stream) and travel with the call.
+- Smart turn: each `SharedSmartTurnAnalyzer` keeps its own audio buffer and
+  turn state and extracts features on its own thread; end-of-turn requests
+  arriving within TURN_BATCH_WINDOW_MS (up to TURN_BATCH_MAX_SIZE) run as
+  one batch on one of TURN_INFERENCE_WORKERS threads.
+
+The analyzers are drop-in replacements used through
+`app.services.gemini_live_chat.load_turn_models` when TURN_INFERENCE_SHARED is on.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from importlib import resources
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import onnxruntime as ort
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn, SmartTurnParams
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+from transformers import WhisperFeatureExtractor
+
+from app.core.config import settings
+from app.core.logger import logger
+
+_SMART_TURN_SECONDS = 8
+_SMART_TURN_SAMPLE_RATE = 16000
+_VAD_MAX_BATCH = 64
+
+
+class _MicroBatcher:
+    """Runs `run_batch` over requests that arrive within `window` seconds of each other."""
+
+    def __init__(self, name: str, run_batch: Callable[[list], list], window: float, max_size: int, workers: int):
+        self.name = name
+        self.run_batch = run_batch
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.workers = max(1, workers)
+        self._requests: queue.SimpleQueue[tuple[Any, Future]] = queue.SimpleQueue()
+        self._counters = dict.fromkeys(("requests", "batches", "max_batch", "errors"), 0)
+        self._busy_seconds = 0.0
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            threading.Thread(target=self._loop, name=f"{self.name}-{i}", daemon=True).start()
+
+    def submit(self, item: Any) -> Any:
+        """Queue one request and block the calling thread until its batch has run."""
+        future: Future = Future()
+        self._requests.put((item, future))
+        return future.result()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            start = time.perf_counter()
+            try:
+                results = self.run_batch([item for item, _ in batch])
+            except Exception as e:
+                self._counters["errors"] += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._busy_seconds += time.perf_counter() - start
+            self._counters["requests"] += len(batch)
+            self._counters["batches"] += 1
+            self._counters["max_batch"] = max(self._counters["max_batch"], len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        batches = self._counters["batches"]
+        return {
+            **self._counters,
+            "mean_batch": round(self._counters["requests"] / batches, 2) if batches else 0.0,
+            "mean_batch_ms": round(self._busy_seconds / batches * 1000, 2) if batches else 0.0,
+        }
+
+
+class _SharedSileroModel(SileroOnnxModel):
+    """`SileroOnnxModel` for one stream whose calls run batched on the shared engine."""
+
+    def __init__(self, engine: "TurnInferenceEngine"):
+        self._engine = engine
+        self.reset_states()
+        self.sample_rates = [8000, 16000]
+
+    def __call__(self, x, sr: int):
+        x, sr = self._validate_input(x, sr)
+        num_samples = 512 if sr == 16000 else 256
+        if np.shape(x) != (1, num_samples):
+            raise ValueError(f"Provided audio shape is {np.shape(x)} (supported: (1, {num_samples}) at {sr} Hz)")
+        context_size = 64 if sr == 16000 else 32
+        if self._last_sr and self._last_sr != sr:
+            self.reset_states()
+        if not np.shape(self._context)[1]:
+            self._context = np.zeros((1, context_size), dtype="float32")
+        x = np.concatenate((self._context, x), axis=1)
+        out, self._state = self._engine.vad_batcher.submit((x, self._state, sr))
+        self._context = x[..., -context_size:]
+        self._last_sr = sr
+        self._last_batch_size = 1
+        return out
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """Silero VAD analyzer that runs on the engine's shared, batched model."""
+
+    def __init__(self, engine: "TurnInferenceEngine", *, sample_rate: Optional[int] = None,
+                 params: Optional[VADParams] = None):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = _SharedSileroModel(engine)
+        self._last_reset_time = 0
+
+
+class SharedSmartTurnAnalyzer(BaseSmartTurn):
+    """Smart-turn v3 analyzer whose model runs batched on the shared engine."""
+
+    def __init__(self, engine: "TurnInferenceEngine", *, sample_rate: Optional[int] = None,
+                 params: Optional[SmartTurnParams] = None):
+        super().__init__(sample_rate=sample_rate, params=params)
+        self._engine = engine
+
+    def _predict_endpoint(self, audio_array: np.ndarray) -> Dict[str, Any]:
+        """Called on this analyzer's executor thread; blocks until the batched result is in."""
+        probability = self._engine.predict_turn(audio_array)
+        return {"prediction": 1 if probability > 0.5 else 0, "probability": probability}
+
+
+class TurnInferenceEngine:
+    """Shared model sessions and their micro-batchers (see module docstring)."""
+
+    def __init__(self, vad_window_ms: float, turn_window_ms: float, turn_max_batch: int, turn_workers: int):
+        self.vad_batcher = _MicroBatcher("vad-inference", self._run_vad, vad_window_ms / 1000, _VAD_MAX_BATCH, 1)
+        self.turn_batcher = _MicroBatcher(
+            "turn-inference", self._run_turn, turn_window_ms / 1000, turn_max_batch, turn_workers
+        )
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            vad_options = ort.SessionOptions()
+            vad_options.inter_op_num_threads = 1
+            vad_options.intra_op_num_threads = 1
+            self._vad_session = ort.InferenceSession(
+                str(resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx")),
+                providers=["CPUExecutionProvider"],
+                sess_options=vad_options,
+            )
+            turn_options = ort.SessionOptions()
+            turn_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            turn_options.inter_op_num_threads = 1
+            turn_options.intra_op_num_threads = 1
+            turn_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._turn_session = ort.InferenceSession(
+                str(resources.files("pipecat.audio.turn.smart_turn.data").joinpath("smart-turn-v3.2-cpu.onnx")),
+                sess_options=turn_options,
+            )
+            self._feature_extractor = WhisperFeatureExtractor(chunk_length=_SMART_TURN_SECONDS)
+            self.vad_batcher.start()
+            self.turn_batcher.start()
+            self._loaded = True
+            logger.info(
+                f"Shared turn inference loaded in {(time.perf_counter() - start) * 1000:.0f} ms "
+                f"({self.turn_batcher.workers} smart-turn workers)"
+            )
+
+    def analyzers(self) -> tuple[SharedSileroVADAnalyzer, SharedSmartTurnAnalyzer]:
+        """Per-session (VAD, smart-turn) analyzers backed by the shared models."""
+        if not self._loaded:
+            self._load()
+        return (
+            SharedSileroVADAnalyzer(self, params=VADParams(stop_secs=settings.VAD_STOP_SECS)),
+            SharedSmartTurnAnalyzer(self),
+        )
+
+    def _run_vad(self, calls: list[tuple[np.ndarray, np.ndarray, int]]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Run Silero over (input with context, state, sample rate) calls, one batch per sample rate."""
+        results: list = [None] * len(calls)
+        for sr in {sr for _, _, sr in calls}:
+            indexes = [i for i, (_, _, call_sr) in enumerate(calls) if call_sr == sr]
+            out, state = self._vad_session.run(None, {
+                "input": np.concatenate([calls[i][0] for i in indexes]),
+                "state": np.concatenate([calls[i][1] for i in indexes], axis=1),
+                "sr": np.array(sr, dtype="int64"),
+            })
+            for row, i in enumerate(indexes):
+                results[i] = (out[row:row + 1], state[:, row:row + 1])
+        return results
+
+    def predict_turn(self, audio: np.ndarray) -> float:
+        """
+        Return the end-of-turn probability for a 16 kHz float32 speech segment.
+
+        Features are extracted on the calling thread; the model runs on a batch worker.
+        """
+        samples = _SMART_TURN_SECONDS * _SMART_TURN_SAMPLE_RATE
+        # Keep the last 8 s, left-padded with silence, as LocalSmartTurnAnalyzerV3 does
+        audio = audio[-samples:]
+        if len(audio) < samples:
+            audio = np.pad(audio, (samples - len(audio), 0))
+        features = self._feature_extractor(
+            audio,
+            sampling_rate=_SMART_TURN_SAMPLE_RATE,
+            return_tensors="np",
+            padding="max_length",
+            max_length=samples,
+            truncation=True,
+            do_normalize=True,
+        ).input_features.astype(np.float32)
+        return self.turn_batcher.submit(features)
+
+    def _run_turn(self, features: list[np.ndarray]) -> list[float]:
+        probabilities = self._turn_session.run(None, {"input_features": np.concatenate(features)})[0]
+        return [float(probability) for probability in probabilities[:, 0]]
+
+    def stats(self) -> dict:
+        return {"loaded": self._loaded, "vad": self.vad_batcher.stats(), "smart_turn": self.turn_batcher.stats()}
+
+
+turn_inference = TurnInferenceEngine(
+    settings.VAD_BATCH_WINDOW_MS,
+    settings.TURN_BATCH_WINDOW_MS,
+    settings.TURN_BATCH_MAX_SIZE,
+    settings.TURN_INFERENCE_WORKERS or min(4, os.cpu_count() or 1),
+)
@@ -0,0 +1,305 @@
+"""Per-turn latency of the voice pipeline and its local metrics sink.
+
+`run_bot` puts probes after user_aggregator, llm and transport.output() that
+report these events to one `TurnLatencyTracker` per session:
+
+- vad_stop: VAD heard the user go silent
+- turn_end: the smart-turn analyzer decided the user's turn is over
+- first_audio: first audio chunk from the LLM after turn_end
+- playback: the output transport started playing the bot's reply
+
+Every completed turn yields four intervals (see STAGES), recorded in the
+session's histograms and appended as a JSON line to TURN_LATENCY_LOG_PATH
+by a background thread; when the session ends its histograms are appended
+too. Bots run in worker processes, so that file is what aggregates across
+sessions: `turn_latency_sink.summary()` (GET /metrics) keeps histograms over
+all turns in it, reading only what was appended since its previous call.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Stage name -> (from event, to event)
+STAGES = {
+    "turn_decision": ("vad_stop", "turn_end"),
+    "llm_first_audio": ("turn_end", "first_audio"),
+    "playback_start": ("first_audio", "playback"),
+    "total": ("vad_stop", "playback"),
+}
+BUCKETS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+_STOP = object()
+_UNREAD = -1  # `_read_inode` before the first summary
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (the max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{bound}" for bound in BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class TurnLatencySink:
+    """
+    Append-only JSON-lines file shared by every bot process, rotated at `max_bytes`.
+
+    `write` only queues the record; a daemon thread does the file I/O, so the
+    bot's event loop never waits on the disk (as with the progress writer).
+    `summary` keeps running histograms and on each call only parses the lines
+    appended since the previous one.
+    """
+
+    def __init__(self, path: Optional[Path], max_bytes: int, queue_max_records: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_max_records))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._counters = dict.fromkeys(("queued", "dropped", "written", "failed"), 0)
+        # Running summary: the log file being read, how far, and what it held so far
+        self._summary_lock = threading.Lock()
+        self._read_inode: Optional[int] = _UNREAD
+        self._read_offset = 0
+        self._histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self._sessions: set[str] = set()
+        self._turns = 0
+
+    def write(self, record: dict) -> None:
+        """Queue a record for the writer thread; never blocks."""
+        if self.path is None:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(json.dumps(record, ensure_ascii=False) + "\n")
+            self._counters["queued"] += 1
+        except queue.Full:
+            self._counters["dropped"] += 1
+            if self._counters["dropped"] == 1 or self._counters["dropped"] % 1000 == 0:
+                logger.warning(f"Turn latency queue full, {self._counters['dropped']} records dropped so far")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="turn-latency-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is _STOP:
+                return
+            lines = [line]
+            stopping = False
+            while True:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is _STOP:
+                    stopping = True
+                    break
+                lines.append(line)
+            self._append(lines)
+            if stopping:
+                return
+
+    def _append(self, lines: list[str]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.max_bytes and self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                self.path.replace(self.path.with_name(self.path.name + ".1"))
+            with open(self.path, "a", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(line)  # one write per record, so concurrent appenders don't interleave lines
+            self._counters["written"] += len(lines)
+        except OSError as e:
+            self._counters["failed"] += len(lines)
+            logger.warning(f"Could not write {len(lines)} turn latency records: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every record queued so far is written (or failed); False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._counters["written"] + self._counters["failed"] < self._counters["queued"]:
+            if self._thread is None or not self._thread.is_alive() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write the remaining records and stop the thread (registered with atexit)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Turn latency writer did not drain its queue before exit")
+            return
+        thread.join(timeout)
+
+    def summary(self) -> dict:
+        """Histograms over every turn in the log (starting with the rotated file), across sessions."""
+        if self.path is None:
+            return {"enabled": False}
+        with self._summary_lock:
+            self._read_new_records()
+            return {
+                "enabled": True,
+                "path": str(self.path),
+                "sessions": len(self._sessions),
+                "turns": self._turns,
+                "stages": {stage: histogram.to_dict() for stage, histogram in self._histograms.items()},
+            }
+
+    def _read_new_records(self) -> None:
+        rotated = self.path.with_name(self.path.name + ".1")
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != self._read_inode:
+            # The file was rotated (or this is the first call): finish the file we
+            # were reading, which is now the rotated one, then start the new file
+            if self._read_inode == _UNREAD:
+                self._read_from(rotated, 0, None)
+            elif self._read_inode is not None:
+                self._read_from(rotated, self._read_offset, self._read_inode)
+            self._read_inode, self._read_offset = inode, 0
+        if inode is not None:
+            self._read_offset = self._read_from(self.path, self._read_offset, inode)
+
+    def _read_from(self, path: Path, offset: int, inode: Optional[int]) -> int:
+        """Aggregate the complete lines of `path` after `offset`; return the new offset."""
+        try:
+            with open(path, "rb") as f:
+                if inode is not None and os.fstat(f.fileno()).st_ino != inode:
+                    return offset
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return offset
+        complete = data.rfind(b"\n") + 1  # a line still being written is read next time
+        for line in data[:complete].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash or rotation
+            if record.get("type") != "turn":
+                continue
+            self._turns += 1
+            self._sessions.add(record["session_id"])
+            for stage, ms in record["stages_ms"].items():
+                if stage in self._histograms:
+                    self._histograms[stage].observe(ms)
+        return offset + complete
+
+
+class TurnLatencyTracker:
+    """Turn latency events and histograms for one bot session (see module docstring)."""
+
+    def __init__(self, session_id: str, sink: Optional[TurnLatencySink] = None):
+        self.session_id = session_id
+        self.sink = sink or turn_latency_sink
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.turns = 0
+        self.abandoned = 0  # the user spoke again before the bot started playing its reply
+        self._marks: dict[str, float] = {}
+
+    def user_started(self) -> None:
+        if "turn_end" in self._marks:
+            self.abandoned += 1
+        self._marks = {}
+
+    def mark(self, event: str) -> None:
+        """Record `event` for the current turn; out-of-order events are ignored."""
+        now = time.monotonic()
+        if event == "vad_stop":
+            # A pause inside the turn restarts the clock; after turn_end, the turn is decided
+            if "turn_end" not in self._marks:
+                self._marks = {"vad_stop": now}
+            return
+        previous = {"turn_end": "vad_stop", "first_audio": "turn_end", "playback": "first_audio"}[event]
+        if previous not in self._marks or event in self._marks:
+            return
+        self._marks[event] = now
+        if event == "playback":
+            self._complete()
+
+    def _complete(self) -> None:
+        stages_ms = {
+            stage: round((self._marks[end] - self._marks[start]) * 1000, 1)
+            for stage, (start, end) in STAGES.items()
+        }
+        self._marks = {}
+        self.turns += 1
+        for stage, ms in stages_ms.items():
+            self.histograms[stage].observe(ms)
+        self.sink.write({"type": "turn", "session_id": self.session_id, "ts": time.time(), "stages_ms": stages_ms})
+
+    def close(self) -> None:
+        """Write this session's histograms to the sink."""
+        stages = {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+        self.sink.write({
+            "type": "session",
+            "session_id": self.session_id,
+            "ts": time.time(),
+            "turns": self.turns,
+            "abandoned": self.abandoned,
+            "stages": stages,
+        })
+        if self.turns:
+            total = stages["total"]
+            logger.info(
+                f"Session {self.session_id}: {self.turns} turns, VAD stop -> playback "
+                f"p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms"
+            )
+
+
+turn_latency_sink = TurnLatencySink(
+    Path(settings.TURN_LATENCY_LOG_PATH) if settings.TURN_LATENCY_LOG_PATH else None,
+    settings.TURN_LATENCY_LOG_MAX_BYTES,
+)
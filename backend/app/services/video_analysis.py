@@ -0,0 +1,280 @@
+"""Video analysis pipeline: transcript fetch followed by Gemini vocab extraction."""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.exceptions import InvalidVideoURLError
+from app.core.executor import run_blocking
+from app.core.logger import logger
+from app.core.prompts import get_transcript_overview_prompt, get_video_analysis_prompt
+from app.core.singleflight import SingleFlight
+from app.schemas.video import Video, VideoOverview, VideoVocab
+from app.services.analysis_cache import analysis_cache
+from app.services.chunked_analysis import analyze_transcript_chunked, transcript_duration
+from app.services.gemini import generate_structured
+from app.services.transcript_alignment import align_vocab
+from app.services.transcript_compaction import compact_transcript, decode_timestamp
+from app.services.vocab_prefilter import prefilter_transcript
+from app.services.youtube import extract_video_id, get_video_transcript
+
+# Called with a stage name as the pipeline progresses (used for job progress events)
+StageCallback = Callable[[str], Awaitable[None]]
+
+# Progress callbacks of every caller sharing an analysis, dropped together with its flight
+_stage_listeners: dict[tuple[str, int], list[StageCallback]] = {}
+# Concurrent analyses of the same (video_id, user_level) share one upstream run
+analysis_flight = SingleFlight(on_forget=lambda key: _stage_listeners.pop(key, None))
+# Different levels of the same video still share one transcript fetch
+transcript_flight = SingleFlight()
+
+
+async def fetch_transcript(video_url: str, target_language: str = "ja") -> dict:
+    """
+    Fetch the raw transcript, sharing one Apify run between concurrent callers.
+
+    Raises:
+        UpstreamTimeoutError: If the transcript stage exceeds TRANSCRIPT_TIMEOUT_SECONDS
+    """
+    return await transcript_flight.do(
+        (extract_video_id(video_url) or video_url, target_language),
+        lambda: get_video_transcript(video_url, target_language=target_language),
+    )
+
+
+async def generate_analysis(
+    video_id: str,
+    video_url: str,
+    transcript: str,
+    user_level: int,
+    candidates: list[str] | None = None,
+) -> Video:
+    """
+    Ask Gemini for the structured video analysis in a single prompt.
+
+    Raises:
+        UpstreamTimeoutError: If the LLM stage exceeds LLM_TIMEOUT_SECONDS
+    """
+    return await generate_structured(
+        get_video_analysis_prompt(video_id, video_url, transcript, user_level, candidates),
+        Video,
+        stage="video analysis LLM call",
+    )
+
+
+async def analyze_video(
+    video_url: str,
+    user_level: int,
+    on_stage: StageCallback | None = None,
+    chunked: bool | None = None,
+    force_refresh: bool = False,
+    max_age_seconds: int | None = None,
+    any_level: bool = False,
+) -> Video:
+    """
+    Run the full analysis pipeline for one video.
+
+    Stored analyses (see app.services.analysis_cache) are returned without any
+    upstream work unless `force_refresh` is set or they are older than
+    `max_age_seconds`. Concurrent calls for the same (video_id, user_level) are coalesced: only
+    the first one reaches Apify/Gemini and every caller gets the same Video.
+
+    Args:
+        video_url: Full YouTube video URL
+        user_level: Target JLPT level (1-5 for N1-N5)
+        on_stage: Optional progress callback ("transcript_fetched", "llm_started", "parsed")
+        chunked: Force map-reduce (True) or single-shot (False) analysis; None picks
+            map-reduce when the transcript exceeds CHUNKED_ANALYSIS_THRESHOLD_TOKENS
+        force_refresh: Ignore stored analyses and re-run the pipeline
+        max_age_seconds: Oldest acceptable stored analysis (None = ANALYSIS_MAX_AGE_SECONDS)
+        any_level: Also accept a video saved through POST /videos, whose level is unknown
+
+    Returns:
+        Video: Parsed analysis with 20 vocab items
+
+    Raises:
+        InvalidVideoURLError: If no YouTube video id can be read from `video_url` (400)
+    """
+    try:
+        video_id = extract_video_id(video_url)
+    except ValueError:
+        video_id = None
+    if not video_id:
+        raise InvalidVideoURLError(video_url)
+    key = (video_id, user_level)
+
+    if not force_refresh:
+        if max_age_seconds is None:
+            max_age_seconds = settings.ANALYSIS_MAX_AGE_SECONDS
+        cached = await run_blocking(
+            analysis_cache.get, video_id, user_level, max_age_seconds, any_level, stage="analysis cache lookup"
+        )
+        if cached is not None:
+            logger.info(f"Serving stored analysis of {video_id} at N{user_level}")
+            if on_stage is not None:
+                await on_stage("cached")
+            return cached
+
+    listeners = _stage_listeners.setdefault(key, [])
+    if on_stage is not None:
+        listeners.append(on_stage)
+    if analysis_flight.in_flight(key):
+        logger.info(f"Joining in-flight analysis of {video_id} at N{user_level}")
+
+    async def broadcast(stage: str) -> None:
+        for listener in list(_stage_listeners.get(key, [])):
+            try:
+                await listener(stage)
+            except Exception as e:
+                logger.warning(f"Stage listener failed for {video_id}: {e}")
+
+    return await analysis_flight.do(
+        key, lambda: _analyze_video(video_url, video_id, user_level, broadcast, chunked)
+    )
+
+
+@dataclass
+class PreparedTranscript:
+    """Output of the transcript stage: what the LLM stage needs for one video."""
+
+    transcript_data: dict  # raw Apify data, kept for local timestamp alignment and the duration
+    transcript: str  # compacted prompt text
+    tokens: int  # of `transcript`; picks single-shot or map-reduce analysis
+    candidates: list[str] | None = None
+    excerpt: str | None = None  # pre-filtered lines of `transcript`, if the pre-filter dropped any
+
+
+async def prepare_transcript(video_url: str, video_id: str, user_level: int) -> PreparedTranscript:
+    """
+    Transcript stage: fetch, compact and pre-filter the transcript of one video.
+
+    Raises:
+        UpstreamTimeoutError: If the transcript stage exceeds TRANSCRIPT_TIMEOUT_SECONDS
+    """
+    # Fetch transcript using Apify (default language is Japanese)
+    transcript_data = await fetch_transcript(video_url, target_language="ja")
+    logger.info(f"Transcript extracted for {video_id}")
+
+    compacted = await run_blocking(compact_transcript, transcript_data, stage="transcript compaction")
+    stats = compacted.stats
+    logger.info(
+        f"Transcript tokens for {video_id}: {stats.tokens_before} -> {stats.tokens_after} "
+        f"({stats.segments} segments -> {stats.windows} windows, "
+        f"dropped {stats.dropped_filler} filler / {stats.dropped_duplicates} duplicate / "
+        f"{stats.dropped_for_budget} over budget)"
+    )
+    prepared = PreparedTranscript(transcript_data, compacted.text, stats.tokens_after)
+
+    if settings.VOCAB_PREFILTER_ENABLED:
+        prefiltered = await run_blocking(
+            prefilter_transcript, prepared.transcript, user_level, stage="vocab pre-filter"
+        )
+        prepared.candidates = [candidate.label() for candidate in prefiltered.candidates]
+        if prefiltered.filtered:
+            prepared.excerpt = prefiltered.text
+        logger.info(
+            f"Pre-filter for {video_id}: {len(prepared.candidates)} candidates, "
+            f"{prefiltered.lines_before} -> {prefiltered.lines_after} lines, "
+            f"{prefiltered.tokens_before} -> {prefiltered.tokens_after} tokens"
+        )
+    return prepared
+
+
+async def generate_excerpt_analysis(
+    video_id: str,
+    video_url: str,
+    prepared: PreparedTranscript,
+    user_level: int,
+) -> Video:
+    """
+    Single-shot analysis of a pre-filtered transcript.
+
+    The excerpt only yields the vocab. Title, tags and summary come from the
+    whole compacted transcript in a concurrent call, and the duration from
+    the raw transcript.
+
+    Raises:
+        UpstreamTimeoutError: If the LLM stage exceeds LLM_TIMEOUT_SECONDS
+    """
+    duration = transcript_duration(prepared.transcript_data)
+    result, overview = await asyncio.gather(
+        generate_structured(
+            get_video_analysis_prompt(
+                video_id, video_url, prepared.excerpt, user_level, prepared.candidates, excerpt=True
+            ),
+            VideoVocab,
+            stage="video analysis LLM call",
+        ),
+        generate_structured(
+            get_transcript_overview_prompt(video_id, video_url, duration, prepared.transcript),
+            VideoOverview,
+            stage="video overview LLM call",
+        ),
+    )
+    return Video(
+        video_id=video_id,
+        title=overview.title,
+        tags=overview.tags,
+        video_url=video_url,
+        duration=duration,
+        summary=overview.summary,
+        vocab=result.vocab,
+    )
+
+
+async def run_llm_analysis(
+    video_url: str,
+    video_id: str,
+    user_level: int,
+    prepared: PreparedTranscript,
+    chunked: bool | None = None,
+) -> Video:
+    """
+    LLM stage: Gemini analysis of a prepared transcript plus local alignment.
+
+    Raises:
+        UpstreamTimeoutError: If the LLM stage exceeds LLM_TIMEOUT_SECONDS
+    """
+    if chunked is None:
+        chunked = prepared.tokens > settings.CHUNKED_ANALYSIS_THRESHOLD_TOKENS
+
+    # Map-reduce covers the whole transcript; only the single-shot prompt uses the excerpt
+    if chunked:
+        video = await analyze_transcript_chunked(
+            video_id, video_url, prepared.transcript_data, prepared.transcript, user_level
+        )
+    elif prepared.excerpt is not None:
+        video = await generate_excerpt_analysis(video_id, video_url, prepared, user_level)
+    else:
+        video = await generate_analysis(video_id, video_url, prepared.transcript, user_level, prepared.candidates)
+    # Keep the ids we were asked about, take the duration from the transcript rather
+    # than the model, map any compact "[93]" timestamps the model echoed back to
+    # mm:ss, then replace LLM-guessed timestamps with the real ones and attach
+    # example sentences
+    video = video.model_copy(update={
+        "video_id": video_id,
+        "video_url": video_url,
+        "duration": transcript_duration(prepared.transcript_data),
+        "vocab": [v.model_copy(update={"timestamp": decode_timestamp(v.timestamp)}) for v in video.vocab],
+    })
+    return align_vocab(video, prepared.transcript_data)
+
+
+async def _analyze_video(
+    video_url: str,
+    video_id: str,
+    user_level: int,
+    on_stage: StageCallback,
+    chunked: bool | None,
+) -> Video:
+    logger.info(f"Analyzing video {video_id} at N{user_level}")
+
+    prepared = await prepare_transcript(video_url, video_id, user_level)
+    await on_stage("transcript_fetched")
+
+    await on_stage("llm_started")
+    video = await run_llm_analysis(video_url, video_id, user_level, prepared, chunked)
+    await on_stage("parsed")
+
+    await run_blocking(analysis_cache.put, video_id, user_level, video, stage="analysis cache store")
+    return video
@@ -0,0 +1,186 @@
+"""Deterministic local pre-filter that narrows the transcript before the LLM sees it.
+
+Each compacted transcript line is segmented against the bundled JLPT
+dictionary (app/data/jlpt_vocab.tsv) with a leftmost-longest Aho-Corasick
+pass over surface forms, kana readings and conjugation stems (see
+app/services/japanese_text.py). Dictionary hits
+are scored by closeness to the requested level, how often they occur in the
+video and how common the word is. Only lines containing one of the top
+candidates are kept (at most VOCAB_PREFILTER_LINES_PER_WORD per candidate),
+and the candidate list itself is handed to the prompt.
+
+When the dictionary finds too few candidates at the requested level the
+transcript is passed through unchanged, so obscure topics lose nothing.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.aho_corasick import AhoCorasick
+from app.services.chunker import count_tokens
+from app.services.japanese_text import conjugates, fold, word_patterns
+
+DICTIONARY_PATH = Path(__file__).resolve().parent.parent / "data" / "jlpt_vocab.tsv"
+
+# Weight by distance from the requested JLPT level; further levels are ignored
+_LEVEL_WEIGHTS = {0: 1.0, 1: 0.4}
+
+
+@dataclass(frozen=True)
+class DictionaryEntry:
+    surface: str
+    reading: str
+    jlpt_level: int
+    band: int  # 1 = very common ... 3 = less common
+
+
+@dataclass
+class Candidate:
+    """Dictionary word found in the transcript."""
+
+    surface: str
+    reading: str
+    jlpt_level: int
+    occurrences: int
+    score: float
+
+    def label(self) -> str:
+        return self.surface if self.surface == self.reading else f"{self.surface} ({self.reading})"
+
+
+@dataclass
+class PrefilterResult:
+    text: str
+    candidates: list[Candidate]
+    filtered: bool  # False when the transcript was passed through unchanged
+    lines_before: int
+    lines_after: int
+    tokens_before: int
+    tokens_after: int
+
+
+@lru_cache(maxsize=1)
+def load_dictionary() -> tuple[list[DictionaryEntry], AhoCorasick]:
+    """Parse the bundled dictionary and build its matcher (once per process)."""
+    entries: list[DictionaryEntry] = []
+    seen_surfaces: set[str] = set()
+    for line in DICTIONARY_PATH.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        surface, reading, level, band = line.split("\t")
+        if surface in seen_surfaces:
+            continue
+        seen_surfaces.add(surface)
+        entries.append(DictionaryEntry(surface, reading, int(level), int(band)))
+
+    # First entry wins when two words share a pattern (e.g. readings of homophones)
+    patterns: dict[str, tuple[int, tuple[str, ...]]] = {}
+    for i, entry in enumerate(entries):
+        for pattern, _, endings in word_patterns(entry.surface, entry.reading):
+            patterns.setdefault(pattern, (i, endings))
+    return entries, AhoCorasick(patterns.items())
+
+
+def segment(text: str) -> list[int]:
+    """
+    Return the dictionary entries found in `text`, leftmost-longest.
+
+    Args:
+        text: One transcript line
+
+    Returns:
+        list[int]: Indexes into the dictionary, in order of appearance
+    """
+    _, matcher = load_dictionary()
+    text = fold(text)
+    matches = sorted(matcher.iter_matches(text), key=lambda m: (m[0], m[0] - m[1]))
+    found, cursor = [], 0
+    for start, end, (entry_index, endings) in matches:
+        if start >= cursor and conjugates(text, end, endings):
+            found.append(entry_index)
+            cursor = end
+    return found
+
+
+def prefilter_transcript(
+    transcript: str,
+    user_level: int,
+    max_candidates: int | None = None,
+    lines_per_word: int | None = None,
+) -> PrefilterResult:
+    """
+    Keep only the transcript lines that contain strong vocab candidates.
+
+    Args:
+        transcript: Compacted transcript, one "[seconds] text" line per window
+        user_level: Target JLPT level (1-5 for N1-N5)
+        max_candidates: Candidates to keep (None = VOCAB_PREFILTER_CANDIDATES)
+        lines_per_word: Lines kept per candidate (None = VOCAB_PREFILTER_LINES_PER_WORD)
+
+    Returns:
+        PrefilterResult: Filtered text, ranked candidates and size report
+    """
+    if max_candidates is None:
+        max_candidates = settings.VOCAB_PREFILTER_CANDIDATES
+    if lines_per_word is None:
+        lines_per_word = settings.VOCAB_PREFILTER_LINES_PER_WORD
+
+    entries, _ = load_dictionary()
+    lines = transcript.splitlines()
+    tokens_before = count_tokens(transcript)
+
+    # entry index -> line numbers it occurs on (one entry per occurrence)
+    occurrences: dict[int, list[int]] = {}
+    for line_number, line in enumerate(lines):
+        for entry_index in segment(line):
+            occurrences.setdefault(entry_index, []).append(line_number)
+
+    candidates: list[tuple[float, int, int]] = []
+    for entry_index, found_on in occurrences.items():
+        entry = entries[entry_index]
+        weight = _LEVEL_WEIGHTS.get(abs(entry.jlpt_level - user_level), 0.0)
+        if weight:
+            score = weight * (1 + math.log2(len(found_on))) / entry.band
+            candidates.append((score, found_on[0], entry_index))
+    # Highest score first, earlier first appearance breaks ties
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    candidates = candidates[:max_candidates]
+
+    ranked = [
+        Candidate(
+            surface=entries[i].surface,
+            reading=entries[i].reading,
+            jlpt_level=entries[i].jlpt_level,
+            occurrences=len(occurrences[i]),
+            score=round(score, 3),
+        )
+        for score, _, i in candidates
+    ]
+
+    if len(ranked) < settings.ANALYSIS_VOCAB_COUNT or tokens_before < settings.VOCAB_PREFILTER_MIN_TOKENS:
+        return PrefilterResult(
+            text=transcript,
+            candidates=ranked,
+            filtered=False,
+            lines_before=len(lines),
+            lines_after=len(lines),
+            tokens_before=tokens_before,
+            tokens_after=tokens_before,
+        )
+
+    keep: set[int] = set()
+    for _, _, entry_index in candidates:
+        # A word can occur several times on one line; keep its first distinct lines
+        keep.update(list(dict.fromkeys(occurrences[entry_index]))[:lines_per_word])
+    text = "\n".join(lines[i] for i in sorted(keep))
+    return PrefilterResult(
+        text=text,
+        candidates=ranked,
+        filtered=True,
+        lines_before=len(lines),
+        lines_after=len(keep),
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(text),
+    )
@@ -1,44 +1,244 @@
+import asyncio
+import json
+import re
+import threading
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse, parse_qs
 
-from apify_client import ApifyClient
-
 from app.core.config import settings
+from app.core.executor import run_blocking
+from app.core.logger import logger
+from app.core.resilience import apify_upstream
+from app.services.transcript_cache import transcript_cache
+
+if TYPE_CHECKING:
+    from apify_client import ApifyClientAsync
+
+# YouTube Transcript Scraper actor
+TRANSCRIPT_ACTOR_ID = "faVsWy9VTSNVIhWpR"
+_TERMINAL_RUN_STATUSES = ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT")
 
+_apify_client: "ApifyClientAsync | None" = None
+_apify_client_lock = threading.Lock()
 
-def _make_apify_client():
-    """Initialize the ApifyClient with API token."""
-    return ApifyClient(settings.APIFY_API_TOKEN)
 
+def get_apify_client() -> "ApifyClientAsync":
+    """Return the shared async ApifyClient (created on first use); its HTTP session is pooled."""
+    global _apify_client
+    if _apify_client is None:
+        with _apify_client_lock:
+            if _apify_client is None:
+                from apify_client import ApifyClientAsync
 
-apify_client = _make_apify_client()
+                _apify_client = ApifyClientAsync(
+                    settings.APIFY_API_TOKEN,
+                    api_url=settings.APIFY_API_URL or None,
+                    timeout_secs=settings.APIFY_HTTP_TIMEOUT_SECONDS,
+                )
+    return _apify_client
 
 
-def get_video_transcript(video_url: str, target_language: str = "ja") -> dict:
+async def get_video_transcript(video_url: str, target_language: str = "ja", use_cache: bool = True) -> dict:
     """
-    Fetch video transcript using Apify YouTube Transcript Scraper.
+    Fetch video transcript, serving from the transcript cache when possible.
     
     Args:
         video_url: Full YouTube video URL
         target_language: Target language code (default: "ja" for Japanese)
+        use_cache: Look up (and store into) the transcript cache
     
     Returns:
         dict: Raw transcript data from Apify
+    
+    Raises:
+        UpstreamTimeoutError: If the Apify run exceeds TRANSCRIPT_TIMEOUT_SECONDS
+        UpstreamUnavailableError: If the Apify circuit breaker is open
     """
+    video_id = extract_video_id(video_url) if use_cache else None
+    if video_id:
+        cached = await run_blocking(
+            transcript_cache.get, video_id, target_language, stage="transcript cache lookup"
+        )
+        if cached is not None:
+            logger.info(f"Transcript cache hit: {video_id}/{target_language}")
+            return cached
+        logger.info(f"Transcript cache miss: {video_id}/{target_language}")
+
+    # Starting an actor run is not idempotent: timeout and circuit breaker, no retries
+    transcript_data = await apify_upstream.call(
+        lambda: _scrape_video_transcript(video_url, target_language),
+        stage="transcript fetch",
+        idempotent=False,
+    )
+
+    if video_id:
+        await run_blocking(
+            transcript_cache.put, video_id, target_language, transcript_data, stage="transcript cache store"
+        )
+    return transcript_data
+
+
+async def _scrape_video_transcript(video_url: str, target_language: str) -> dict:
+    """Run the Apify YouTube Transcript Scraper and return its first dataset item."""
     run_input = {
         "videoUrl": video_url,
         "targetLanguage": target_language,
     }
     
-    # Run the Actor and wait for it to finish
-    run = apify_client.actor("faVsWy9VTSNVIhWpR").call(run_input=run_input)
+    # Start the Actor, then long-poll for completion in APIFY_WAIT_SECONDS slices
+    apify_client = get_apify_client()
+    run = await apify_client.actor(TRANSCRIPT_ACTOR_ID).start(
+        run_input=run_input,
+        wait_for_finish=settings.APIFY_WAIT_SECONDS,
+    )
+    run_client = apify_client.run(run["id"])
+    try:
+        while run["status"] not in _TERMINAL_RUN_STATUSES:
+            await asyncio.sleep(settings.APIFY_POLL_INTERVAL_SECONDS)
+            run = await run_client.wait_for_finish(wait_secs=settings.APIFY_WAIT_SECONDS) or run
+    except asyncio.CancelledError:
+        # Timed out or abandoned: don't leave the run burning compute units
+        asyncio.ensure_future(_abort_run(run["id"]))
+        raise
+    
+    if run["status"] != "SUCCEEDED":
+        raise ValueError(f"Apify transcript run {run['id']} finished with status {run['status']}")
     
-    # Fetch results from the run's dataset
-    items = list(apify_client.dataset(run["defaultDatasetId"]).iterate_items())
+    # Stream only the first dataset item and parse its segments as they arrive
+    parser = _TranscriptItemParser()
+    async with apify_client.dataset(run["defaultDatasetId"]).stream_items(item_format="jsonl", limit=1) as response:
+        async for chunk in response.aiter_bytes():
+            if parser.feed(chunk):
+                break
     
-    if not items:
+    item = parser.result()
+    if item is None:
         raise ValueError("No transcript data returned from Apify")
     
-    return items[0]
+    return item
+
+
+async def _abort_run(run_id: str) -> None:
+    try:
+        await get_apify_client().run(run_id).abort()
+        logger.info(f"Aborted Apify run {run_id}")
+    except Exception as e:
+        logger.warning(f"Could not abort Apify run {run_id}: {e}")
+
+
+class _TranscriptItemParser:
+    """
+    Incremental parser for one JSONL dataset item.
+    
+    Segments of the item's "data" array are decoded one by one as bytes
+    arrive instead of buffering and parsing the whole response; the
+    remaining top-level fields are parsed once the item is complete. Only the
+    item's own "data" key counts, not one nested in an earlier field.
+    """
+
+    _TOKEN = re.compile(r'["{}\[\]]')
+    _KEY_TAIL = re.compile(r'\s*:\s*\[')
+    _decoder = json.JSONDecoder()
+
+    def __init__(self):
+        self._raw = bytearray()
+        self._text = ""
+        self._prefix: str | None = None  # item text before "data": [
+        self._segments: list = []
+        self._in_array = False
+        self._done = False
+        self._depth = 0  # JSON nesting depth at self._scan, while looking for "data": [
+        self._scan: int | None = 0  # None once the item closed without one
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume bytes; return True once the first item is complete."""
+        if self._done:
+            return True
+        self._raw.extend(chunk)
+        # Decode only up to the last complete UTF-8 sequence
+        cut = len(self._raw)
+        while cut and (self._raw[cut - 1] & 0xC0) == 0x80:
+            cut -= 1
+        if cut and self._raw[cut - 1] >= 0xC0:
+            cut -= 1
+        self._text += self._raw[:cut].decode("utf-8")
+        del self._raw[:cut]
+
+        if self._prefix is None:
+            if not self._find_data_array():
+                self._done = "\n" in self._text
+                return self._done
+            self._in_array = True
+
+        if self._in_array:
+            self._parse_segments()
+        if not self._in_array and "\n" in self._text:
+            self._done = True
+        return self._done
+
+    def _find_data_array(self) -> bool:
+        """Scan for the top-level "data": [ and split the text there; False until it arrives."""
+        if self._scan is None:
+            return False
+        text, position = self._text, self._scan
+        while True:
+            match = self._TOKEN.search(text, position)
+            if match is None:
+                self._scan = len(text)
+                return False
+            start = match.start()
+            if match.group() != '"':
+                self._depth += 1 if match.group() in "{[" else -1
+                position = start + 1
+                if self._depth == 0:
+                    self._scan = None  # end of the item; the next line is another item
+                    return False
+                continue
+            try:
+                string, position = self._decoder.raw_decode(text, start)
+            except json.JSONDecodeError:
+                self._scan = start  # incomplete string, wait for more bytes
+                return False
+            if self._depth == 1 and string == "data":
+                tail = self._KEY_TAIL.match(text, position)
+                if tail is not None:
+                    self._prefix = text[:start]
+                    self._text = text[tail.end():]
+                    return True
+                if not text[position:].strip(" \t\r\n:"):
+                    self._scan = start  # may still turn out to be "data": [
+                    return False
+
+    def _parse_segments(self) -> None:
+        text, position = self._text, 0
+        while True:
+            while position < len(text) and text[position] in " \t\r\n,":
+                position += 1
+            if position == len(text):
+                break
+            if text[position] == "]":
+                self._in_array = False
+                position += 1
+                break
+            try:
+                segment, position = self._decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                break  # incomplete segment, wait for more bytes
+            self._segments.append(segment)
+        self._text = text[position:]
+
+    def result(self) -> dict | None:
+        """Return the parsed item (None if the dataset was empty)."""
+        if self._raw:
+            self._text += self._raw.decode("utf-8", errors="replace")
+            self._raw.clear()
+        if self._prefix is None:
+            line = self._text.split("\n", 1)[0].strip()
+            return json.loads(line) if line else None
+        rest = self._text.split("\n", 1)[0]
+        item = json.loads(f'{self._prefix}"data": []{rest}')
+        item["data"] = self._segments
+        return item
 
 
 def format_transcript(transcript_data: dict) -> str:
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local vocab timestamp alignment on long transcripts.
+
+Builds 1h/2h/4h transcripts from the segments in
+tests/sample_apify_output.json (one segment roughly every 3 seconds) and
+times index construction plus the single Aho-Corasick pass for 20 vocab
+items. Time per segment should stay flat as the transcript grows.
+
+run with: python tests/bench_alignment.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.schemas.video import Video, Vocab  # noqa: E402
+from app.services.transcript_alignment import TranscriptIndex, align_vocab  # noqa: E402
+
+FIXTURE = backend_dir / "tests" / "sample_apify_output.json"
+SEGMENT_SECONDS = 3.0
+REPEATS = 5
+
+VOCAB = [
+    ("牛乳", "ぎゅうにゅう"), ("買い物", "かいもの"), ("前", "まえ"), ("物", "もの"),
+    ("出す", "だす"), ("スーパー", "すーぱー"), ("今日", "きょう"), ("野菜", "やさい"),
+    ("安い", "やすい"), ("納豆", "なっとう"), ("キムチ", "きむち"), ("日本", "にほん"),
+    ("話す", "はなす"), ("クリスマス", "くりすます"), ("リサイクル", "りさいくる"),
+    ("パック", "ぱっく"), ("みなさん", "みなさん"), ("季節", "きせつ"), ("祭り", "まつり"),
+    ("お正月", "おしょうがつ"),
+]
+
+
+def build_transcript(hours: float) -> dict:
+    texts = [s["text"] for s in json.loads(FIXTURE.read_text(encoding="utf-8"))[0]["data"]]
+    count = int(hours * 3600 / SEGMENT_SECONDS)
+    return {
+        "data": [
+            {"start": f"{i * SEGMENT_SECONDS:.3f}", "dur": f"{SEGMENT_SECONDS:.3f}", "text": texts[i % len(texts)]}
+            for i in range(count)
+        ]
+    }
+
+
+def build_video() -> Video:
+    return Video(
+        video_id="bench",
+        title="Benchmark",
+        tags=[],
+        video_url="https://www.youtube.com/watch?v=bench",
+        duration="0:00",
+        summary="",
+        vocab=[
+            Vocab(
+                japanese_vocab=word,
+                pronunciation=reading,
+                english_translation="",
+                timestamp="00:00",
+                jlpt_level=3,
+            )
+            for word, reading in VOCAB
+        ],
+    )
+
+
+def main():
+    video = build_video()
+    print("=" * 72)
+    print(f"{'length':<8}{'segments':>10}{'chars':>10}{'index ms':>11}{'align ms':>11}{'µs/segment':>12}{'found':>8}")
+    print("-" * 72)
+    for hours in (1, 2, 4):
+        transcript_data = build_transcript(hours)
+
+        index_times, align_times = [], []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            index = TranscriptIndex.from_transcript_data(transcript_data)
+            index_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            aligned = align_vocab(video, transcript_data)
+            align_times.append(time.perf_counter() - start)
+
+        segments = len(transcript_data["data"])
+        align_ms = min(align_times) * 1000
+        found = sum(1 for v in aligned.vocab if v.sentence)
+        print(
+            f"{hours}h{'':<6}{segments:>10}{len(index.text):>10}{min(index_times) * 1000:>11.1f}"
+            f"{align_ms:>11.1f}{align_ms * 1000 / segments:>12.2f}{found:>5}/{len(video.vocab)}"
+        )
+    print("=" * 72)
+    print("align ms includes building the index and the matcher.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /video_analysis/batch vs looping over POST /video_analysis.
+
+Apify and Gemini are replaced by async sleeps, so the
+script runs offline against a temporary database. It reports the wall time
+of a sequential loop (what the content team's script does today) and of the
+batch pipeline with the arrival time of every item, checks that every video
+ended up in the videos table, and sanity-checks the NDJSON endpoint.
+
+httpx's ASGI transport buffers whole responses, so arrival times are measured
+on `analyze_batch` directly; the endpoint is only checked for its output.
+
+run with: python tests/bench_batch_analysis.py [--videos 12] [--apify 1.0] [--gemini 1.5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+os.environ.setdefault("DAILY_ROOM_POOL_SIZE", "0")  # no Daily rooms needed
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+settings.DATABASE_PATH = Path(tempfile.mkdtemp()) / "batch-bench.db"
+
+from app.db import get_connection, init_schema  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import gemini  # noqa: E402
+from app.services import youtube  # noqa: E402
+from app.services.batch_analysis import analyze_batch  # noqa: E402
+
+
+def make_fakes(apify_seconds: float, gemini_seconds: float):
+    async def fake_scrape(video_url: str, target_language: str) -> dict:
+        await asyncio.sleep(apify_seconds)
+        return {"data": [{"start": "1.0", "dur": "2.0", "text": "今日はスーパーで買い物をします"}]}
+
+    async def fake_generate_content(model: str, contents: str, config: dict):
+        await asyncio.sleep(gemini_seconds)
+        return SimpleNamespace(parsed={
+            "video_id": "ignored",
+            "title": "Offline",
+            "tags": ["shopping"],
+            "video_url": "https://www.youtube.com/watch?v=ignored",
+            "duration": "0:03",
+            "summary": "A trip to the supermarket.",
+            "vocab": [{
+                "japanese_vocab": "買い物",
+                "pronunciation": "かいもの",
+                "english_translation": "shopping",
+                "timestamp": "00:01",
+                "jlpt_level": 5,
+            }],
+        })
+
+    return fake_scrape, fake_generate_content
+
+
+def video_urls(prefix: str, count: int) -> list[str]:
+    return [f"https://www.youtube.com/watch?v={prefix}{i:04d}" for i in range(count)]
+
+
+async def run(count: int, apify_seconds: float, gemini_seconds: float) -> None:
+    fake_scrape, fake_generate_content = make_fakes(apify_seconds, gemini_seconds)
+    youtube._scrape_video_transcript = fake_scrape
+    gemini._client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        generate_content=fake_generate_content
+    )))
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            start = time.perf_counter()
+            for url in video_urls("loop", count):
+                resp = await client.post("/video_analysis", json={"video_url": url, "user_level": 5})
+                resp.raise_for_status()
+            loop_seconds = time.perf_counter() - start
+
+            urls = video_urls("batch", count)
+            arrivals = []
+            start = time.perf_counter()
+            async for item in analyze_batch(urls, user_level=5):
+                arrivals.append((time.perf_counter() - start, item.model_dump()))
+            batch_seconds = time.perf_counter() - start
+
+            resp = await client.post(
+                "/video_analysis/batch",
+                json={"video_urls": [urls[0], "https://example.com/not-youtube"], "user_level": 5},
+            )
+            resp.raise_for_status()
+            lines = [json.loads(line) for line in resp.text.splitlines() if line]
+            endpoint_ok = resp.headers["content-type"].startswith("application/x-ndjson") and sorted(
+                (line["index"], line["status"]) for line in lines
+            ) == [(0, "completed"), (1, "failed")]
+
+    conn = get_connection()
+    try:
+        stored = conn.execute(
+            "SELECT COUNT(*) FROM videos WHERE youtube_video_id LIKE 'batch%'"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    print("=" * 60)
+    print(f"{count} videos, Apify {apify_seconds}s, Gemini {gemini_seconds}s")
+    print(f"fetch slots {settings.BATCH_FETCH_CONCURRENCY}, LLM slots {settings.BATCH_LLM_CONCURRENCY}")
+    print("-" * 60)
+    for at, item in arrivals:
+        print(f"  +{at:6.2f}s  #{item['index']:<3} {item['status']:<10} {item['id'] or item['error']}")
+    print("-" * 60)
+    print(f"sequential loop : {loop_seconds:6.2f}s")
+    print(f"batch endpoint  : {batch_seconds:6.2f}s  ({loop_seconds / batch_seconds:.1f}x faster)")
+    print(f"persisted       : {stored}/{count}")
+    print(f"NDJSON endpoint : {'ok' if endpoint_ok else 'unexpected output'}")
+    print("=" * 60)
+
+    completed = sum(1 for _, item in arrivals if item["status"] == "completed")
+    if completed != count or stored != count or not endpoint_ok:
+        print("❌ not every video was analyzed and persisted")
+        sys.exit(1)
+    print("✅ all videos analyzed and persisted")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=12)
+    parser.add_argument("--apify", type=float, default=1.0, help="fake Apify latency (s)")
+    parser.add_argument("--gemini", type=float, default=1.5, help="fake Gemini latency (s)")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        init_schema(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args.videos, args.apify, args.gemini))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and CPU per concurrent bot session, one process per
+session vs one worker process hosting all sessions as asyncio tasks.
+
+There is no Daily room or Gemini Live connection offline, so each session is
+a stand-in that does the per-session work a bot does locally: it runs its own
+Silero VAD and smart-turn analyzers over 20 ms frames of simulated user audio
+in real time (speech for --speech-s, then a pause, with an end-of-turn check
+after every utterance). Both modes import the full bot pipeline.
+
+- per-process: N interpreters, each running one session (the old `_spawn_bot`)
+- host:        one BotWorkerPool worker with capacity N running N sessions
+
+RSS is the peak over the measuring window (summed over processes); CPU is
+the average over the window, in % of one core.
+
+run with: python tests/bench_bot_host.py [--sessions 4] [--measure-s 10]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+os.environ.update({
+    "DAILY_API_KEY": os.environ.get("DAILY_API_KEY", "offline"),
+    "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+    "APIFY_API_TOKEN": os.environ.get("APIFY_API_TOKEN", "offline"),
+})
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+async def simulated_session(room_url, token, target_words, summary, target_readings=None, learner_id="",
+                            session_id=None, turn_models=None, on_joined=None):
+    """Stand-in for run_bot: per-session VAD + smart-turn work on real-time audio."""
+    from app.services.gemini_live_chat import load_turn_models
+
+    vad, turn = turn_models or load_turn_models()
+    vad.set_sample_rate(SAMPLE_RATE)
+    turn.set_sample_rate(SAMPLE_RATE)
+    if on_joined is not None:
+        await on_joined()
+
+    duration = float(os.environ["BENCH_SESSION_S"])
+    speech_s = float(os.environ.get("BENCH_SPEECH_S", "3"))
+    rng = np.random.default_rng()
+    frame_samples = int(SAMPLE_RATE * FRAME_SECONDS)
+    start = time.perf_counter()
+    frame = 0
+    was_speaking = False
+    while (elapsed := frame * FRAME_SECONDS) < duration:
+        speaking = elapsed % (speech_s + 2) < speech_s
+        amplitude = 6000 if speaking else 50
+        chunk = (rng.standard_normal(frame_samples) * amplitude).astype(np.int16).tobytes()
+        await vad.analyze_audio(chunk)
+        turn.append_audio(chunk, is_speech=speaking)
+        if was_speaking and not speaking:
+            await turn.analyze_end_of_turn()
+        was_speaking = speaking
+        frame += 1
+        await asyncio.sleep(max(0.0, start + frame * FRAME_SECONDS - time.perf_counter()))
+
+
+def proc_sample(pid: int) -> tuple[float, float]:
+    """Return (RSS MiB, CPU seconds) of a process."""
+    with open(f"/proc/{pid}/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return rss_kb / 1024, (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+async def measure(pids: list[int], seconds: float) -> tuple[float, float]:
+    """Peak summed RSS (MiB) and average CPU (% of a core) of `pids` over `seconds`."""
+    first = [proc_sample(pid) for pid in pids]
+    cpu_start, start = sum(cpu for _, cpu in first), time.perf_counter()
+    peak_rss = sum(rss for rss, _ in first)
+    while time.perf_counter() - start < seconds:
+        await asyncio.sleep(0.5)
+        peak_rss = max(peak_rss, sum(proc_sample(pid)[0] for pid in pids))
+    cpu_end = sum(proc_sample(pid)[1] for pid in pids)
+    return peak_rss, (cpu_end - cpu_start) / (time.perf_counter() - start) * 100
+
+
+async def per_process(args) -> tuple[float, float]:
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, __file__, "--single",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        for _ in range(args.sessions)
+    ]
+    try:
+        for process in processes:  # each prints a line once its session is running
+            await asyncio.wait_for(process.stdout.readline(), 120)
+        await asyncio.sleep(1)
+        return await measure([process.pid for process in processes], args.measure_s)
+    finally:
+        for process in processes:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+
+async def hosted(args) -> tuple[float, float]:
+    from loguru import logger
+
+    from app.services.bot_pool import BotSession, BotWorkerPool
+
+    logger.remove()
+    pool = BotWorkerPool(1, args.sessions, 0, worker_module="tests.bench_bot_host")
+    await pool.start()
+    try:
+        deadline = time.monotonic() + 120
+        while pool.stats()["idle"] < args.sessions:
+            if time.monotonic() > deadline:
+                raise TimeoutError("worker did not offer its slots")
+            await asyncio.sleep(0.05)
+        for i in range(args.sessions):
+            session_id = await pool.submit(BotSession(f"https://bench.daily.co/room-{i}", "token", ["歌"]))
+            if not await pool.wait_ready(session_id, 30):
+                raise RuntimeError(f"session {session_id} failed")
+        await asyncio.sleep(1)
+        (worker,) = pool._workers.values()
+        return await measure([worker.process.pid], args.measure_s)
+    finally:
+        await pool.stop()
+        for worker in list(pool._workers.values()):
+            worker.process.kill()
+
+
+def single_session() -> None:
+    """--single: one session in its own interpreter, as a cold bot process would run."""
+    from loguru import logger
+
+    from app.services.gemini_live_chat import load_turn_models
+
+    logger.remove()
+
+    async def joined():
+        print("joined", flush=True)
+
+    asyncio.run(simulated_session("", "", [], "", turn_models=load_turn_models(), on_joined=joined))
+
+
+def worker_main() -> None:
+    """Worker entry point used by the pool in this benchmark (real models, stand-in sessions)."""
+    from loguru import logger
+
+    from app.services.bot_worker import BotHost
+    from app.services.gemini_live_chat import load_turn_models
+
+    logger.remove()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--worker-id", required=True)
+    parser.add_argument("--capacity", type=int, required=True)
+    parser.add_argument("--max-sessions", type=int, required=True)
+    args = parser.parse_args()
+    host = BotHost(args.worker_id, args.capacity, args.max_sessions, simulated_session, load_turn_models)
+    asyncio.run(host.serve(args.socket))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions")
+    parser.add_argument("--measure-s", type=float, default=10)
+    args = parser.parse_args()
+    # Sessions outlive the measuring window; both modes are torn down afterwards
+    os.environ["BENCH_SESSION_S"] = str(args.measure_s + 60)
+
+    results = {
+        "per-process": asyncio.run(per_process(args)),
+        "host": asyncio.run(hosted(args)),
+    }
+
+    print("=" * 72)
+    print(f"{args.sessions} concurrent sessions, measured over {args.measure_s:.0f}s")
+    print(f"{'':<14}{'RSS MiB':>10}{'RSS/session':>14}{'CPU %':>10}{'CPU %/session':>16}")
+    print("-" * 72)
+    for name, (rss, cpu) in results.items():
+        print(f"{name:<14}{rss:>10.0f}{rss / args.sessions:>14.0f}{cpu:>10.1f}{cpu / args.sessions:>16.1f}")
+    print("-" * 72)
+    (rss_proc, cpu_proc), (rss_host, cpu_host) = results["per-process"], results["host"]
+    print(f"host saves {rss_proc - rss_host:.0f} MiB ({rss_proc / rss_host:.1f}x less memory), "
+          f"CPU {cpu_host - cpu_proc:+.1f} points")
+    print("=" * 72)
+    ok = rss_host < rss_proc
+    print("✅ hosted sessions use less memory" if ok else "❌ hosting sessions did not reduce memory")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    if "--socket" in sys.argv:
+        worker_main()
+    elif "--single" in sys.argv:
+        single_session()
+    else:
+        main()
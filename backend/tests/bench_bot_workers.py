@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bot start latency, cold subprocess vs warm worker pool.
+
+- cold: what every session paid before the pool; a fresh interpreter imports
+  the bot pipeline (pipecat) and loads the Silero VAD and smart-turn models
+  before it can even start joining the room
+- warm: BotWorkerPool submit -> the worker reports the bot joined
+
+Warm workers run the real imports and models but a stand-in session that
+"joins" immediately and ends after --session-ms, since there is no Daily
+room to join offline. Workers are recycled after --max-sessions sessions, so
+the run also exercises replacement.
+
+run with: python tests/bench_bot_workers.py [--cold-runs 3] [--sessions 12] [--workers 2] [--max-sessions 4]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+os.environ.update({
+    "DAILY_API_KEY": os.environ.get("DAILY_API_KEY", "offline"),
+    "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+    "APIFY_API_TOKEN": os.environ.get("APIFY_API_TOKEN", "offline"),
+})
+
+COLD_START = "from app.services.gemini_live_chat import load_turn_models; load_turn_models()"
+
+
+def worker_main() -> None:
+    """Worker entry point used by the pool in this benchmark (real models, stand-in session)."""
+    from app.services.bot_worker import BotHost
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--worker-id", required=True)
+    parser.add_argument("--capacity", type=int, required=True)
+    parser.add_argument("--max-sessions", type=int, required=True)
+    args = parser.parse_args()
+    session_seconds = float(os.environ.get("BENCH_SESSION_MS", "200")) / 1000
+
+    from app.services.gemini_live_chat import load_turn_models
+
+    async def run_session(room_url, token, target_words, summary, target_readings=None, learner_id="",
+                          session_id=None, turn_models=None, on_joined=None):
+        assert turn_models is not None
+        await on_joined()
+        await asyncio.sleep(session_seconds)
+
+    host = BotHost(args.worker_id, args.capacity, args.max_sessions, run_session, load_turn_models)
+    asyncio.run(host.serve(args.socket))
+
+
+def time_cold_start() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", COLD_START], cwd=str(backend_dir), check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+async def wait_for(predicate, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("pool did not reach the expected state")
+        await asyncio.sleep(0.01)
+
+
+async def time_warm_starts(args) -> tuple[float, list[float], dict]:
+    from loguru import logger
+
+    from app.services.bot_pool import BotSession, BotWorkerPool
+
+    logger.remove()
+    pool = BotWorkerPool(args.workers, 1, args.max_sessions, worker_module="tests.bench_bot_workers")
+    start = time.perf_counter()
+    await pool.start()
+    try:
+        await wait_for(lambda: pool.stats()["idle"] == args.workers, 120)
+        pool_ready_ms = (time.perf_counter() - start) * 1000
+
+        samples = []
+        for i in range(args.sessions):
+            await wait_for(lambda: pool.stats()["idle"] > 0, 120)  # sessions start one at a time
+            start = time.perf_counter()
+            session_id = await pool.submit(BotSession(f"https://bench.daily.co/room-{i}", "token", ["歌"]))
+            if not await pool.wait_ready(session_id, 30):
+                raise RuntimeError(f"session {session_id} failed")
+            samples.append((time.perf_counter() - start) * 1000)
+        await wait_for(lambda: pool.stats()["busy"] == 0, 30)
+        return pool_ready_ms, samples, pool.stats()
+    finally:
+        await pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-sessions", type=int, default=4)
+    parser.add_argument("--session-ms", type=float, default=200, help="length of each stand-in session")
+    args = parser.parse_args()
+    os.environ["BENCH_SESSION_MS"] = str(args.session_ms)
+
+    cold = [time_cold_start() for _ in range(args.cold_runs)]
+    pool_ready_ms, warm, stats = asyncio.run(time_warm_starts(args))
+
+    print("=" * 70)
+    print(f"cold bot start (import + models, {args.cold_runs} runs): p50 {statistics.median(cold):8.0f} ms")
+    print(f"warm pool submit -> joined ({args.sessions} sessions):  p50 {statistics.median(warm):8.1f} ms"
+          f"   max {max(warm):.1f} ms")
+    print(f"pool of {args.workers} ready after {pool_ready_ms:.0f} ms (paid once at startup)")
+    print(f"workers spawned {stats['spawned']}, recycled {stats['recycled']}, crashed {stats['crashed']}; "
+          f"sessions finished {stats['finished']}, failed {stats['failed']}, cold starts {stats['cold_starts']}")
+    print("=" * 70)
+
+    expected_recycles = args.sessions // args.max_sessions if args.max_sessions else 0
+    ok = (
+        stats["finished"] == args.sessions
+        and stats["failed"] == stats["crashed"] == stats["cold_starts"] == 0
+        and stats["recycled"] >= expected_recycles - args.workers + 1
+    )
+    print("✅ warm workers served every session" if ok else "❌ unexpected pool counters")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    if "--socket" in sys.argv:
+        worker_main()
+    else:
+        main()
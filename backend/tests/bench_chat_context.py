@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chat context growth over a simulated 30-minute voice session,
+unbounded vs ContextWindowPolicy (app/services/chat_context.py).
+
+One exchange every --exchange-s seconds: the user's transcribed turn, the
+tutor's reply and, every --tool-every exchanges, a mark_word tool call and
+its result, in the message format pipecat's aggregators write. After each
+user turn the context is converted the way the Gemini Live service does on
+every context update (and sends in full on reconnect). That conversion time
+and the context size are reported per point in the session. The bounded run
+also compacts after every tutor reply, as ContextCompactor does when the bot
+stops speaking.
+
+Model-side latency needs the live API; this measures the local per-turn
+cost and the payload size.
+
+run with: python tests/bench_chat_context.py [--minutes 30] [--exchange-s 12]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+
+from loguru import logger  # noqa: E402
+from pipecat.adapters.services.gemini_adapter import GeminiLLMAdapter  # noqa: E402
+from pipecat.processors.aggregators.llm_context import LLMContext  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.prompts import get_vocab_chatbot_prompt  # noqa: E402
+from app.services.chat_context import ContextWindowPolicy  # noqa: E402
+
+WORDS = ["りんご", "食べる", "お茶", "勉強する", "高い", "テレビ", "書く", "旅行", "友達", "電車"]
+USER_LINES = [
+    "昨日は友達と一緒に駅の近くのカフェに行きました。",
+    "うーん、ちょっと難しいですね。もう一度言ってください。",
+    "週末はたいてい家で映画を見たり本を読んだりします。",
+]
+TUTOR_LINES = [
+    "いいですね！そのカフェではどんな飲み物を注文しましたか？季節のおすすめメニューはありましたか？",
+    "もちろんです。ゆっくり話しますね。週末によくすることについて教えてください。",
+    "素敵な過ごし方ですね。最近見た映画の中で、一番面白かったのはどれですか？",
+]
+
+
+def conversion_ms(adapter: GeminiLLMAdapter, context: LLMContext, repeats: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        adapter.get_llm_invocation_params(context)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def simulate(args, bounded: bool) -> tuple[list[dict], dict]:
+    adapter = GeminiLLMAdapter()
+    context = LLMContext(get_vocab_chatbot_prompt(WORDS, "A vlog about a weekend trip to Kyoto"))
+    policy = ContextWindowPolicy(
+        settings.CHAT_CONTEXT_MAX_MESSAGES,
+        settings.CHAT_CONTEXT_RECENT_MESSAGES,
+        settings.CHAT_CONTEXT_SUMMARY_MAX_CHARS,
+    )
+    remaining = list(WORDS)
+    exchanges = int(args.minutes * 60 / args.exchange_s)
+    report_every = max(1, int(args.report_minutes * 60 / args.exchange_s))
+    rows, total_update_ms, total_compact_ms = [], 0.0, 0.0
+
+    for i in range(1, exchanges + 1):
+        context.add_message({"role": "user", "content": USER_LINES[i % len(USER_LINES)]})
+        update_ms = conversion_ms(adapter, context)  # the user's turn reaches the LLM service
+        total_update_ms += update_ms
+
+        if i % args.tool_every == 0 and remaining:
+            word = remaining.pop(0)
+            call_id = f"call-{i}"
+            context.add_message({"role": "assistant", "tool_calls": [{
+                "id": call_id, "type": "function",
+                "function": {"name": "mark_word", "arguments": json.dumps({"word": word}, ensure_ascii=False)},
+            }]})
+            result = f"Correct! The user said '{word}'. Remaining words to find: {', '.join(remaining)}."
+            context.add_message({"role": "tool", "tool_call_id": call_id, "content": json.dumps(result)})
+            total_update_ms += conversion_ms(adapter, context)
+        context.add_message({"role": "assistant", "content": TUTOR_LINES[i % len(TUTOR_LINES)]})
+
+        if bounded:
+            start = time.perf_counter()
+            compacted = policy.compact(context.get_messages(), remaining)
+            if compacted is not None:
+                context.set_messages(compacted)
+            total_compact_ms += (time.perf_counter() - start) * 1000
+
+        if i % report_every == 0 or i == exchanges:
+            payload = json.dumps(context.get_messages(), ensure_ascii=False)
+            rows.append({
+                "minute": i * args.exchange_s / 60,
+                "messages": len(context.get_messages()),
+                "kib": len(payload.encode()) / 1024,
+                "update_ms": update_ms,
+            })
+    totals = {
+        "exchanges": exchanges,
+        "update_ms": total_update_ms,
+        "compact_ms": total_compact_ms,
+        "compactions": policy.compactions,
+    }
+    return rows, totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--exchange-s", type=float, default=12)
+    parser.add_argument("--tool-every", type=int, default=15, help="exchanges between mark_word calls")
+    parser.add_argument("--report-minutes", type=float, default=5)
+    args = parser.parse_args()
+    logger.remove()
+
+    unbounded, unbounded_totals = simulate(args, bounded=False)
+    bounded, bounded_totals = simulate(args, bounded=True)
+
+    print("=" * 86)
+    print(f"simulated {args.minutes:.0f}-minute session, one exchange every {args.exchange_s:.0f}s, "
+          f"{unbounded_totals['exchanges']} exchanges")
+    print(f"{'minute':>6}  {'messages':>18}  {'context KiB':>20}  {'per-update conversion ms':>28}")
+    print(f"{'':>6}  {'unbounded':>9}{'bounded':>9}  {'unbounded':>10}{'bounded':>10}  {'unbounded':>14}{'bounded':>14}")
+    print("-" * 86)
+    for before, after in zip(unbounded, bounded):
+        print(f"{before['minute']:>6.0f}  {before['messages']:>9}{after['messages']:>9}  "
+              f"{before['kib']:>10.1f}{after['kib']:>10.1f}  {before['update_ms']:>14.3f}{after['update_ms']:>14.3f}")
+    print("-" * 86)
+    print(f"context conversion over the session: unbounded {unbounded_totals['update_ms']:.1f} ms, "
+          f"bounded {bounded_totals['update_ms']:.1f} ms "
+          f"(+ {bounded_totals['compact_ms']:.1f} ms in {bounded_totals['compactions']} compactions)")
+    print("=" * 86)
+
+    ok = bounded[-1]["messages"] <= settings.CHAT_CONTEXT_MAX_MESSAGES + 3
+    print("✅ bounded context stays within CHAT_CONTEXT_MAX_MESSAGES" if ok else "❌ bounded context kept growing")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Latency comparison: single-shot vs map-reduce (chunked) video analysis.
+
+Gemini is replaced by a latency model so the comparison runs offline:
+
+    latency = overhead + input_tokens * prefill_cost + output_tokens * decode_cost
+
+Token counts come from the same cl100k_base tokenizer the chunker uses. The
+transcript is built by repeating the segments of tests/sample_apify_output.json
+until it spans the requested length.
+
+run with: python tests/bench_chunked_analysis.py [--minutes 60] [--decode-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+
+from app.core.config import settings  # noqa: E402
+from app.services import gemini  # noqa: E402
+from app.services.chunked_analysis import analyze_transcript_chunked  # noqa: E402
+from app.services.chunker import count_tokens, split_transcript  # noqa: E402
+from app.services.video_analysis import generate_analysis  # noqa: E402
+from app.services.youtube import format_transcript  # noqa: E402
+
+FIXTURE = backend_dir / "tests" / "sample_apify_output.json"
+
+
+def build_transcript(minutes: int) -> dict:
+    """Repeat the fixture segments (shifted in time) until `minutes` are covered."""
+    segments = json.loads(FIXTURE.read_text(encoding="utf-8"))[0]["data"]
+    span = max(float(s["start"]) + float(s["dur"]) for s in segments)
+    data, offset = [], 0.0
+    while offset < minutes * 60:
+        for segment in segments:
+            data.append({
+                "start": f"{float(segment['start']) + offset:.3f}",
+                "dur": segment["dur"],
+                "text": segment["text"],
+            })
+        offset += span
+    return {"data": data}
+
+
+def _fake_vocab(index: int, timestamp: str = "00:10") -> dict:
+    return {
+        "japanese_vocab": f"単語{index}",
+        "pronunciation": f"たんご{index}",
+        "english_translation": f"word {index}",
+        "timestamp": timestamp,
+        "jlpt_level": 3,
+    }
+
+
+def make_fake_client(overhead: float, prefill_ms: float, decode_ms: float, calls: list):
+    async def generate_content(model: str, contents: str, config: dict):
+        schema = config["response_json_schema"].get("title")
+        if schema == "ChunkCandidates":
+            parsed = {
+                "summary": "この部分では買い物について話します。",
+                "vocab": [
+                    {**_fake_vocab(len(calls) * 100 + i), "occurrences": 1}
+                    for i in range(settings.CHUNK_CANDIDATES_PER_CHUNK)
+                ],
+            }
+        elif schema == "VideoOverview":
+            parsed = {"title": "Offline", "tags": ["shopping"], "summary": "A walk through a supermarket."}
+        else:
+            parsed = {
+                "video_id": "offline",
+                "title": "Offline",
+                "tags": ["shopping"],
+                "video_url": "https://www.youtube.com/watch?v=offline",
+                "duration": "60:00",
+                "summary": "A walk through a supermarket.",
+                "vocab": [_fake_vocab(i) for i in range(settings.ANALYSIS_VOCAB_COUNT)],
+            }
+        input_tokens = count_tokens(contents)
+        output_tokens = count_tokens(json.dumps(parsed, ensure_ascii=False))
+        calls.append((schema, input_tokens, output_tokens))
+        await asyncio.sleep(overhead + input_tokens * prefill_ms / 1000 + output_tokens * decode_ms / 1000)
+        return SimpleNamespace(parsed=parsed)
+
+    return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+
+
+async def run(args) -> None:
+    transcript_data = build_transcript(args.minutes)
+    transcript = format_transcript(transcript_data)
+    url = "https://www.youtube.com/watch?v=offline"
+
+    print("=" * 70)
+    print(f"Transcript: {args.minutes} min, {len(transcript_data['data'])} segments, "
+          f"{count_tokens(transcript)} tokens, {len(split_transcript(transcript))} chunks")
+    print(f"Latency model: {args.overhead}s + {args.prefill_ms}ms/input tok + {args.decode_ms}ms/output tok")
+    print(f"Chunk size {settings.TRANSCRIPT_CHUNK_TOKENS} tokens, concurrency {settings.CHUNK_ANALYSIS_CONCURRENCY}")
+    print("=" * 70)
+
+    results = {}
+    for mode in ("single-shot", "chunked"):
+        calls: list = []
+        gemini._client = make_fake_client(args.overhead, args.prefill_ms, args.decode_ms, calls)
+        start = time.perf_counter()
+        if mode == "chunked":
+            video = await analyze_transcript_chunked("offline", url, transcript_data, transcript, args.level)
+        else:
+            video = await generate_analysis("offline", url, transcript, args.level)
+        elapsed = time.perf_counter() - start
+        results[mode] = elapsed
+        print(f"{mode:<12} {elapsed:6.2f}s  calls={len(calls):<3} "
+              f"input_tokens={sum(c[1] for c in calls):<7} output_tokens={sum(c[2] for c in calls):<6} "
+              f"vocab={len(video.vocab)}")
+
+    print("-" * 70)
+    print(f"speedup (single-shot / chunked): {results['single-shot'] / results['chunked']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--level", type=int, default=3)
+    parser.add_argument("--overhead", type=float, default=0.5, help="Fixed per-call latency (s)")
+    parser.add_argument("--prefill-ms", type=float, default=0.02, help="Per input token (ms)")
+    parser.add_argument("--decode-ms", type=float, default=5.0, help="Per output token (ms)")
+    asyncio.run(run(parser.parse_args()))
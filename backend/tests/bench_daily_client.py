@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: Daily room + token creation on /vocab-live-chat/start.
+
+Runs against the local Daily stand-in (tests/fake_upstreams.py) served over
+HTTPS with a throwaway self-signed certificate, behind a TCP proxy that adds
+a round-trip time to every packet exchange, so connection setup costs what
+it would against the real API (TCP + TLS handshakes are ~2-3 RTTs).
+
+Compares, per session start:
+
+- before: a new httpx.AsyncClient per call, room then token (the old daily.py)
+- shared client, room then token (keep-alive only)
+- after: shared client, room and token concurrently (create_room_with_token)
+
+and finally times POST /vocab-live-chat/start end to end with the room pool
+disabled, which is the path that still calls Daily on the request.
+
+run with: python tests/bench_daily_client.py [--rtt-ms 40] [--daily-ms 80] [--starts 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+CERT_DIR = Path(tempfile.mkdtemp())
+CERT_FILE, KEY_FILE = CERT_DIR / "cert.pem", CERT_DIR / "key.pem"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PROXY_PORT, SERVER_PORT = free_port(), free_port()
+os.environ.update({
+    "DAILY_API_KEY": "offline",
+    "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+    "APIFY_API_TOKEN": os.environ.get("APIFY_API_TOKEN", "offline"),
+    "DAILY_API_URL": f"https://127.0.0.1:{PROXY_PORT}/daily/v1",
+    "DAILY_ROOM_POOL_SIZE": "0",
+    "BOT_SPAWN_ENABLED": "false",
+    "SSL_CERT_FILE": str(CERT_FILE),  # trust the self-signed stand-in
+    "DATABASE_PATH": str(CERT_DIR / "bench.db"),
+})
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import daily  # noqa: E402
+
+
+async def delayed_pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float) -> None:
+    """Forward bytes, delivering each chunk `delay` seconds after it was read."""
+    queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue()
+
+    async def deliver():
+        while True:
+            due, chunk = await queue.get()
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            if not chunk:
+                writer.close()
+                return
+            writer.write(chunk)
+            await writer.drain()
+
+    delivery = asyncio.create_task(deliver())
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            queue.put_nowait((time.perf_counter() + delay, chunk))
+            if not chunk:
+                break
+        await delivery
+    except (ConnectionError, asyncio.CancelledError):
+        delivery.cancel()
+
+
+async def start_rtt_proxy(rtt: float) -> asyncio.AbstractServer:
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection("127.0.0.1", SERVER_PORT)
+        try:
+            await asyncio.gather(
+                delayed_pipe(client_reader, server_writer, rtt / 2),
+                delayed_pipe(server_reader, client_writer, rtt / 2),
+                return_exceptions=True,
+            )
+        except asyncio.CancelledError:
+            pass  # benchmark finished with keep-alive connections still open
+        finally:
+            client_writer.close()
+            server_writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", PROXY_PORT)
+
+
+async def before_start() -> None:
+    """The pre-change code path: one client per call, sequential."""
+    headers = {"Authorization": f"Bearer {settings.DAILY_API_KEY}"}
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(f"{settings.DAILY_API_URL}/rooms", headers=headers, json={"properties": {}})
+        room_name = resp.json()["name"]
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{settings.DAILY_API_URL}/meeting-tokens",
+            headers=headers,
+            json={"properties": {"room_name": room_name, "is_owner": True}},
+        )
+        resp.json()["token"]
+
+
+async def shared_sequential_start() -> None:
+    room = await daily.create_daily_room()
+    await daily.get_daily_token(room["name"])
+
+
+async def shared_concurrent_start() -> None:
+    await daily.create_room_with_token()
+
+
+async def time_variant(fn, starts: int) -> list[float]:
+    await fn()  # warm-up (the shared client opens its connections here)
+    samples = []
+    for _ in range(starts):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)  # sessions start one at a time
+    return samples
+
+
+async def time_endpoint(starts: int) -> list[float]:
+    from app.main import app
+
+    samples = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for i in range(starts + 1):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):  # the endpoint prints its payload
+                    resp = await client.post("/vocab-live-chat/start", json={"vocab": ["歌"]})
+                resp.raise_for_status()
+                if i:  # first request warms the client
+                    samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summary(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * len(ordered)) - 1)]
+    return f"p50 {statistics.median(samples):7.1f} ms   p95 {p95:7.1f} ms   mean {statistics.fmean(samples):7.1f} ms"
+
+
+async def run(args) -> None:
+    from loguru import logger
+
+    logger.remove()  # per-request logging would dominate the timings
+    proxy = await start_rtt_proxy(args.rtt_ms / 1000)
+    try:
+        results = {
+            "before: client per call, sequential": await time_variant(before_start, args.starts),
+            "shared client, sequential": await time_variant(shared_sequential_start, args.starts),
+            "after: shared client, concurrent": await time_variant(shared_concurrent_start, args.starts),
+        }
+        await daily.close_http_client()
+        endpoint = await time_endpoint(args.starts)
+    finally:
+        proxy.close()
+
+    print("=" * 78)
+    print(f"Daily stand-in: {args.daily_ms:.0f} ms per call, RTT {args.rtt_ms:.0f} ms, HTTPS, {args.starts} starts")
+    print("-" * 78)
+    for name, samples in results.items():
+        print(f"{name:<38}{summary(samples)}")
+    print("-" * 78)
+    before = statistics.median(results["before: client per call, sequential"])
+    after = statistics.median(results["after: shared client, concurrent"])
+    print(f"saved per session start (p50): {before - after:.0f} ms ({before / after:.1f}x faster)")
+    print(f"POST /vocab-live-chat/start (pool off): {summary(endpoint)}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=40, help="network round-trip time to Daily")
+    parser.add_argument("--daily-ms", type=float, default=80, help="Daily server time per call")
+    parser.add_argument("--starts", type=int, default=20)
+    args = parser.parse_args()
+
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", str(KEY_FILE), "-out", str(CERT_FILE),
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    server = subprocess.Popen([
+        sys.executable, str(backend_dir / "tests" / "fake_upstreams.py"), "serve",
+        "--port", str(SERVER_PORT),
+        "--daily-latency", str(args.daily_ms / 1000),
+        "--jitter", "0",
+        "--ssl-certfile", str(CERT_FILE),
+        "--ssl-keyfile", str(KEY_FILE),
+    ])
+    try:
+        for _ in range(100):
+            try:
+                with socket.create_connection(("127.0.0.1", SERVER_PORT), timeout=0.2):
+                    break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(run(args))
+    finally:
+        server.kill()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Quality/latency harness for the local vocab pre-filter.
+
+For every fixture and JLPT level, compares the current full-transcript prompt
+(compacted transcript, no pre-filter) with the pre-filtered prompt:
+
+- prompt tokens before/after and the reduction factor
+- pre-filter latency (dictionary load excluded, it happens once per process)
+- coverage: share of the in-level dictionary words found in the full
+  transcript that are still present in the filtered prompt
+- with --live, both prompts are sent to Gemini and the overlap of the
+  returned vocab lists (and each call's latency) is reported
+
+Fixtures use the Apify output format of tests/sample_apify_output.json. By
+default that file plus 30 and 60 minute transcripts built from a bank of
+everyday sentences are used.
+
+run with: python tests/bench_prefilter.py [--fixture path.json ...] [--live]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+
+from app.core.prompts import get_video_analysis_prompt  # noqa: E402
+from app.schemas.video import Video  # noqa: E402
+from app.services.chunker import count_tokens  # noqa: E402
+from app.services.gemini import generate_structured  # noqa: E402
+from app.services.transcript_compaction import compact_transcript  # noqa: E402
+from app.services.vocab_prefilter import (  # noqa: E402
+    _LEVEL_WEIGHTS,
+    load_dictionary,
+    prefilter_transcript,
+    segment,
+)
+
+FIXTURE = backend_dir / "tests" / "sample_apify_output.json"
+SEGMENT_SECONDS = 4.0
+LEVELS = (5, 3, 1)
+
+SENTENCES = [
+    "みなさん、こんにちは",
+    "今日は近所のスーパーに買い物に行きます",
+    "買い物の前に、牛乳パックなどリサイクルの物を出します",
+    "ペットボトルと紙はゴミの日に分けて捨てます",
+    "この店は野菜がとても新鮮で、値段も安いです",
+    "納豆とキムチは毎日食べています",
+    "冷蔵庫の中を確認してから、必要な材料を決めます",
+    "最近、卵の値段がずいぶん高くなりましたね",
+    "午後は友達と駅の近くのレストランで食事をしました",
+    "日本の季節の行事について少し説明します",
+    "お正月には家族みんなで集まって、特別な料理を食べます",
+    "夏になると、町のあちこちでお祭りがあります",
+    "この地域の伝統的なお祭りは、三百年の歴史があるそうです",
+    "えーと、次は売り場を案内しますね",
+    "ここはお菓子の売り場で、子供たちに人気があります",
+    "割引のシールが貼ってある商品は、夕方になると増えます",
+    "半額になったお弁当はすぐになくなります",
+    "賞味期限が近い食品は、値引きされることが多いです",
+    "節約のために、毎週の献立を考えてから買い物をしています",
+    "食品の廃棄を削減するための取り組みも進んでいます",
+    "レジで袋が必要かどうか聞かれます",
+    "レシートはちゃんと確認したほうがいいですよ",
+    "支払いはカードでもできますし、現金でも大丈夫です",
+    "家に帰ったら、買った物を冷蔵庫に入れます",
+    "実は、この町には有名な老舗の和菓子屋があります",
+    "週末はいつも行列ができるほど繁盛しています",
+    "名物のお菓子は、昔から地元の人に愛されてきました",
+    "由来を調べてみると、とても面白い話がありました",
+    "天気がいい日は、川の近くを散歩するのが好きです",
+    "雨の日は家で映画を見たり、本を読んだりします",
+    "日本語の勉強は難しいですが、楽しいです",
+    "新しい言葉を覚えるために、毎日練習しています",
+    "先生に質問したら、詳しく説明してくれました",
+    "将来は日本で仕事をしたいと考えています",
+    "留学の経験は、私の生活に大きな影響を与えました",
+    "文化の違いに驚くこともありますが、それも魅力です",
+    "環境のために、資源の分別は大切な習慣です",
+    "容器や包装を減らす工夫をしているお店も増えています",
+    "この発酵食品は、栄養が豊富で健康にいいそうです",
+    "旬の野菜を使うと、料理の味がぐっと良くなります",
+    "祖母から教わった郷土料理を作ってみます",
+    "まず、材料を全部テーブルに並べます",
+    "次に、野菜を細かく切ります",
+    "最後に、調味料を加えて五分ぐらい煮ます",
+    "できました、とても美味しそうですね",
+    "みなさんも、ぜひ試してみてください",
+    "感想があれば、コメントで教えてください",
+    "それでは、また来週お会いしましょう",
+    "[音楽]",
+    "うーん",
+]
+
+
+def build_synthetic(minutes: int, seed: int = 7) -> dict:
+    """Shuffle the sentence bank into a transcript spanning `minutes`."""
+    rng = random.Random(seed)
+    count = int(minutes * 60 / SEGMENT_SECONDS)
+    texts = [rng.choice(SENTENCES) for _ in range(count)]
+    return {
+        "data": [
+            {"start": f"{i * SEGMENT_SECONDS:.3f}", "dur": f"{SEGMENT_SECONDS:.3f}", "text": text}
+            for i, text in enumerate(texts)
+        ]
+    }
+
+
+def load_fixture(path: Path) -> dict:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data[0] if isinstance(data, list) else data
+
+
+def in_level_words(text: str, user_level: int) -> set[int]:
+    entries, _ = load_dictionary()
+    found = set()
+    for line in text.splitlines():
+        for entry_index in segment(line):
+            if abs(entries[entry_index].jlpt_level - user_level) in _LEVEL_WEIGHTS:
+                found.add(entry_index)
+    return found
+
+
+async def live_vocab(prompt: str) -> tuple[set[str], float]:
+    start = time.perf_counter()
+    video = await generate_structured(prompt, Video, stage="prefilter benchmark")
+    return {v.japanese_vocab for v in video.vocab}, time.perf_counter() - start
+
+
+async def run(fixtures: list[tuple[str, dict]], live: bool) -> None:
+    load_dictionary()  # one-off cost, not part of the per-analysis latency
+    print("=" * 100)
+    print(
+        f"{'fixture':<26}{'level':>6}{'lines':>12}{'full tok':>10}{'filt tok':>10}"
+        f"{'reduction':>11}{'ms':>8}{'coverage':>10}{'filtered':>10}"
+    )
+    print("-" * 100)
+    for name, transcript_data in fixtures:
+        transcript = compact_transcript(transcript_data).text
+        for level in LEVELS:
+            full_prompt = get_video_analysis_prompt("bench", "https://youtu.be/bench", transcript, level)
+
+            start = time.perf_counter()
+            result = prefilter_transcript(transcript, level)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            filtered_prompt = get_video_analysis_prompt(
+                "bench",
+                "https://youtu.be/bench",
+                result.text,
+                level,
+                [candidate.label() for candidate in result.candidates],
+                result.filtered,
+            )
+            full_tokens, filtered_tokens = count_tokens(full_prompt), count_tokens(filtered_prompt)
+            reference = in_level_words(transcript, level)
+            kept = in_level_words(result.text, level)
+            coverage = len(reference & kept) / len(reference) if reference else 1.0
+            print(
+                f"{name:<26}{'N' + str(level):>6}{f'{result.lines_before}->{result.lines_after}':>12}"
+                f"{full_tokens:>10}{filtered_tokens:>10}{full_tokens / filtered_tokens:>10.1f}x"
+                f"{elapsed_ms:>8.1f}{coverage:>10.0%}{str(result.filtered):>10}"
+            )
+
+            if live:
+                full_vocab, full_s = await live_vocab(full_prompt)
+                filtered_vocab, filtered_s = await live_vocab(filtered_prompt)
+                overlap = len(full_vocab & filtered_vocab) / max(len(full_vocab | filtered_vocab), 1)
+                print(
+                    f"{'':<32}live: full {full_s:.1f}s, filtered {filtered_s:.1f}s, "
+                    f"vocab overlap {overlap:.0%} ({len(full_vocab & filtered_vocab)} shared)"
+                )
+    print("=" * 100)
+    print("coverage = in-level dictionary words of the full transcript still in the filtered prompt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", action="append", type=Path, help="Apify output JSON (repeatable)")
+    parser.add_argument("--live", action="store_true", help="also compare Gemini output (needs GOOGLE_API_KEY)")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixtures = [(path.name, load_fixture(path)) for path in args.fixture]
+    else:
+        fixtures = [
+            (FIXTURE.name, load_fixture(FIXTURE)),
+            ("synthetic 30 min", build_synthetic(30)),
+            ("synthetic 60 min", build_synthetic(60)),
+        ]
+    asyncio.run(run(fixtures, args.live))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-session vs shared VAD and smart-turn inference.
+
+Simulates N concurrent bot sessions in one process, as a bot worker hosts
+them. Each session feeds 20 ms frames of simulated user audio in real time
+to its VAD analyzer and smart-turn analyzer (speech for --speech-s, then a
+pause of --pause-s), and asks for an end-of-turn decision after every
+utterance, like pipecat does once VAD reports silence.
+
+- per-session: pipecat's SileroVADAnalyzer + LocalSmartTurnAnalyzerV3 per session
+- shared:      app.services.turn_inference (one model of each per process, batched)
+
+Each mode and size runs in a fresh interpreter. Reports process CPU per
+session (% of one core), peak RSS, and end-of-turn latency (from the
+analyze_end_of_turn call to its result).
+
+run with: python tests/bench_turn_inference.py [--sessions 1 10 50] [--measure-s 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+
+async def session(vad, turn, args, deadline: float, latencies: list[float]) -> None:
+    vad.set_sample_rate(SAMPLE_RATE)
+    turn.set_sample_rate(SAMPLE_RATE)
+    rng = np.random.default_rng()
+    frame_samples = int(SAMPLE_RATE * FRAME_SECONDS)
+    cycle = args.speech_s + args.pause_s
+    offset = random.uniform(0, cycle)  # sessions don't speak in lockstep
+    start = time.perf_counter()
+    frame = 0
+    was_speaking = False
+    while time.perf_counter() < deadline:
+        speaking = (frame * FRAME_SECONDS + offset) % cycle < args.speech_s
+        chunk = (rng.standard_normal(frame_samples) * (6000 if speaking else 50)).astype(np.int16).tobytes()
+        await vad.analyze_audio(chunk)
+        turn.append_audio(chunk, is_speech=speaking)
+        if was_speaking and not speaking:
+            asked = time.perf_counter()
+            await turn.analyze_end_of_turn()
+            latencies.append((time.perf_counter() - asked) * 1000)
+        was_speaking = speaking
+        frame += 1
+        await asyncio.sleep(max(0.0, start + frame * FRAME_SECONDS - time.perf_counter()))
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+async def child(mode: str, sessions: int, args) -> dict:
+    from loguru import logger
+
+    logger.remove()
+    from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
+    from pipecat.audio.vad.silero import SileroVADAnalyzer
+
+    from app.services.turn_inference import turn_inference
+
+    load_start = time.perf_counter()
+    if mode == "shared":
+        models = [turn_inference.analyzers() for _ in range(sessions)]
+    else:
+        models = [(SileroVADAnalyzer(), LocalSmartTurnAnalyzerV3()) for _ in range(sessions)]
+    load_ms = (time.perf_counter() - load_start) * 1000
+
+    warm_up = 3.0
+    latencies: list[float] = []
+    deadline = time.perf_counter() + warm_up + args.measure_s
+    tasks = [asyncio.create_task(session(vad, turn, args, deadline, latencies)) for vad, turn in models]
+    await asyncio.sleep(warm_up)
+    latencies.clear()
+    cpu_start, wall_start = sum(os.times()[:2]), time.perf_counter()
+    await asyncio.gather(*tasks)
+    cpu = (sum(os.times()[:2]) - cpu_start) / (time.perf_counter() - wall_start) * 100
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "load_ms": load_ms,
+        "cpu_per_session": cpu / sessions,
+        "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "eot_p50": percentile(latencies, 0.5),
+        "eot_p95": percentile(latencies, 0.95),
+        "eot_count": len(latencies),
+        "engine": turn_inference.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 10, 50])
+    parser.add_argument("--measure-s", type=float, default=20)
+    parser.add_argument("--speech-s", type=float, default=2.5)
+    parser.add_argument("--pause-s", type=float, default=2.5)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SESSIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(child(args.child[0], int(args.child[1]), args))
+        print(json.dumps(result))
+        return
+
+    rows = []
+    for sessions in args.sessions:
+        for mode in ("per-session", "shared"):
+            proc = subprocess.run(
+                [
+                    sys.executable, __file__, "--child", mode, str(sessions),
+                    "--measure-s", str(args.measure_s), "--speech-s", str(args.speech_s),
+                    "--pause-s", str(args.pause_s),
+                ],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(proc.stderr[-2000:])
+                raise SystemExit(f"❌ {mode} x{sessions} failed")
+            rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print("=" * 107)
+    print(f"{os.cpu_count()} CPU(s); speech {args.speech_s}s / pause {args.pause_s}s per session; "
+          f"measured over {args.measure_s:.0f}s")
+    print(f"{'sessions':>8}  {'mode':<12}{'load ms':>9}{'RSS MiB':>9}{'CPU %/session':>15}"
+          f"{'EOT p50 ms':>12}{'EOT p95 ms':>12}{'EOTs':>6}{'VAD batch':>11}{'turn batch':>12}")
+    print("-" * 107)
+    for row in rows:
+        shared = row["mode"] == "shared"
+        vad_batch = row["engine"]["vad"]["mean_batch"] if shared else 1
+        turn_batch = row["engine"]["smart_turn"]["mean_batch"] if shared else 1
+        print(f"{row['sessions']:>8}  {row['mode']:<12}{row['load_ms']:>9.0f}{row['rss_mib']:>9.0f}"
+              f"{row['cpu_per_session']:>15.2f}{row['eot_p50']:>12.1f}{row['eot_p95']:>12.1f}"
+              f"{row['eot_count']:>6}{vad_batch:>11.2f}{turn_batch:>12.2f}")
+    print("=" * 107)
+
+
+if __name__ == "__main__":
+    main()
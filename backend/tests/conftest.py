@@ -0,0 +1,51 @@
+"""
+Shared setup for the offline tests in this directory.
+
+Settings are read once, when app.core.config is first imported, so the
+environment every test module relies on is set here, before any of them is
+collected: placeholder API keys, a throwaway database and latency log, and a
+small bot capacity with cold bots only (test_bot_sessions.py).
+
+`async def test_*` functions run on a fresh event loop each.
+
+run with: python -m pytest tests
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from loguru import logger
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+_tmp = Path(tempfile.mkdtemp())
+os.environ.update({
+    "DATABASE_PATH": str(_tmp / "test.db"),
+    "TURN_LATENCY_LOG_PATH": str(_tmp / "turn_latency.jsonl"),
+    "DAILY_ROOM_POOL_SIZE": "0",
+    "BOT_WORKER_POOL_SIZE": "0",  # every bot is a cold process
+    "BOT_MAX_SESSIONS": "2",
+    "BOT_SPAWN_ENABLED": "true",
+    "CLIENT_WARM_UP_ENABLED": "false",
+})
+
+
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+def pytest_unconfigure(config):
+    # Background writers log from atexit, after pytest closed the captured stderr
+    logger.remove()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Apify, Gemini and Daily, for offline benchmarks and load tests.
+
+One FastAPI app serves the subset of each API the backend uses:
+
+- /apify/v2/...          actor runs (start, long-poll, abort) and dataset items
+- /gemini/v1beta/...     models/{model}:generateContent in JSON mode
+- /daily/v1/...          rooms and meeting-tokens
+
+Responses are replayed from recordings in tests/fixtures/replay/<video_id>.json
+when one exists for the requested video, otherwise built from the seed fixtures
+(tests/sample_apify_output.json for transcripts, tests/sample-video-data.json
+for analyses). Each upstream gets a configurable latency (mean +/- jitter); an
+Apify run finishes that long after it was started, like a real actor run.
+GET /_stats returns per-upstream call counts.
+
+Point the backend at it with FAKE_UPSTREAMS_URL (see Settings); no API keys
+are needed then:
+
+    python tests/fake_upstreams.py serve --port 8765 --apify-latency 2 --gemini-latency 3
+    FAKE_UPSTREAMS_URL=http://127.0.0.1:8765 BOT_SPAWN_ENABLED=false python -m app.main
+
+Record replay fixtures from the real services (needs the real API keys):
+
+    python tests/fake_upstreams.py record https://www.youtube.com/watch?v=<id> [...] [--user-level 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.responses import Response  # noqa: E402
+
+TESTS_DIR = backend_dir / "tests"
+REPLAY_DIR = TESTS_DIR / "fixtures" / "replay"
+SEED_TRANSCRIPT = TESTS_DIR / "sample_apify_output.json"
+SEED_ANALYSIS = TESTS_DIR / "sample-video-data.json"
+
+_VIDEO_ID = re.compile(r"(?:v=|youtu\.be/|video_id: )([A-Za-z0-9_-]{6,})")
+
+
+class Latency:
+    """Mean latency with uniform +/- jitter (as a fraction of the mean)."""
+
+    def __init__(self, mean: float, jitter: float):
+        self.mean = mean
+        self.jitter = jitter
+
+    def sample(self) -> float:
+        return max(0.0, self.mean * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def sleep(self) -> None:
+        await asyncio.sleep(self.sample())
+
+
+class Fixtures:
+    """Recorded transcripts/analyses by YouTube video id, with seed fallbacks."""
+
+    def __init__(self, replay_dir: Path = REPLAY_DIR):
+        seed = json.loads(SEED_TRANSCRIPT.read_text(encoding="utf-8"))
+        self.seed_transcript = seed[0] if isinstance(seed, list) else seed
+        self.seed_analysis = _without_ids(json.loads(SEED_ANALYSIS.read_text(encoding="utf-8")))
+        self.recorded: dict[str, dict] = {}
+        for path in sorted(replay_dir.glob("*.json")) if replay_dir.is_dir() else []:
+            self.recorded[path.stem] = json.loads(path.read_text(encoding="utf-8"))
+
+    def transcript(self, video_id: str | None) -> dict:
+        recorded = self.recorded.get(video_id or "", {}).get("transcript")
+        return recorded if recorded is not None else self.seed_transcript
+
+    def analysis(self, video_id: str | None) -> dict:
+        recorded = self.recorded.get(video_id or "", {}).get("analysis")
+        analysis = dict(recorded or self.seed_analysis)
+        if video_id:
+            analysis["video_id"] = video_id
+            analysis["video_url"] = f"https://www.youtube.com/watch?v={video_id}"
+        return analysis
+
+
+def _without_ids(analysis: dict) -> dict:
+    """Drop the internal UUIDs a stored Video carries; Gemini never returns them."""
+    analysis = {key: value for key, value in analysis.items() if key != "id"}
+    analysis["vocab"] = [{k: v for k, v in vocab.items() if k != "id"} for vocab in analysis.get("vocab", [])]
+    return analysis
+
+
+def _find_video_id(text: str) -> str | None:
+    match = _VIDEO_ID.search(text)
+    return match.group(1) if match else None
+
+
+def _shape(value, schema: dict):
+    """Trim/fill `value` so it matches a JSON schema (objects, arrays, scalars)."""
+    schema_type = schema.get("type")
+    if schema_type == "object" or "properties" in schema:
+        value = value if isinstance(value, dict) else {}
+        return {
+            key: _shape(value.get(key), prop)
+            for key, prop in schema.get("properties", {}).items()
+            if key in value or key in schema.get("required", [])
+        }
+    if schema_type == "array":
+        return [_shape(item, schema.get("items", {})) for item in value or []]
+    if value is not None:
+        return value
+    return {"integer": 1, "number": 1, "boolean": False}.get(schema_type, "")
+
+
+def _resolve_refs(schema: dict, defs: dict | None = None) -> dict:
+    """Inline $ref/$defs and collapse anyOf-with-null so `_shape` sees plain types."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return _resolve_refs(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return _resolve_refs(options[0], defs) if options else {}
+    resolved = dict(schema)
+    if "properties" in schema:
+        resolved["properties"] = {key: _resolve_refs(prop, defs) for key, prop in schema["properties"].items()}
+    if "items" in schema:
+        resolved["items"] = _resolve_refs(schema["items"], defs)
+    return resolved
+
+
+async def _json_body(request: Request) -> dict:
+    """Request JSON; the Apify client gzips its request bodies."""
+    body = await request.body()
+    if request.headers.get("content-encoding") == "gzip":
+        body = zlib.decompress(body, wbits=31)
+    return json.loads(body) if body else {}
+
+
+def create_app(apify: Latency, gemini: Latency, daily: Latency, fixtures: Fixtures | None = None) -> FastAPI:
+    fixtures = fixtures or Fixtures()
+    app = FastAPI(title="Fake upstreams")
+    calls: Counter[str] = Counter()
+    runs: dict[str, dict] = {}
+
+    # ---- Apify -------------------------------------------------------------
+
+    def run_data(run: dict) -> dict:
+        if run["status"] == "RUNNING" and time.monotonic() >= run["finishes_at"]:
+            run["status"] = "SUCCEEDED"
+        return {"data": {"id": run["id"], "status": run["status"], "defaultDatasetId": run["id"]}}
+
+    async def wait_for_run(run: dict, wait_for_finish: float) -> dict:
+        remaining = run["finishes_at"] - time.monotonic()
+        if run["status"] == "RUNNING" and remaining > 0 and wait_for_finish > 0:
+            await asyncio.sleep(min(remaining, wait_for_finish))
+        return run_data(run)
+
+    @app.post("/apify/v2/acts/{actor_id}/runs", status_code=201)
+    async def apify_start_run(actor_id: str, request: Request, waitForFinish: float = 0):
+        calls["apify.start"] += 1
+        run_input = await _json_body(request)
+        run_id = uuid.uuid4().hex
+        runs[run_id] = {
+            "id": run_id,
+            "status": "RUNNING",
+            "video_id": _find_video_id(run_input.get("videoUrl", "")),
+            "finishes_at": time.monotonic() + apify.sample(),
+        }
+        return await wait_for_run(runs[run_id], waitForFinish)
+
+    @app.get("/apify/v2/actor-runs/{run_id}")
+    async def apify_get_run(run_id: str, waitForFinish: float = 0):
+        calls["apify.poll"] += 1
+        run = runs.get(run_id)
+        if run is None:
+            raise HTTPException(404, "run not found")
+        return await wait_for_run(run, waitForFinish)
+
+    @app.post("/apify/v2/actor-runs/{run_id}/abort")
+    async def apify_abort_run(run_id: str):
+        calls["apify.abort"] += 1
+        run = runs.get(run_id)
+        if run is None:
+            raise HTTPException(404, "run not found")
+        run["status"] = "ABORTED"
+        return run_data(run)
+
+    @app.get("/apify/v2/datasets/{dataset_id}/items")
+    async def apify_dataset_items(dataset_id: str, format: str = "json"):
+        calls["apify.items"] += 1
+        run = runs.pop(dataset_id, None)
+        if run is None:
+            raise HTTPException(404, "dataset not found")
+        item = {"videoId": run["video_id"], **fixtures.transcript(run["video_id"])}
+        if format == "jsonl":
+            return Response(json.dumps(item, ensure_ascii=False) + "\n", media_type="application/jsonl")
+        return Response(json.dumps([item], ensure_ascii=False), media_type="application/json")
+
+    # ---- Gemini ------------------------------------------------------------
+
+    @app.post("/gemini/{api_version}/models/{model_action}")
+    async def gemini_generate_content(api_version: str, model_action: str, request: Request):
+        calls["gemini.generate"] += 1
+        body = await _json_body(request)
+        prompt = "".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        schema = body.get("generationConfig", {}).get("responseJsonSchema") or {}
+        await gemini.sleep()
+        payload = _shape(fixtures.analysis(_find_video_id(prompt)), _resolve_refs(schema)) if schema else {}
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": json.dumps(payload, ensure_ascii=False)}]},
+                "finishReason": "STOP",
+            }],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 2, "candidatesTokenCount": 100},
+        }
+
+    # ---- Daily -------------------------------------------------------------
+
+    @app.post("/daily/v1/rooms")
+    async def daily_create_room(request: Request):
+        calls["daily.rooms"] += 1
+        body = await _json_body(request)
+        await daily.sleep()
+        name = body.get("name") or uuid.uuid4().hex[:20]
+        return {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "url": f"https://fake.daily.co/{name}",
+            "config": body.get("properties", {}),
+        }
+
+    @app.post("/daily/v1/rooms/{name}")
+    async def daily_update_room(name: str, request: Request):
+        calls["daily.room_updates"] += 1
+        body = await _json_body(request)
+        await daily.sleep()
+        return {"name": name, "url": f"https://fake.daily.co/{name}", "config": body.get("properties", {})}
+
+    @app.delete("/daily/v1/rooms/{name}")
+    async def daily_delete_room(name: str):
+        calls["daily.room_deletes"] += 1
+        await daily.sleep()
+        return {"deleted": True, "name": name}
+
+    @app.post("/daily/v1/meeting-tokens")
+    async def daily_create_token(request: Request):
+        calls["daily.tokens"] += 1
+        await _json_body(request)
+        await daily.sleep()
+        return {"token": uuid.uuid4().hex}
+
+    @app.get("/_stats")
+    async def stats():
+        return {"calls": dict(calls), "active_runs": len(runs)}
+
+    return app
+
+
+# ---- Recording --------------------------------------------------------------
+
+
+async def record(video_urls: list[str], user_level: int) -> None:
+    """Fetch transcripts and analyses from the real services into REPLAY_DIR."""
+    from app.services.video_analysis import prepare_transcript, run_llm_analysis
+    from app.services.youtube import extract_video_id
+
+    REPLAY_DIR.mkdir(parents=True, exist_ok=True)
+    for url in video_urls:
+        video_id = extract_video_id(url)
+        if not video_id:
+            print(f"skipping {url}: not a YouTube URL")
+            continue
+        # One Apify run: the prepared transcript keeps the raw data it was built from
+        prepared = await prepare_transcript(url, video_id, user_level)
+        transcript = prepared.transcript_data
+        video = await run_llm_analysis(url, video_id, user_level, prepared)
+        analysis = _without_ids(video.model_dump())
+        path = REPLAY_DIR / f"{video_id}.json"
+        path.write_text(
+            json.dumps({"transcript": transcript, "analysis": analysis}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"recorded {video_id}: {len(transcript.get('data', []))} segments, {len(video.vocab)} vocab -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the fake upstream server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--apify-latency", type=float, default=2.0, help="seconds per actor run")
+    serve.add_argument("--gemini-latency", type=float, default=3.0, help="seconds per generateContent call")
+    serve.add_argument("--daily-latency", type=float, default=0.2, help="seconds per Daily API call")
+    serve.add_argument("--jitter", type=float, default=0.25, help="+/- fraction of each mean latency")
+    serve.add_argument("--ssl-certfile", help="serve HTTPS with this certificate")
+    serve.add_argument("--ssl-keyfile", help="private key for --ssl-certfile")
+
+    rec = commands.add_parser("record", help="record replay fixtures from the real services")
+    rec.add_argument("video_urls", nargs="+")
+    rec.add_argument("--user-level", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        if os.getenv("FAKE_UPSTREAMS_URL"):
+            parser.error("unset FAKE_UPSTREAMS_URL to record from the real services")
+        asyncio.run(record(args.video_urls, args.user_level))
+        return
+
+    import uvicorn
+
+    app = create_app(
+        Latency(args.apify_latency, args.jitter),
+        Latency(args.gemini_latency, args.jitter),
+        Latency(args.daily_latency, args.jitter),
+    )
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+        ssl_certfile=args.ssl_certfile,
+        ssl_keyfile=args.ssl_keyfile,
+    )
+
+
+if __name__ == "__main__":
+    main()
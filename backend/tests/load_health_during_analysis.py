@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test: /health latency while video analyses are in flight.
+
+Apify and Gemini are replaced by async sleeps (both clients are async), so
+the script runs offline; transcript/analysis cache I/O still runs on the
+blocking executor. It samples /health
+latency with no load, then again while 20 analyses are running, and fails if
+p99 under load regresses past the allowed budget.
+
+run with: python tests/load_health_during_analysis.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+for key in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN"):
+    os.environ.setdefault(key, "offline")
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+settings.DATABASE_PATH = Path(tempfile.mkdtemp()) / "load-test.db"
+
+from app.db import get_connection, init_schema  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import gemini  # noqa: E402
+from app.services import youtube  # noqa: E402
+
+CONCURRENT_ANALYSES = 20
+APIFY_SECONDS = 2.0
+GEMINI_SECONDS = 3.0
+SAMPLE_INTERVAL = 0.02
+P99_BUDGET_MS = 50.0
+
+SAMPLE_VIDEO = {
+    "video_id": "offline",
+    "title": "Offline",
+    "tags": [],
+    "video_url": "https://www.youtube.com/watch?v=offline",
+    "duration": "1:00",
+    "summary": "",
+    "vocab": [],
+}
+
+
+async def _fake_scrape(video_url: str, target_language: str) -> dict:
+    await asyncio.sleep(APIFY_SECONDS)
+    return {"data": [{"start": "1.0", "dur": "1.0", "text": "こんにちは"}]}
+
+
+async def _fake_generate_content(**kwargs):
+    await asyncio.sleep(GEMINI_SECONDS)
+    return SimpleNamespace(parsed=SAMPLE_VIDEO)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _sample_health(client: httpx.AsyncClient, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        resp = await client.get("/health")
+        resp.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(SAMPLE_INTERVAL)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> float:
+    p99 = _percentile(latencies, 99)
+    print(
+        f"{label:<14} n={len(latencies):<4} "
+        f"p50={statistics.median(latencies):6.2f}ms "
+        f"p99={p99:6.2f}ms max={max(latencies):6.2f}ms"
+    )
+    return p99
+
+
+async def main() -> int:
+    conn = get_connection()
+    try:
+        init_schema(conn)
+    finally:
+        conn.close()
+
+    youtube._scrape_video_transcript = _fake_scrape
+    gemini._client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=_fake_generate_content))
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        baseline = await _sample_health(client, 1.0)
+
+        analyses = [
+            asyncio.create_task(
+                client.post(
+                    "/video_analysis",
+                    json={"video_url": f"https://www.youtube.com/watch?v=load{i}", "user_level": 3},
+                )
+            )
+            for i in range(CONCURRENT_ANALYSES)
+        ]
+        await asyncio.sleep(0.1)
+        loaded = await _sample_health(client, APIFY_SECONDS + GEMINI_SECONDS - 0.5)
+        responses = await asyncio.gather(*analyses)
+
+    print("=" * 60)
+    print(f"/health latency with {CONCURRENT_ANALYSES} analyses in flight")
+    print("=" * 60)
+    _report("idle", baseline)
+    loaded_p99 = _report("under load", loaded)
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    print(f"analyses completed: {len(responses) - len(failed)}/{len(responses)}")
+
+    if failed or loaded_p99 > P99_BUDGET_MS:
+        print(f"\n❌ FAILED (p99 budget {P99_BUDGET_MS}ms, failures {failed})")
+        return 1
+    print("\n✅ /health stayed responsive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
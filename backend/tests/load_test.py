@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for /video_analysis, /videos and /vocab-live-chat/start.
+
+By default the script runs everything offline: it starts the fake upstream
+server (tests/fake_upstreams.py) and a uvicorn backend pointed at it through
+FAKE_UPSTREAMS_URL, with a temporary database and bot spawning disabled.
+Pass --base-url to load an already running backend instead.
+
+Each endpoint is driven open-loop at its own target rate (requests are sent
+on schedule whether or not earlier ones have finished), and latency is
+measured from the scheduled send time so a stalled server is not hidden by
+coordinated omission. Per endpoint the script reports requests sent,
+errors, achieved throughput and p50/p95/p99/max latency.
+
+Scenarios:
+- video_analysis: POST /video_analysis for a new video id each request
+  (full transcript + LLM pipeline), or for ids from a small pool with --repeat
+- videos:         GET /videos, alternating with GET /videos/{id}
+- chat_start:     POST /vocab-live-chat/start with a short vocab list
+
+run with: python tests/load_test.py [--duration 30] [--rps video_analysis=2 videos=50 chat_start=5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+backend_dir = Path(__file__).resolve().parent.parent
+SAMPLE_VIDEO = json.loads((backend_dir / "tests" / "sample-video-data.json").read_text(encoding="utf-8"))
+
+DEFAULT_RPS = {"video_analysis": 2.0, "videos": 50.0, "chat_start": 5.0}
+
+
+@dataclass
+class EndpointStats:
+    name: str
+    target_rps: float
+    latencies: list[float] = field(default_factory=list)  # seconds, successful requests
+    errors: dict[str, int] = field(default_factory=dict)
+    sent: int = 0
+    elapsed: float = 0.0  # seconds from the first scheduled send to the last response
+
+    def record_error(self, reason: str) -> None:
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+class Scenarios:
+    """Request builders; each returns (method, path, json body)."""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.counter = 0
+        self.run_id = f"{random.randrange(16**4):04x}"
+
+    def video_analysis(self) -> tuple[str, str, dict | None]:
+        self.counter += 1
+        n = random.randrange(self.repeat) if self.repeat else self.counter
+        url = f"https://www.youtube.com/watch?v=lt{self.run_id}{n:06d}"
+        return "POST", "/video_analysis", {"video_url": url, "user_level": 5}
+
+    def videos(self) -> tuple[str, str, dict | None]:
+        self.counter += 1
+        if self.counter % 2:
+            return "GET", "/videos", None
+        return "GET", f"/videos/{SAMPLE_VIDEO['video_id']}", None
+
+    def chat_start(self) -> tuple[str, str, dict | None]:
+        vocab = [v["japanese_vocab"] for v in SAMPLE_VIDEO["vocab"]]
+        return "POST", "/vocab-live-chat/start", {"vocab": vocab, "summary": SAMPLE_VIDEO["summary"]}
+
+
+async def drive(
+    client: httpx.AsyncClient, stats: EndpointStats, build, duration: float, start: float
+) -> None:
+    """Send requests at `stats.target_rps` (Poisson arrivals) for `duration` seconds."""
+    in_flight: set[asyncio.Task] = set()
+
+    async def send(scheduled: float) -> None:
+        method, path, body = build()
+        try:
+            resp = await client.request(method, path, json=body)
+            if resp.status_code >= 400:
+                stats.record_error(str(resp.status_code))
+            else:
+                stats.latencies.append(time.perf_counter() - scheduled)
+        except httpx.HTTPError as e:
+            stats.record_error(type(e).__name__)
+
+    scheduled = start
+    while True:
+        scheduled += random.expovariate(stats.target_rps)
+        if scheduled - start >= duration:
+            break
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        stats.sent += 1
+        task = asyncio.create_task(send(scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+
+
+async def run(base_url: str, rps: dict[str, float], duration: float, repeat: int, timeout: float) -> list[EndpointStats]:
+    scenarios = Scenarios(repeat)
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        # /videos/{id} needs a row to read
+        (await client.post("/videos", json=SAMPLE_VIDEO)).raise_for_status()
+
+        all_stats = [EndpointStats(name, target) for name, target in rps.items() if target > 0]
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            drive(client, stats, getattr(scenarios, stats.name), duration, start) for stats in all_stats
+        ))
+        elapsed = time.perf_counter() - start
+    for stats in all_stats:
+        stats.elapsed = elapsed
+    return all_stats
+
+
+def report(all_stats: list[EndpointStats], duration: float) -> None:
+    print("=" * 104)
+    print(
+        f"{'endpoint':<16}{'target rps':>11}{'sent':>7}{'ok':>7}{'errors':>8}{'ok/s':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'mean ms':>10}"
+    )
+    print("-" * 104)
+    for stats in all_stats:
+        ms = [latency * 1000 for latency in stats.latencies]
+        errors = sum(stats.errors.values())
+        print(
+            f"{stats.name:<16}{stats.target_rps:>11.1f}{stats.sent:>7}{len(ms):>7}{errors:>8}"
+            f"{len(ms) / stats.elapsed:>8.1f}{percentile(ms, 50):>10.1f}{percentile(ms, 95):>10.1f}"
+            f"{percentile(ms, 99):>10.1f}{max(ms, default=float('nan')):>10.1f}"
+            f"{statistics.fmean(ms) if ms else float('nan'):>10.1f}"
+        )
+        if stats.errors:
+            print(f"{'':<16}errors: {', '.join(f'{k} x{v}' for k, v in sorted(stats.errors.items()))}")
+    print("=" * 104)
+    print(f"load phase {duration:.0f}s; latency measured from each request's scheduled send time")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+@contextmanager
+def offline_stack(args):
+    """Start the fake upstreams and a backend pointed at them; yield the backend URL."""
+    fake_port, backend_port = free_port(), free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    backend_url = f"http://127.0.0.1:{backend_port}"
+    env = {
+        key: value for key, value in os.environ.items()
+        if key not in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN")
+    }
+    env.update({
+        "FAKE_UPSTREAMS_URL": fake_url,
+        "BOT_SPAWN_ENABLED": "false",
+        "DATABASE_PATH": str(Path(tempfile.mkdtemp()) / "load-test.db"),
+    })
+    log = open(Path(tempfile.gettempdir()) / "load-test-backend.log", "w")
+    processes = []
+    try:
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, str(backend_dir / "tests" / "fake_upstreams.py"), "serve",
+                "--port", str(fake_port),
+                "--apify-latency", str(args.apify_latency),
+                "--gemini-latency", str(args.gemini_latency),
+                "--daily-latency", str(args.daily_latency),
+            ],
+            env=env,
+        ))
+        wait_until_up(f"{fake_url}/_stats", processes[-1])
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(backend_port), "--log-level", "warning",
+            ],
+            cwd=str(backend_dir), env=env, stdout=log, stderr=subprocess.STDOUT,
+        ))
+        wait_until_up(f"{backend_url}/health", processes[-1])
+        print(f"backend {backend_url} (log: {log.name}), fake upstreams {fake_url}")
+        yield backend_url
+        print(f"upstream calls: {httpx.get(f'{fake_url}/_stats').json()['calls']}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+        log.close()
+
+
+def parse_rps(values: list[str]) -> dict[str, float]:
+    rps = dict(DEFAULT_RPS)
+    for value in values:
+        name, _, rate = value.partition("=")
+        if name not in DEFAULT_RPS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(DEFAULT_RPS)})")
+        rps[name] = float(rate)
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="load a running backend instead of starting an offline one")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--rps", nargs="*", default=[], metavar="ENDPOINT=RATE",
+                        help=f"target rates (default {' '.join(f'{k}={v:g}' for k, v in DEFAULT_RPS.items())}; 0 skips)")
+    parser.add_argument("--repeat", type=int, default=0,
+                        help="analyze ids from a pool of this size instead of always-new videos")
+    parser.add_argument("--timeout", type=float, default=300, help="per-request timeout (s)")
+    parser.add_argument("--apify-latency", type=float, default=2.0, help="fake Apify run time (s)")
+    parser.add_argument("--gemini-latency", type=float, default=3.0, help="fake Gemini latency (s)")
+    parser.add_argument("--daily-latency", type=float, default=0.2, help="fake Daily latency (s)")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    rps = parse_rps(args.rps)
+
+    def load(base_url: str) -> list[EndpointStats]:
+        return asyncio.run(run(base_url, rps, args.duration, args.repeat, args.timeout))
+
+    if args.base_url:
+        all_stats = load(args.base_url)
+    else:
+        with offline_stack(args) as base_url:
+            all_stats = load(base_url)
+    report(all_stats, args.duration)
+
+    if args.json:
+        args.json.write_text(json.dumps([
+            {
+                "endpoint": stats.name,
+                "target_rps": stats.target_rps,
+                "sent": stats.sent,
+                "ok": len(stats.latencies),
+                "errors": stats.errors,
+                "throughput_rps": len(stats.latencies) / stats.elapsed,
+                **{f"p{p}_ms": percentile(stats.latencies, p) * 1000 for p in (50, 95, 99)},
+            }
+            for stats in all_stats
+        ], indent=2))
+
+
+if __name__ == "__main__":
+    main()
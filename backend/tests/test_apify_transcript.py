@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Test script for Apify YouTube transcript scraper."""
 
+import asyncio
+import os
 import sys
 import json
 from pathlib import Path
 
+import pytest
+
 # Add backend to path
 backend_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(backend_dir))
@@ -12,8 +16,8 @@ sys.path.insert(0, str(backend_dir))
 from app.services.youtube import get_video_transcript, format_transcript
 
 
-def test_apify_transcript():
-    """Test fetching and formatting transcript from Apify."""
+async def _main():
+    """Fetch and format a transcript from Apify."""
     
     # Test video URL
     video_url = "https://www.youtube.com/watch?v=IELMSD2kdmk"
@@ -24,7 +28,7 @@ def test_apify_transcript():
     try:
         # Fetch transcript in Japanese (default)
         print("\n🇯🇵 Fetching Japanese transcript...")
-        transcript_data_ja = get_video_transcript(video_url, target_language="ja")
+        transcript_data_ja = await get_video_transcript(video_url, target_language="ja")
         
         print("\n📦 Raw Transcript Data (Japanese):")
         # Only show first 3 segments to keep output manageable
@@ -49,7 +53,7 @@ def test_apify_transcript():
         
         # Test English transcript too
         print("\n🇺🇸 Fetching English transcript...")
-        transcript_data_en = get_video_transcript(video_url, target_language="en")
+        transcript_data_en = await get_video_transcript(video_url, target_language="en")
         formatted_en = format_transcript(transcript_data_en)
         
         print("\n📝 Formatted Transcript (English) - First 10 lines:")
@@ -70,5 +74,13 @@ def test_apify_transcript():
         sys.exit(1)
 
 
+@pytest.mark.skipif(
+    os.getenv("APIFY_API_TOKEN", "offline") == "offline", reason="calls the live Apify API"
+)
+def test_apify_transcript():
+    """Test fetching and formatting transcript from Apify."""
+    asyncio.run(_main())
+
+
 if __name__ == "__main__":
     test_apify_transcript()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Offline checks for bot session tracking and admission control
+(app/services/bot_sessions.py, app/services/bot_pool.py).
+
+Covers the session limit on POST /vocab-live-chat/start (429 + Retry-After,
+without taking a room), GET /vocab-live-chat/sessions, and reaping of cold
+bot processes. Cold bots are stand-in processes that exit on their own, and
+rooms come from a stand-in for the Daily calls (the room pool is disabled;
+BOT_MAX_SESSIONS=2, see conftest.py).
+
+run with: python -m pytest tests/test_bot_sessions.py
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+
+import httpx
+
+from app.services import bot_pool as bot_pool_module
+from app.services import room_pool as room_pool_module
+from app.services.bot_sessions import bot_sessions
+
+BOT_SECONDS = 0.5
+rooms_created = 0
+
+
+async def fake_create_room_with_token(duration_seconds=None):
+    global rooms_created
+    rooms_created += 1
+    name = f"room-{rooms_created}"
+    return {"name": name, "url": f"https://fake.daily.co/{name}", "config": {}}, "token"
+
+
+async def fake_spawn_bot(session):
+    """A cold 'bot' that runs briefly and exits, like a session ending."""
+    return await asyncio.create_subprocess_exec(sys.executable, "-c", f"import time; time.sleep({BOT_SECONDS})")
+
+
+async def test_admission_and_reaping(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(room_pool_module, "create_room_with_token", fake_create_room_with_token)
+    monkeypatch.setattr(bot_pool_module, "_spawn_bot", fake_spawn_bot)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with contextlib.redirect_stdout(io.StringIO()):  # the endpoint prints its payload
+                first = await client.post("/vocab-live-chat/start", json={"vocab": ["歌"]})
+                second = await client.post("/vocab-live-chat/start", json={"vocab": ["歌"]})
+                third = await client.post("/vocab-live-chat/start", json={"vocab": ["歌"]})
+            # Sessions over BOT_MAX_SESSIONS get 429 + Retry-After before a room is taken
+            assert first.status_code == second.status_code == 200, (first.text, second.text)
+            assert third.status_code == 429, third.text
+            assert int(third.headers["Retry-After"]) >= 1
+            assert rooms_created == 2, "a refused session must not use up a room"
+
+            # Running bots are listed with their PIDs, without tokens
+            listing = (await client.get("/vocab-live-chat/sessions")).json()
+            assert listing["running"] == listing["cold"] == 2 and listing["rejected"] == 1
+            pids = [entry["pid"] for entry in listing["sessions"]]
+            assert all(pids) and all("token" not in entry for entry in listing["sessions"])
+
+            # Exited cold bots are reaped (no zombies) and leave the registry
+            await asyncio.sleep(BOT_SECONDS + 0.5)
+            listing = (await client.get("/vocab-live-chat/sessions")).json()
+            assert listing["running"] == 0 and listing["finished"] == 2, listing
+            assert not any(os.path.exists(f"/proc/{pid}") for pid in pids), "exited bots left zombies"
+
+            # Capacity frees up once bots exit
+            with contextlib.redirect_stdout(io.StringIO()):
+                again = await client.post("/vocab-live-chat/start", json={"vocab": ["歌"]})
+            assert again.status_code == 200, again.text
+    assert bot_sessions.snapshot()["admitted"] == 3
+
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the bot's pre-synthesized fixed lines
+(app/services/canned_audio.py, CannedSpeechPlayer in app/services/gemini_live_chat.py).
+
+Speech synthesis is replaced by a fake that returns 16 kHz PCM, so the cache
+has to resample it to the bot's output rate. Covers the on-disk layout, that
+cached phrases are not synthesized again, and that once the closing line
+plays the LLM's audio no longer reaches the output.
+
+run with: python -m pytest tests/test_canned_audio.py
+"""
+
+from pathlib import Path
+
+from pipecat.frames.frames import TextFrame, TTSAudioRawFrame
+from pipecat.tests.utils import run_test
+
+import app.services.canned_audio as canned_audio_module
+from app.services.canned_audio import CANNED_UTTERANCES, CannedAudioCache
+from app.services.gemini_live_chat import CannedSpeechPlayer
+
+synthesized: list[str] = []
+
+
+async def fake_synthesize_speech(text: str, voice: str) -> tuple[bytes, int]:
+    synthesized.append(text)
+    return b"\x10\x00" * 16000, 16000  # one second at 16 kHz
+
+
+async def test_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(canned_audio_module, "synthesize_speech", fake_synthesize_speech)
+    cache = CannedAudioCache(tmp_path, "Achernar", 24000)
+    assert cache.get("intro") is None and cache.frames("closing") is None
+
+    # Missing phrases are synthesized, resampled to the output rate and stored per voice
+    await cache.ensure()
+    assert synthesized == list(CANNED_UTTERANCES.values()), synthesized
+    path = cache.path_for("closing")
+    assert path.parent == tmp_path / "Achernar" and path.name.endswith("-24000.pcm"), path
+    assert abs(len(path.read_bytes()) - 2 * 24000) <= 2 * 240, len(path.read_bytes())  # resampled to 24 kHz
+
+    # Phrases already on disk are not synthesized again
+    await CannedAudioCache(tmp_path, "Achernar", 24000).ensure()
+    assert len(synthesized) == len(CANNED_UTTERANCES)
+
+    # Cached audio is replayed as half-second output frames
+    frames = cache.frames("closing")
+    assert all(isinstance(f, TTSAudioRawFrame) and f.sample_rate == 24000 for f in frames)
+    assert b"".join(f.audio for f in frames) == path.read_bytes() and len(frames) == 2, len(frames)
+
+
+async def test_player_drops_llm_audio_after_closing():
+    player = CannedSpeechPlayer()
+    llm_audio = TTSAudioRawFrame(audio=b"\x00\x00" * 240, sample_rate=24000, num_channels=1)
+    await run_test(player, frames_to_send=[llm_audio, TextFrame("hi")], expected_down_frames=[TTSAudioRawFrame, TextFrame])
+    player.finished = True
+    await run_test(player, frames_to_send=[llm_audio, TextFrame("hi")], expected_down_frames=[TextFrame])
+
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the API process.
+
+Imports `app.main` in fresh interpreters under `python -X importtime` and
+fails if:
+
+- the best cumulative import time of app.main exceeds the budget
+  (IMPORT_BUDGET_MS, default 1000 ms), or
+- importing app.main pulls in a heavy SDK that should only load lazily
+  (google.genai, apify_client, tiktoken, langchain_text_splitters).
+
+On failure the slowest imports are listed to show what regressed. API keys
+are unset for the run: importing the app must not need them. IMPORT_RUNS
+(default 5) sets how many interpreters are timed.
+
+run with: python -m pytest tests/test_import_time.py
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+RUNS = int(os.getenv("IMPORT_RUNS", "5"))
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+LAZY_MODULES = ("google.genai", "apify_client", "tiktoken", "langchain_text_splitters")
+
+# Print the modules app.main added, so imports made by site/sitecustomize don't count
+PROBE = (
+    "import json, sys; before = set(sys.modules); import app.main; "
+    "print(json.dumps(sorted(set(sys.modules) - before)))"
+)
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_once() -> tuple[int, list[tuple[int, str]], list[str]]:
+    """Return (app.main cumulative us, [(cumulative us, module)], modules added by app.main)."""
+    env = {
+        key: value for key, value in os.environ.items()
+        if key not in ("GOOGLE_API_KEY", "DAILY_API_KEY", "APIFY_API_TOKEN")
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=str(backend_dir), env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, f"importing app.main failed:\n{proc.stderr[-2000:]}"
+
+    total_us = 0
+    modules = []
+    for match in _LINE.finditer(proc.stderr):
+        cumulative, name = int(match.group(2)), match.group(4)
+        modules.append((cumulative, name))
+        if name == "app.main":
+            total_us = cumulative
+    return total_us, modules, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def fastest_import() -> tuple[int, list[tuple[int, str]], list[str]]:
+    return min((import_once() for _ in range(RUNS)), key=lambda run: run[0])
+
+
+def test_sdks_load_lazily(fastest_import):
+    _, _, loaded = fastest_import
+    eager = sorted({
+        name for name in loaded for lazy in LAZY_MODULES if name == lazy or name.startswith(lazy + ".")
+    })
+    assert not eager, f"heavy modules imported eagerly: {', '.join(m for m in eager if '.' not in m or m in LAZY_MODULES)}"
+
+
+def test_import_time_within_budget(fastest_import):
+    best_us, modules, _ = fastest_import
+    slowest = "\n".join(
+        f"  {cumulative / 1000:8.1f}  {name}" for cumulative, name in sorted(modules, reverse=True)[:15]
+    )
+    assert best_us / 1000 <= BUDGET_MS, (
+        f"import time {best_us / 1000:.0f} ms exceeds the {BUDGET_MS:.0f} ms budget; "
+        f"slowest imports (cumulative ms):\n{slowest}"
+    )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Offline checks for learner progress persistence
+(app/services/progress.py, progress tables and mastery query in app/db).
+
+Records chat sessions through the write-behind writer against a temporary
+database. Covers that recording never waits on SQLite (even while another
+connection holds the write lock), that a burst of events is committed in a
+handful of transactions, that a failing batch does not stop the writer, and
+the per-learner mastery query and its index.
+
+run with: python -m pytest tests/test_progress.py
+"""
+
+import time
+
+import pytest
+
+from app.api.endpoints.progress import get_mastery
+from app.db import get_connection, init_schema
+from app.db.repositories import ensure_vocab
+from app.services.progress import ProgressWriter
+
+WORDS = ["歌", "書く", "旅行", "電車"]
+
+
+@pytest.fixture(scope="module")
+def ids() -> dict[str, str]:
+    conn = get_connection()
+    init_schema(conn)
+    ids = {word: ensure_vocab(conn, word) for word in WORDS}
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def test_write_behind(ids: dict[str, str]):
+    writer = ProgressWriter(flush_interval_ms=100, batch_max_events=500, queue_max_events=10000)
+
+    # Another process holds the write lock: recording must still return at once
+    blocker = get_connection()
+    blocker.execute("BEGIN IMMEDIATE")
+    start = time.perf_counter()
+    writer.session_started("s1", "alice", ["歌", "書く", "旅行", "ない言葉"])
+    writer.word_used("s1", "歌")
+    writer.word_used("s1", "歌")  # a repeated report is counted once
+    writer.word_used("s1", "書く")
+    writer.session_ended("s1", 2, False)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    assert elapsed_ms < 20, elapsed_ms
+    time.sleep(0.3)
+    assert writer.stats()["written"] == 0, writer.stats()
+    blocker.rollback()
+    blocker.close()
+    assert writer.flush(), writer.stats()
+
+    # A burst of sessions is committed in a few transactions, not one per event
+    transactions = writer.stats()["transactions"]
+    for i in range(200):
+        writer.session_started(f"b{i}", "bob", WORDS)
+        writer.word_used(f"b{i}", WORDS[i % len(WORDS)])
+        if i % 2:
+            writer.word_used(f"b{i}", "電車")
+        writer.session_ended(f"b{i}", 1 + i % 2, False)
+    assert writer.flush(), writer.stats()
+    burst_transactions = writer.stats()["transactions"] - transactions
+    assert burst_transactions <= 3, burst_transactions
+    writer.close()
+
+    # Sessions and per-vocab attempts are stored; words without a vocab row are skipped
+    conn = get_connection()
+    row = conn.execute("SELECT target_count, words_used, completed, ended_at FROM chat_sessions WHERE id = 's1'").fetchone()
+    assert row[:3] == (4, 2, 0) and row[3], row
+    attempts = dict(conn.execute("SELECT vocab_id, used FROM vocab_attempts WHERE session_id = 's1'").fetchall())
+    assert attempts == {ids["歌"]: 1, ids["書く"]: 1, ids["旅行"]: 0}, attempts  # unknown word not tracked
+    conn.close()
+
+
+def test_failed_batch_does_not_stop_the_writer():
+    writer = ProgressWriter(flush_interval_ms=10, batch_max_events=1, queue_max_events=100)
+
+    # A batch that fails with a non-SQLite error is counted and the thread keeps going
+    writer._put(("used", "f1"))  # malformed event: mark_vocab_used raises TypeError
+    writer.session_started("f1", "carol", ["歌"])
+    assert writer.flush(), writer.stats()
+    assert writer.stats()["failed"] == 1 and writer.stats()["written"] == 1, writer.stats()
+
+    # A stopped writer thread is started again by the next event
+    writer.close()
+    writer.session_ended("f1", 0, False)
+    assert writer.flush(), writer.stats()
+    assert writer.stats()["written"] == 2, writer.stats()
+    writer.close()
+
+
+def test_mastery(ids: dict[str, str]):
+    """GET /progress/{learner_id}/mastery over the sessions test_write_behind recorded."""
+    mastery = get_mastery("bob")
+    by_word = {row["japanese_vocab"]: row for row in mastery}
+    assert by_word["電車"]["attempts"] == 200 and by_word["電車"]["times_used"] == 100, by_word["電車"]
+    assert by_word["歌"]["mastery"] == 0.25, by_word["歌"]
+    assert [row["japanese_vocab"] for row in mastery][-1] == "電車"  # least mastered first
+    assert get_mastery("bob", vocab_id=ids["旅行"])[0]["attempts"] == 200
+    assert len(get_mastery("bob", limit=2)) == 2 and get_mastery("nobody") == []
+
+    # The aggregation reads only the covering index
+    conn = get_connection()
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT vocab_id, COUNT(*), SUM(used), MAX(attempted_at), MAX(used_at) "
+        "FROM vocab_attempts WHERE learner_id = ? GROUP BY vocab_id", ("bob",)
+    ))
+    conn.close()
+    assert "COVERING INDEX idx_vocab_attempts_learner" in plan, plan
+
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the upstream resilience layer (app/core/resilience.py).
+
+Covers retries with backoff, per-attempt timeouts, hedged requests and the
+circuit breaker's closed -> open -> half_open -> closed cycle, using fake
+upstream coroutines instead of real services.
+
+run with: python -m pytest tests/test_resilience.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.exceptions import DailyAPIError, UpstreamTimeoutError, UpstreamUnavailableError
+from app.core.resilience import Upstream, UpstreamPolicy
+
+
+def make_upstream(**overrides) -> Upstream:
+    policy = dict(timeout=0.5, retries=2, backoff_base=0.01, backoff_max=0.02, failure_threshold=3, reset_timeout=0.2)
+    policy.update(overrides)
+    return Upstream("fake", UpstreamPolicy(**policy))
+
+
+async def test_retries_transient_errors():
+    upstream = make_upstream()
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            raise DailyAPIError("boom", 503)
+        return "ok"
+
+    assert await upstream.call(flaky, stage="flaky", idempotent=True) == "ok"
+    stats = upstream.stats()
+    assert len(attempts) == 3 and stats["retries"] == 2 and stats["breaker"]["state"] == "closed", stats
+
+
+async def test_no_retry_for_client_errors_or_non_idempotent():
+    upstream = make_upstream()
+    calls = 0
+
+    async def bad_request():
+        nonlocal calls
+        calls += 1
+        raise DailyAPIError("bad input", 400)
+
+    with pytest.raises(DailyAPIError):
+        await upstream.call(bad_request, stage="bad", idempotent=True)
+    assert calls == 1 and upstream.stats()["breaker"]["consecutive_failures"] == 0
+
+    calls = 0
+
+    async def unavailable():
+        nonlocal calls
+        calls += 1
+        raise DailyAPIError("down", 502)
+
+    with pytest.raises(DailyAPIError):
+        await upstream.call(unavailable, stage="post", idempotent=False)
+    assert calls == 1
+
+
+async def test_timeout():
+    upstream = make_upstream(timeout=0.05, retries=0)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(UpstreamTimeoutError) as error:
+        await upstream.call(hang, stage="hang", idempotent=True)
+    assert error.value.status_code == 504
+    assert upstream.stats()["timeouts"] == 1
+
+
+async def test_hedging():
+    upstream = make_upstream(hedge_after=0.05, retries=0)
+    calls = 0
+
+    async def slow_then_fast():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1.0 if calls == 1 else 0.01)
+        return calls
+
+    start = time.perf_counter()
+    result = await upstream.call(slow_then_fast, stage="hedged", idempotent=True)
+    elapsed = time.perf_counter() - start
+    stats = upstream.stats()
+    assert result == 2 and elapsed < 0.3 and stats["hedges"] == 1 and stats["hedge_wins"] == 1, (elapsed, stats)
+
+
+async def test_circuit_breaker():
+    upstream = make_upstream(retries=0)
+    healthy = False
+
+    async def service():
+        if not healthy:
+            raise ConnectionError("refused")
+        return "up"
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await upstream.call(service, stage="down", idempotent=True)
+    assert upstream.stats()["breaker"]["state"] == "open"
+
+    start = time.perf_counter()
+    with pytest.raises(UpstreamUnavailableError) as error:
+        await upstream.call(service, stage="down", idempotent=True)
+    assert error.value.status_code == 503 and "Retry-After" in error.value.headers
+    assert time.perf_counter() - start < 0.01 and upstream.stats()["rejected"] == 1
+
+    await asyncio.sleep(0.25)  # past reset_timeout: one half-open probe
+    healthy = True
+    assert await upstream.call(service, stage="probe", idempotent=True) == "up"
+    assert upstream.stats()["breaker"]["state"] == "closed"
+
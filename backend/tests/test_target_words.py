@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Offline checks for local target-word detection
+(app/services/target_words.py, TargetWordSpotter in app/services/gemini_live_chat.py).
+
+Covers matching by surface form, kana reading (hiragana or katakana) and
+conjugation stem, that a word heard stays remaining until it is marked, and
+that the spotter only passes on the user's final transcriptions and keeps
+transcription frames out of the rest of the pipeline.
+
+run with: python -m pytest tests/test_target_words.py
+"""
+
+from pipecat.frames.frames import InterimTranscriptionFrame, TextFrame, TranscriptionFrame
+from pipecat.tests.utils import run_test
+
+from app.services.gemini_live_chat import TargetWordSpotter
+from app.services.target_words import TargetWordDetector
+
+
+def assert_heard(detector: TargetWordDetector, cases: list[tuple[str, list[str]]]):
+    for text, expected in cases:
+        found = detector.feed(text)
+        assert found == expected, (text, found, expected)
+
+
+def test_surface_reading_and_stem():
+    detector = TargetWordDetector(
+        ["食べる", "お茶", "勉強する", "高い", "テレビ", "あい", "りんご"],
+        {"お茶": "おちゃ"},  # the others' readings come from the JLPT dictionary or aren't needed
+    )
+    cases = [
+        ("昨日たくさん食べました", ["食べる"]),  # conjugated, written form
+        ("オチャを飲みたい", ["お茶"]),  # katakana reading from the client
+        ("毎日勉強しています", ["勉強する"]),  # する-verb
+        ("高かったです", ["高い"]),  # i-adjective
+        ("ＴＶじゃなくてテレビ", ["テレビ"]),  # full-width input is normalized
+        ("しあい", ["あい"]),
+        ("りん", []),  # nouns don't match by stem
+        ("りんごとテレビ", ["りんご"]),  # each word is reported once
+    ]
+    assert_heard(detector, cases)
+    # Hearing a word is only a hint: it stays remaining until the LLM confirms it
+    assert detector.remaining_words == detector.words, detector.remaining_words
+
+
+def test_one_kanji_stem_needs_an_ending():
+    detector = TargetWordDetector(["見る", "来る", "高い", "行く", "書く"])
+    cases = [
+        ("皆さんの意見を聞きたい", []),  # one-kanji stems inside other words
+        ("来年は高校に入ります", []),
+        ("銀行に", []),
+        ("映画を見ました", ["見る"]),
+        ("友達が来て", ["来る"]),
+        ("高くない", ["高い"]),
+        ("昨日行った", ["行く"]),
+        ("書いて", ["書く"]),
+    ]
+    assert_heard(detector, cases)
+
+
+def test_kana_readings_and_stems():
+    detector = TargetWordDetector(["行く", "来る", "高い"])  # readings いく / くる / たかい from the dictionary
+    cases = [
+        ("これはいくらですか", []),  # kana readings and stems inside other words
+        ("くるまを買いました", []),
+        ("たかしさんに会った", []),
+        ("学校にいきます", ["行く"]),  # a kana stem followed by a whole ending
+        ("たかかった", ["高い"]),
+    ]
+    assert_heard(detector, cases)
+
+
+def test_tool_path_uses_the_same_index():
+    detector = TargetWordDetector(["歌", "書く", "りんご"])
+    assert detector.resolve("歌") == "歌" and detector.resolve("犬") is None
+    assert detector.resolve("リンゴ") == "りんご"
+    detector.feed("書きました")
+    assert detector.mark("書く") and not detector.mark("書く") and not detector.mark("犬")
+    assert detector.remaining_words == ["歌", "りんご"]
+
+
+async def test_spotter_hears_final_user_transcriptions():
+    detector = TargetWordDetector(["歌", "書く"])
+    heard: list[str] = []
+
+    async def on_heard(word: str) -> None:
+        heard.append(word)
+
+    spotter = TargetWordSpotter(detector, on_heard)
+    spotter.user_id = "user"
+    frames = [
+        TranscriptionFrame("歌が好き", "bot", "t0"),  # someone else (the bot's own speech)
+        InterimTranscriptionFrame("手紙を書き", "user", "t1"),  # not final yet
+        TextFrame("passes through"),
+        TranscriptionFrame("手紙を書きました", "user", "t2"),
+    ]
+    await run_test(spotter, frames_to_send=frames, expected_down_frames=[TextFrame])
+    assert heard == ["書く"], heard
+    assert detector.remaining_words == ["歌", "書く"]  # a hint, not a confirmation
+
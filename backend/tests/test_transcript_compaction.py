@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Offline checks for transcript compaction (app/services/transcript_compaction.py).
+
+Covers that the token budget always holds (down to keeping part of the first
+window), that the reported token count is that of the returned text, and that
+only real repeats are dropped as duplicates.
+
+run with: python -m pytest tests/test_transcript_compaction.py
+"""
+
+import json
+from pathlib import Path
+
+from app.services.chunker import count_tokens
+from app.services.transcript_compaction import compact_transcript
+
+SAMPLE = json.loads((Path(__file__).parent / "sample_apify_output.json").read_text(encoding="utf-8"))[0]
+
+
+def transcript(*texts: str) -> dict:
+    return {"data": [{"start": 10 * i, "dur": 2, "text": text} for i, text in enumerate(texts)]}
+
+
+def test_budget_always_holds():
+    long_transcript = transcript(*(f"これは{i}番目の文で、駅の近くの店について話します" for i in range(500)))
+    for data in (SAMPLE, long_transcript):
+        unlimited = compact_transcript(data, token_budget=0)
+        for budget in (3, 10, 50, unlimited.stats.tokens_after // 2):
+            compacted = compact_transcript(data, token_budget=budget)
+            assert compacted.text, budget
+            assert compacted.stats.tokens_after == count_tokens(compacted.text) <= budget, (budget, compacted.stats)
+            # the first window is kept, cut short if need be
+            assert unlimited.text.splitlines()[0].startswith(compacted.text.splitlines()[0]), compacted.text[:40]
+
+
+def test_similar_lines_are_kept():
+    compacted = compact_transcript(
+        transcript("今日は暑いです", "今日は寒いです", "りんごを3個ください", "りんごを5個ください"),
+        token_budget=0,
+    )
+    for text in ("寒い", "5個"):
+        assert text in compacted.text, compacted.text
+    assert compacted.stats.dropped_duplicates == 0
+
+
+def test_repeats_are_dropped():
+    compacted = compact_transcript(
+        transcript("今日は暑いです", "今日は暑いです。", "[音楽]", "今日は、暑いです！", "暑い"),
+        token_budget=0,
+    )
+    assert compacted.stats.dropped_duplicates == 3 and compacted.stats.dropped_filler == 1, compacted.stats
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Offline checks for per-turn voice latency instrumentation
+(app/services/turn_latency.py, TurnLatencyProbe in app/services/gemini_live_chat.py).
+
+Runs the three probes from run_bot in a pipecat pipeline and feeds them the
+frames a turn produces, with known gaps between them: VAD stop, the turn
+decision, the LLM's first audio chunk and the bot starting to speak. Then
+checks the per-turn records and session histograms written to the log and
+the summary GET /metrics builds from it, including that it only parses new
+lines and follows the log across rotation.
+
+run with: python -m pytest tests/test_turn_latency.py
+"""
+
+import json
+from pathlib import Path
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    TTSAudioRawFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.tests.utils import SleepFrame, run_test
+
+from app.core.config import settings
+from app.services.gemini_live_chat import TurnLatencyProbe
+from app.services.turn_latency import STAGES, TurnLatencySink, TurnLatencyTracker, turn_latency_sink
+
+LOG_PATH = Path(settings.TURN_LATENCY_LOG_PATH)  # a temporary file (see conftest.py)
+
+
+def audio() -> TTSAudioRawFrame:
+    return TTSAudioRawFrame(audio=b"\0\0" * 160, sample_rate=16000, num_channels=1)
+
+
+def probes(tracker: TurnLatencyTracker) -> Pipeline:
+    """The probes as run_bot places them (after user_aggregator, llm and transport.output())."""
+    return Pipeline([
+        TurnLatencyProbe(tracker, {
+            VADUserStoppedSpeakingFrame: "vad_stop",
+            UserStartedSpeakingFrame: "user_started",
+            UserStoppedSpeakingFrame: "turn_end",
+        }),
+        TurnLatencyProbe(tracker, {TTSAudioRawFrame: "first_audio"}),
+        TurnLatencyProbe(tracker, {BotStartedSpeakingFrame: "playback"}),
+    ])
+
+
+def turn(decision_s: float, first_audio_s: float, playback_s: float) -> list:
+    return [
+        UserStartedSpeakingFrame(),
+        VADUserStoppedSpeakingFrame(),
+        SleepFrame(decision_s),
+        UserStoppedSpeakingFrame(),
+        SleepFrame(first_audio_s),
+        audio(),
+        audio(),  # later chunks of the same reply don't move first_audio
+        SleepFrame(playback_s),
+        BotStartedSpeakingFrame(),
+        SleepFrame(0.05),
+    ]
+
+
+async def test_turn_records():
+    tracker = TurnLatencyTracker("room-a")
+    frames = [
+        BotStartedSpeakingFrame(),  # the greeting: no user turn, not recorded
+        *turn(0.10, 0.20, 0.05),
+        # the user pauses mid-sentence and goes on: the clock restarts at the last VAD stop
+        UserStartedSpeakingFrame(),
+        VADUserStoppedSpeakingFrame(),
+        SleepFrame(0.30),
+        VADUserStoppedSpeakingFrame(),
+        SleepFrame(0.10),
+        UserStoppedSpeakingFrame(),
+        SleepFrame(0.20),
+        audio(),
+        SleepFrame(0.05),
+        BotStartedSpeakingFrame(),
+        SleepFrame(0.05),
+        # the user barges in before the reply plays: abandoned, not recorded
+        UserStartedSpeakingFrame(),
+        VADUserStoppedSpeakingFrame(),
+        UserStoppedSpeakingFrame(),
+        UserStartedSpeakingFrame(),
+        SleepFrame(0.05),
+    ]
+    await run_test(probes(tracker), frames_to_send=frames)
+    tracker.close()
+    assert turn_latency_sink.flush(), "writer thread did not drain its queue"
+
+    records = [json.loads(line) for line in LOG_PATH.read_text().splitlines()]
+    turns = [record for record in records if record["type"] == "turn"]
+    assert tracker.turns == len(turns) == 2 and tracker.abandoned == 1, (tracker.turns, tracker.abandoned)
+    for record in turns:
+        stages = record["stages_ms"]
+        assert 90 <= stages["turn_decision"] < 180, stages
+        assert 190 <= stages["llm_first_audio"] < 280, stages
+        assert 40 <= stages["playback_start"] < 130, stages
+        parts = stages["turn_decision"] + stages["llm_first_audio"] + stages["playback_start"]
+        assert abs(stages["total"] - parts) < 1, stages
+
+    # Per-session histograms are written when the session ends
+    session = records[-1]
+    assert session["type"] == "session" and session["session_id"] == "room-a", session
+    assert session["turns"] == 2 and session["abandoned"] == 1
+    assert session["stages"]["llm_first_audio"]["buckets"]["le_300"] == 2, session["stages"]["llm_first_audio"]
+
+
+async def test_summary_across_sessions():
+    """GET /metrics aggregates turns across sessions (runs after test_turn_records)."""
+    other = TurnLatencyTracker("room-b")
+    await run_test(probes(other), frames_to_send=turn(0.05, 0.60, 0.05))
+    other.close()
+    assert turn_latency_sink.flush()
+
+    summary = turn_latency_sink.summary()
+    assert summary["sessions"] == 2 and summary["turns"] == 3, summary
+    first_audio = summary["stages"]["llm_first_audio"]
+    assert first_audio["count"] == 3 and first_audio["p50_ms"] == 300 and first_audio["p95_ms"] == 750, first_audio
+
+
+def test_incremental_summary(tmp_path: Path):
+    """The summary only parses new lines and follows the log across rotation."""
+    path = tmp_path / "rotating.jsonl"
+    sink = TurnLatencySink(path, max_bytes=2000)
+    stages_ms = {stage: 120.0 for stage in STAGES}
+
+    def log_turns(count: int, session_id: str) -> None:
+        for _ in range(count):
+            sink.write({"type": "turn", "session_id": session_id, "ts": 0, "stages_ms": stages_ms})
+        assert sink.flush()
+
+    log_turns(5, "s1")
+    assert sink.summary()["turns"] == 5
+    log_turns(15, "s2")
+    log_turns(15, "s2")  # the file is over max_bytes by now and gets rotated first
+    assert path.with_name(path.name + ".1").exists()
+    summary = sink.summary()
+    assert summary["turns"] == 35 and summary["sessions"] == 2, summary
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "turn", "session_id": "s3"')  # a record still being written
+    assert sink.summary()["turns"] == 35
+    sink.close()
+